@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DynamicGrid backtest on stored 1m bars (candle store or a bars file), no network.
+
+Replays the paper bot's grid loop: every retune_sec the band is recomputed from the
+closed bars (DynamicGrid._compute_band: last 20 closes, mid ± 2σ), small shifts are
+skipped (MIN_BAND_SHIFT_PCT), otherwise compute_grid_inline's plan replaces all resting
+orders (RiskGate.check_order on the plan total). Orders rest until the next replace.
+
+Everything except the band-shift filter (one float loop over retune points) is array code:
+  - bands: rolling mean / sample std over the close series
+  - plans: compute_grid_inline on the tick lattice (grid_sizer.Lattice), all retunes at once
+  - fills: first bar in an order's live segment where low ≤ buy / high ≥ sell, found by
+    binary lifting over sparse min/max tables (O(log n) vector steps for all orders)
+  - PnL: per-bar position/cash from bincount + cumsum, marked at the close
+Fills are at the limit price; a touch counts as a fill (no queue position).
+GridParams.optimize (grid_opt bands) is not replayed: backtest() raises ValueError for it.
+
+  python backtest_grid.py --symbol "BTC/USDT:USDT" --levels 16 --capital 200 --retune_sec 120
+  python backtest_grid.py --bars btc_1m.json.gz --filters 0.1,0.0001,5,0.0001,0 --min_band_shift 0.002
+"""
+from __future__ import annotations
+
+import argparse, csv, gzip, json, os, time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from candle_store import default_store
+from grid_sizer import Lattice, qty_ticks_vec, ticks_to_float, ticks_vec
+from src.core.risk import RiskGate, RiskLimits
+from src.strategy.dynamic_grid import GridParams
+
+BAND_N = 20            # DynamicGrid._compute_band penceresi
+RESERVE = 0.05         # DynamicGrid → compute_grid_inline(reserve=0.05, lev=1)
+
+
+# ---------- bars ----------
+
+def load_bars(path: str = None, symbol: str = None) -> np.ndarray:
+    """(n, 6) [ts, o, h, l, c, v]: .json(.gz) satır listesi, .csv ya da candle store (symbol, 1m)."""
+    if path:
+        if path.endswith(".csv"):
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                rows = [r[:6] for r in csv.reader(f) if r and r[0][:1].isdigit()]
+        else:
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt", encoding="utf-8") as f:
+                rows = json.load(f)
+        return np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+    store = default_store()
+    ser = store.open(symbol, "1m") if store is not None else None
+    if ser is None:
+        raise SystemExit(f"candle store'da 1m seri yok: {symbol} (CANDLE_STORE_DIR / --bars)")
+    try:
+        return np.array([np.asarray(ser.column(c)) for c in ("ts", "open", "high", "low", "close", "volume")]).T
+    finally:
+        ser.close()
+
+
+# ---------- bands (DynamicGrid._compute_band) ----------
+
+def bands(closes: np.ndarray, at: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Retune anı t için closes[:t] üzerinden (lower, upper); t ≥ BAND_N varsayılır."""
+    win = np.lib.stride_tricks.sliding_window_view(closes, BAND_N)[at - BAND_N]
+    mid = win.mean(axis=1)
+    sd = win.std(axis=1, ddof=1)
+    lower, upper = mid - 2 * sd, mid + 2 * sd
+    last = closes[at - 1]
+    bad = (lower <= 0) | ~(lower < upper)
+    return np.where(bad, last * 0.99, lower), np.where(bad, last * 1.01, upper)
+
+
+def shift_filter(lower: np.ndarray, upper: np.ndarray, min_shift: float) -> np.ndarray:
+    """DynamicGrid'in churn eşiği: son kabul edilen banda göre kayma < min_shift → atla."""
+    keep = np.zeros(len(lower), dtype=bool)
+    l0 = u0 = None
+    for k, (lo, hi) in enumerate(zip(lower.tolist(), upper.tolist())):
+        if l0 is not None and (abs(lo - l0) + abs(hi - u0)) / max(1e-9, u0 - l0) < min_shift:
+            continue
+        keep[k] = True
+        l0, u0 = lo, hi
+    return keep
+
+
+# ---------- plans (compute_grid_inline, vektörel) ----------
+
+def plan_orders(lower: np.ndarray, upper: np.ndarray, last: np.ndarray, levels: int, capital: float,
+                filters: Tuple[float, float, float, float, float]) -> Dict[str, np.ndarray]:
+    """
+    Her satır için compute_grid_inline(lower, upper, levels, capital, reserve=0.05, last=last):
+    (m, levels) side (+1 buy / −1 sell / 0 yok), price, qty, notional.
+    """
+    price_step, qty_step, min_notional, min_qty, min_price = filters
+    plat, qlat = Lattice(price_step), Lattice(qty_step)
+    per_n = capital * (1.0 - RESERVE) / max(1, levels)
+    m = len(lower)
+
+    k_lo = ticks_vec(lower, plat)
+    span = ticks_vec(upper, plat) - k_lo
+    k = k_lo[:, None] + (np.arange(levels)[None, :] * span[:, None]) // max(1, levels - 1)
+    k_up, k_dn = ticks_vec(last, plat, "up")[:, None], ticks_vec(last, plat, "down")[:, None]
+    side = np.where(k < k_up, 1, np.where(k > k_dn, -1, 0))
+
+    kp = np.maximum(k, plat.ticks(min_price, "up") if min_price else 0).ravel()
+    kp1 = np.maximum(kp, 1)
+    r = np.zeros(len(kp), dtype=np.int64)
+    steps = np.array([price_step * qty_step])
+    kq = np.maximum(qty_ticks_vec(np.full(len(kp), per_n), kp1, r, steps, [plat], [qlat]),
+                    qlat.ticks(min_qty, "up") if min_qty else 0)
+    if min_notional:
+        kq = np.maximum(kq, qty_ticks_vec(np.full(len(kp), float(min_notional)), kp1, r, steps, [plat], [qlat], "up"))
+    side = np.where(kq.reshape(m, levels) > 0, side, 0)
+    price = ticks_to_float(kp, plat.unit, plat.scale).reshape(m, levels)
+    qty = ticks_to_float(kq, qlat.unit, qlat.scale).reshape(m, levels)
+    return {"side": side, "price": price, "qty": qty, "notional": np.where(side != 0, price * qty, 0.0)}
+
+
+# ---------- fills ----------
+
+def _sparse_min(x: np.ndarray) -> list:
+    """t[k][i] = min(x[i : i + 2^k]) (taşan uçlar +inf)."""
+    t = [x]
+    step = 1
+    while 2 * step <= len(x):
+        prev = t[-1]
+        nxt = np.full(len(x), np.inf)
+        nxt[:len(x) - step] = np.minimum(prev[:len(x) - step], prev[step:])
+        t.append(nxt)
+        step *= 2
+    return t
+
+
+def first_touch(table: list, start: np.ndarray, end: np.ndarray, level: np.ndarray) -> np.ndarray:
+    """[start, end) içinde x[j] ≤ level olan ilk j; yoksa end. Binary lifting, O(log n) vektör adımı."""
+    pos = start.copy()
+    n = len(table[0])
+    for k in range(len(table) - 1, -1, -1):
+        step = 1 << k
+        blk = table[k][np.minimum(pos, n - 1)]
+        pos = np.where((pos + step <= end) & (blk > level), pos + step, pos)
+    return pos
+
+
+# ---------- backtest ----------
+
+def backtest(bars: np.ndarray, filters: Tuple[float, float, float, float, float], params: GridParams,
+             min_band_shift: float = 0.001, fee: float = 0.0006, risk: RiskGate = None,
+             symbol: str = "SYM") -> Dict[str, Any]:
+    if params.optimize:
+        raise ValueError("backtest optimize=True desteklemiyor (bant: mid ± 2σ); GridParams.optimize=False verin")
+    t0 = time.perf_counter()
+    bars = np.asarray(bars, dtype=np.float64)
+    highs, lows, closes = bars[:, 2], bars[:, 3], bars[:, 4]
+    n = len(closes)
+    every = max(1, int(round(params.retune_sec / 60.0)))   # paper döngüsü: retune_sec ≥ 1 bar
+    at = np.arange(BAND_N, n, every)                      # retune: bar t açılırken, closes[:t] kapalı
+    if not len(at):
+        raise ValueError(f"en az {BAND_N + 1} bar gerekli")
+
+    lower, upper = bands(closes, at)
+    acc = shift_filter(lower, upper, min_band_shift)
+    a_at, a_lo, a_hi = at[acc], lower[acc], upper[acc]
+    last = closes[a_at - 1]
+    plan = plan_orders(a_lo, a_hi, last, params.levels, params.capital, filters)
+
+    # yerleştirme: boş plan ya da risk reddi → eski emirler yerinde kalır
+    risk = risk or RiskGate(RiskLimits())
+    totals = plan["notional"].sum(axis=1)
+    nonempty = (plan["side"] != 0).any(axis=1)
+    placed = np.array([ne and risk.check_order(symbol, float(t)) for ne, t in zip(nonempty.tolist(), totals.tolist())],
+                      dtype=bool)
+    p_at = a_at[placed]
+    seg_end = np.append(p_at[1:], n)
+
+    side = plan["side"][placed]
+    live = side != 0
+    row = np.nonzero(live)[0]
+    o_side, o_px, o_qty = side[live], plan["price"][placed][live], plan["qty"][placed][live]
+    o_start, o_end = p_at[row], seg_end[row]
+
+    buy = o_side > 0
+    fill = np.empty(len(o_side), dtype=np.int64)
+    fill[buy] = first_touch(_sparse_min(lows), o_start[buy], o_end[buy], o_px[buy])
+    fill[~buy] = first_touch(_sparse_min(-highs), o_start[~buy], o_end[~buy], -o_px[~buy])
+    hit = fill < o_end
+
+    f_bar, f_sign, f_px, f_qty = fill[hit], o_side[hit].astype(np.float64), o_px[hit], o_qty[hit]
+    f_not = f_px * f_qty
+    f_fee = f_not * fee
+    pos = np.cumsum(np.bincount(f_bar, weights=f_sign * f_qty, minlength=n))
+    cash = np.cumsum(np.bincount(f_bar, weights=-f_sign * f_not - f_fee, minlength=n))
+    equity = cash + pos * closes
+    dd = np.maximum.accumulate(equity) - equity
+
+    return {
+        "symbol": symbol, "bars": n, "days": round(n / 1440.0, 2),
+        "levels": params.levels, "capital": params.capital, "retune_sec": params.retune_sec,
+        "min_band_shift": min_band_shift, "fee": fee,
+        "pnl": float(equity[-1]), "fees": float(f_fee.sum()), "max_drawdown": float(dd.max()),
+        "fills": int(hit.sum()), "buys": int((f_sign > 0).sum()), "sells": int((f_sign < 0).sum()),
+        "turnover": float(f_not.sum()), "final_position": float(pos[-1]),
+        "max_position": float(np.abs(pos).max()) if n else 0.0,
+        "retunes": int(len(at)), "skipped_shift": int((~acc).sum()),
+        "skipped_empty": int((~nonempty).sum()), "skipped_risk": int((nonempty & ~placed).sum()),
+        "replaces": int(placed.sum()), "orders_placed": int(live.sum()),
+        "orders_cancelled": int((~hit).sum()),       # churn: dolmadan iptal edilen (ya da sonda açık)
+        "elapsed_s": round(time.perf_counter() - t0, 4),
+    }
+
+
+def _filters(arg: Optional[str], symbol: str) -> Tuple[float, float, float, float, float]:
+    if arg:
+        f = tuple(float(x) for x in arg.split(","))
+        if len(f) != 5:
+            raise SystemExit("--filters: price_step,qty_step,min_notional,min_qty,min_price")
+        return f
+    import ccxt
+    from market_cache import market_filters
+    return market_filters(ccxt.bingx({"enableRateLimit": True, "options": {"defaultType": "swap"}}), symbol)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="DynamicGrid backtest (1m bars, no network)")
+    ap.add_argument("--symbol", default="BTC/USDT:USDT")
+    ap.add_argument("--bars", default=None, help=".json(.gz)/.csv satırlar; yoksa candle store")
+    ap.add_argument("--filters", default=None, help="price_step,qty_step,min_notional,min_qty,min_price (yoksa market cache)")
+    ap.add_argument("--levels", type=int, default=int(os.environ.get("GRID_LEVELS") or "16"))
+    ap.add_argument("--capital", type=float, default=float(os.environ.get("GRID_CAPITAL") or "200"))
+    ap.add_argument("--retune_sec", type=int, default=int(os.environ.get("RETUNE_SEC") or "120"))
+    ap.add_argument("--min_band_shift", type=float, default=float(os.environ.get("MIN_BAND_SHIFT_PCT") or "0.001"))
+    ap.add_argument("--fee", type=float, default=float(os.environ.get("FEE") or "0.0006"))
+    ap.add_argument("--json", action="store_true", help="sonucu JSON olarak yaz")
+    args = ap.parse_args()
+
+    bars = load_bars(args.bars, args.symbol)
+    params = GridParams(levels=args.levels, capital=args.capital, atr_k=0.0, retune_sec=args.retune_sec)
+    res = backtest(bars, _filters(args.filters, args.symbol), params, args.min_band_shift, args.fee,
+                   symbol=args.symbol)
+    if args.json:
+        print(json.dumps(res, indent=1))
+        return
+    for k, v in res.items():
+        print(f"{k:>17}: {v}")
+
+
+if __name__ == "__main__":
+    main()
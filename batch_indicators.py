@@ -0,0 +1,233 @@
+# batch_indicators.py
+# NumPy batch engine for the scanner metrics: one (n_symbols × n_bars) panel in,
+# every metric for every symbol out.
+#
+# Panels are right-aligned: a symbol with L bars occupies the last L columns and the
+# leading columns are NaN. Row-relative windows (last 150 bars for ADX, last 180 for
+# range/mid-cross, ...) are handled with per-row start masks, so short histories get
+# the same fallbacks as the list helpers in src/core/indicators.py (0.0 ATR, 100.0 ADX).
+#
+# Tolerance: results match the scalar functions to within 1e-9 relative. The loops run
+# over time (vectorised over symbols) and accumulate in the same order as the scalar
+# code, so in practice the values are bit-identical; integer counts are exact.
+
+from itertools import chain
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+TOLERANCE_REL = 1e-9
+
+
+def to_panel(series: Sequence[Sequence[Sequence[float]]], n_bars: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ccxt OHLCV listeleri → (ohlc[n, T, 4], lengths[n]).
+    Her seri son `n_bars` barıyla (0 = en uzunu kadar) sağa hizalanır, baştaki boşluk NaN.
+    """
+    lens = np.array([len(s) for s in series], dtype=np.int64)
+    T = int(n_bars or (lens.max() if len(lens) else 0))
+    lens = np.minimum(lens, T)
+    panel = np.full((len(series), T, 4), np.nan)
+    total = int(lens.sum())
+    if not total:
+        return panel, lens
+    # tek geçişte düz dizi (satır başına np.asarray'den ~3x hızlı)
+    rows = chain.from_iterable(s[len(s) - int(L):] for s, L in zip(series, lens))
+    flat = np.fromiter(chain.from_iterable(rows), np.float64, total * 6).reshape(total, 6)
+    off = 0
+    for r, L in enumerate(lens.tolist()):
+        if L:
+            panel[r, T - L:, :] = flat[off:off + L, 1:5]
+            off += L
+    return panel, lens
+
+
+def _true_range(h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """tr[:, i] bar i için (i >= 1); sütun 0 NaN."""
+    tr = np.full(h.shape, np.nan)
+    pc = c[:, :-1]
+    tr[:, 1:] = np.maximum(np.maximum(h[:, 1:] - l[:, 1:], np.abs(h[:, 1:] - pc)), np.abs(l[:, 1:] - pc))
+    return tr
+
+
+def sma_running(x: np.ndarray, lengths: np.ndarray, period: int) -> np.ndarray:
+    """indicators.sma_series ile aynı kayan toplam; satırın ilk period-1 barı NaN."""
+    n, T = x.shape
+    start = T - lengths
+    v = np.where(np.isnan(x), 0.0, x)
+    out = np.full((n, T), np.nan)
+    s = np.zeros(n)
+    for i in range(T):
+        s = s + v[:, i]
+        if i >= period:
+            s = s - v[:, i - period]
+        ok = (i - start) >= period - 1
+        out[ok, i] = s[ok] / period
+    return out
+
+
+def atr_mean(ohlc: np.ndarray, lengths: np.ndarray, period: int = 14) -> np.ndarray:
+    """indicators.atr_from_ohlc: son `period` TR'nin ortalaması (L < period+1 → 0.0)."""
+    n, T, _ = ohlc.shape
+    out = np.zeros(n)
+    if T < period + 1:
+        return out
+    tr = _true_range(ohlc[:, :, 1], ohlc[:, :, 2], ohlc[:, :, 3])
+    acc = np.zeros(n)
+    for i in range(T - period, T):
+        acc = acc + tr[:, i]
+    ok = lengths >= period + 1
+    out[ok] = acc[ok] / period
+    return out
+
+
+def adx14(ohlc: np.ndarray, lengths: np.ndarray, window: int = 150, n: int = 14) -> np.ndarray:
+    """indicators.adx14(ohlc[-window:]) for every row (short history → 100.0)."""
+    rows, T, _ = ohlc.shape
+    o, h, l, c = ohlc[:, :, 0], ohlc[:, :, 1], ohlc[:, :, 2], ohlc[:, :, 3]
+    lw = np.minimum(lengths, window)
+    sw = T - lw                                   # window start per row
+    tr = _true_range(h, l, c)
+    up = np.full(h.shape, np.nan); dn = np.full(h.shape, np.nan)
+    up[:, 1:] = h[:, 1:] - h[:, :-1]
+    dn[:, 1:] = l[:, :-1] - l[:, 1:]
+    pdm = np.maximum(up, 0.0); ndm = np.maximum(dn, 0.0)
+    pdm, ndm = np.where(pdm < ndm, 0.0, pdm), np.where(ndm < pdm, 0.0, ndm)
+
+    X = np.stack([tr, pdm, ndm])                  # (3, rows, T): TR, +DM, -DM birlikte
+    acc = np.zeros((3, rows))
+    sm = np.zeros((3, rows))
+    dx_sum = np.zeros(rows)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for i in range(max(1, T - window + 1), T):
+            j = i - sw - 1                        # row-relative TR index
+            x = X[:, :, i]
+            init = (j >= 0) & (j < n)
+            if init.any():
+                acc = np.where(init, acc + x, acc)
+            sm = np.where(j == n - 1, acc, np.where(j >= n, sm - (sm / n) + x, sm))
+            if i >= T - n:
+                pdi = np.where(sm[0] > 0, sm[1] / sm[0] * 100.0, 0.0)
+                ndi = np.where(sm[0] > 0, sm[2] / sm[0] * 100.0, 0.0)
+                s = pdi + ndi
+                dx_sum = dx_sum + np.where(s > 0, np.abs(pdi - ndi) / s * 100.0, 0.0)
+    out = np.full(rows, 100.0)
+    ok = lw >= 2 * n                              # len(dx) = lw - n >= n
+    out[ok] = dx_sum[ok] / n
+    return out
+
+
+def _cross_mask(closes: np.ndarray, mid: np.ndarray, first_col: np.ndarray) -> np.ndarray:
+    """mid_cross_count mantığı: NaN mid atlanır, diff==0 ya da işaret değişimi = cross."""
+    n, T = closes.shape
+    mask = np.zeros((n, T), dtype=bool)
+    prev = np.zeros(n); has_prev = np.zeros(n, dtype=bool)
+    for i in range(int(first_col.min()) if n else T, T):
+        valid = (i >= first_col) & ~np.isnan(mid[:, i])
+        diff = closes[:, i] - mid[:, i]
+        hit = valid & has_prev & ((diff == 0) | ((diff > 0) & (prev < 0)) | ((diff < 0) & (prev > 0)))
+        mask[:, i] = hit
+        prev = np.where(valid, diff, prev)
+        has_prev |= valid
+    return mask
+
+
+def mid_cross_count(closes: np.ndarray, mid: np.ndarray, lengths: np.ndarray, window: int = 180) -> np.ndarray:
+    T = closes.shape[1]
+    return _cross_mask(closes, mid, T - np.minimum(lengths, window)).sum(axis=1)
+
+
+def range_drift(closes: np.ndarray, lengths: np.ndarray, window: int = 180) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(last, range_pct, drift_ratio) — range son `window` bar, drift tüm seri."""
+    n, T = closes.shape
+    last = closes[:, -1]
+    w = closes[:, max(0, T - window):]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = np.nanmax(w, axis=1) - np.nanmin(w, axis=1)
+        first = closes[np.arange(n), np.minimum(T - lengths, T - 1)]
+        rng = np.where(last > 0, total / last, 0.0)
+        drift = np.where(total > 0, np.abs(last - first) / total, 0.0)
+    return last, rng, drift
+
+
+def crosses_per_hour(closes: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """indicators.crosses_per_hour: (max(count_rate, 60/median_interval), median_interval)."""
+    n, T = closes.shape
+    mid = sma_running(closes, lengths, 20)
+    mask = _cross_mask(closes, mid, T - lengths)
+    cnt = mask.sum(axis=1)
+    hours = np.maximum(np.maximum(lengths - 19, 1) / 60.0, 1e-6)
+    count_rate = cnt / hours
+
+    cols = np.arange(T)
+    last_pos = np.maximum.accumulate(np.where(mask, cols, -1), axis=1)
+    prev_pos = np.concatenate([np.full((n, 1), -1), last_pos[:, :-1]], axis=1)
+    intervals = np.where(mask & (prev_pos >= 0), cols - prev_pos, np.inf).astype(np.float64)
+    intervals.sort(axis=1)
+    k = np.maximum(cnt - 1, 1) // 2
+    med = intervals[np.arange(n), np.minimum(k, T - 1)] if T else np.full(n, np.inf)
+    med = np.where(cnt >= 2, med, np.inf)
+    with np.errstate(divide="ignore"):
+        rate_from_med = np.where((med > 0) & np.isfinite(med), 60.0 / med, 0.0)
+    xph = np.where(cnt >= 2, np.maximum(count_rate, rate_from_med), count_rate)
+    return xph, med
+
+
+def touches_per_hour(closes: np.ndarray, lengths: np.ndarray, q_lo: float = 0.2, q_hi: float = 0.8) -> np.ndarray:
+    """indicators.touches_per_hour: q_lo/q_hi persentil bantlarına dokunuş/saat."""
+    n, T = closes.shape
+    S = np.sort(closes, axis=1)                   # NaN pad sona gider
+    rows = np.arange(n)
+
+    def pct(q: float) -> np.ndarray:
+        q = min(max(q, 0.0), 1.0)
+        idx = q * (lengths - 1)
+        lo = np.floor(idx).astype(np.int64); hi = np.ceil(idx).astype(np.int64)
+        lo = np.clip(lo, 0, max(T - 1, 0)); hi = np.clip(hi, 0, max(T - 1, 0))
+        frac = idx - lo
+        a, b = S[rows, lo], S[rows, hi]
+        return np.where(lo == hi, a, a * (1 - frac) + b * frac)
+
+    lo_v, hi_v = pct(q_lo)[:, None], pct(q_hi)[:, None]
+    with np.errstate(invalid="ignore"):
+        touches = ((closes <= lo_v) | (closes >= hi_v)).sum(axis=1)
+    hours = np.maximum(lengths / 60.0, 1e-6)
+    return touches / hours
+
+
+# ---------- scanner-level bundles ----------
+
+def scan_metrics_5m(series5: Sequence[Sequence[Sequence[float]]], *, atr_period: int = 50,
+                    adx_window: int = 150, window: int = 180, with_adx: bool = True) -> Dict[str, np.ndarray]:
+    """
+    eval_5m'in sayısal kısmı: last, atr_abs, atr_pct, range_pct, adx, midcross, drift_ratio.
+    with_adx=False → "adx" anahtarı yok (pahalı aşama; adx_5m ile sadece gereken satırlara).
+    """
+    ohlc, lens = to_panel(series5)
+    closes = ohlc[:, :, 3]
+    last, rng, drift = range_drift(closes, lens, window)
+    atr = atr_mean(ohlc, lens, atr_period)
+    mid = sma_running(closes, lens, 20)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        atr_pct = np.where(last > 0, atr / last, 0.0)
+    out = {
+        "last": last, "atr_abs": atr, "atr_pct": atr_pct, "range_pct": rng,
+        "midcross": mid_cross_count(closes, mid, lens, window), "drift_ratio": drift,
+    }
+    if with_adx:
+        out["adx"] = adx14(ohlc, lens, adx_window)
+    return out
+
+
+def adx_5m(series5: Sequence[Sequence[Sequence[float]]], window: int = 150) -> np.ndarray:
+    """indicators.adx14(ohlc5[-window:]) for every series."""
+    ohlc, lens = to_panel(series5, window)
+    return adx14(ohlc, lens, window)
+
+
+def fast_metrics(series1: Sequence[Sequence[Sequence[float]]], q_lo: float = 0.2, q_hi: float = 0.8) -> Dict[str, np.ndarray]:
+    """eval_fast'in sayısal kısmı: xph, med, edgeph."""
+    ohlc, lens = to_panel(series1)
+    closes = ohlc[:, :, 3]
+    xph, med = crosses_per_hour(closes, lens)
+    return {"xph": xph, "med": med, "edgeph": touches_per_hour(closes, lens, q_lo, q_hi)}
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skaler (scan_bingx_grid) vs NumPy batch (batch_indicators) karşılaştırması.
+Deterministik sentetik OHLCV üretir; ağ erişimi yok.
+
+  python bench/bench_batch_indicators.py --symbols 80 500 2000
+"""
+import argparse, math, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CANDLE_STORE_DIR", "off")
+
+import batch_indicators as B          # noqa: E402
+import scan_bingx_grid as S           # noqa: E402
+
+
+def synth_series(seed: int, n: int, step_ms: int) -> list:
+    """Ortalamaya dönen rastgele yürüyüş (S davranışına benzer), [ts,o,h,l,c,v]."""
+    r = random.Random(seed)
+    p = mid = 1.0 + r.random() * 50
+    rows = []
+    for i in range(n):
+        o = p
+        p = p + (mid - p) * 0.05 + p * r.gauss(0, 0.004)
+        h = max(o, p) * (1 + abs(r.gauss(0, 0.001)))
+        l = min(o, p) * (1 - abs(r.gauss(0, 0.001)))
+        rows.append([1_700_000_000_000 + i * step_ms, o, h, l, p, r.random() * 1000])
+    return rows
+
+
+def scalar(series5, series1):
+    out5, out1 = [], []
+    for rows in series5:
+        closes = [float(x[4]) for x in rows]
+        ohlc = [(float(x[1]), float(x[2]), float(x[3]), float(x[4])) for x in rows]
+        mid = S.sma_series(closes, 20)
+        w = closes[-180:]
+        tot = max(w) - min(w)
+        out5.append((S.atr_from_ohlc(ohlc, 50), S.adx14(ohlc[-150:]),
+                     S.mid_cross_count(closes[-180:], mid[-180:]),
+                     tot / closes[-1], abs(closes[-1] - closes[0]) / tot if tot > 0 else 0.0))
+    for rows in series1:
+        closes = [float(x[4]) for x in rows]
+        x, med = S.crosses_per_hour(closes)
+        out1.append((x, med, S.touches_per_hour(closes)))
+    return out5, out1
+
+
+def max_rel_diff(a: float, b: float) -> float:
+    if a == b or (math.isinf(a) and math.isinf(b)):
+        return 0.0
+    return abs(a - b) / max(abs(a), abs(b), 1e-300)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="batch indicator benchmark")
+    ap.add_argument("--symbols", type=int, nargs="+", default=[80, 500, 2000])
+    ap.add_argument("--bars5", type=int, default=200)
+    ap.add_argument("--bars1", type=int, default=360)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'symbols':>8} {'scalar_s':>10} {'batch_s':>10} {'compute_s':>10} {'speedup':>8} {'max_rel_diff':>13}")
+    for n in args.symbols:
+        s5 = [synth_series(k, args.bars5, 300_000) for k in range(n)]
+        s1 = [synth_series(10_000 + k, args.bars1, 60_000) for k in range(n)]
+
+        t_s = min(_timeit(lambda: scalar(s5, s1)) for _ in range(args.repeat))
+        t_b = min(_timeit(lambda: (B.scan_metrics_5m(s5), B.fast_metrics(s1))) for _ in range(args.repeat))
+        # compute-only: panel dönüşümü hariç (liste → ndarray maliyeti skaler yolda da var)
+        (p5, l5), (p1, l1) = B.to_panel(s5), B.to_panel(s1)
+        t_c = min(_timeit(lambda: _compute_only(p5, l5, p1, l1)) for _ in range(args.repeat))
+
+        ref5, ref1 = scalar(s5, s1)
+        m5, m1 = B.scan_metrics_5m(s5), B.fast_metrics(s1)
+        worst = 0.0
+        for r, (atr, adx, mc, rng, dr) in enumerate(ref5):
+            for a, b in ((atr, m5["atr_abs"][r]), (adx, m5["adx"][r]), (mc, m5["midcross"][r]),
+                         (rng, m5["range_pct"][r]), (dr, m5["drift_ratio"][r])):
+                worst = max(worst, max_rel_diff(float(a), float(b)))
+        for r, (x, med, e) in enumerate(ref1):
+            for a, b in ((x, m1["xph"][r]), (med, m1["med"][r]), (e, m1["edgeph"][r])):
+                worst = max(worst, max_rel_diff(float(a), float(b)))
+        flag = "" if worst <= B.TOLERANCE_REL else "  !! tolerans aşıldı"
+        print(f"{n:>8} {t_s:>10.3f} {t_b:>10.3f} {t_c:>10.3f} {t_s / max(t_b, 1e-9):>7.1f}x {worst:>13.2e}{flag}")
+
+
+def _compute_only(p5, l5, p1, l1) -> None:
+    c5, c1 = p5[:, :, 3], p1[:, :, 3]
+    B.range_drift(c5, l5); B.atr_mean(p5, l5, 50); B.adx14(p5, l5)
+    B.mid_cross_count(c5, B.sma_running(c5, l5, 20), l5)
+    B.crosses_per_hour(c1, l1); B.touches_per_hour(c1, l1)
+
+
+def _timeit(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    main()
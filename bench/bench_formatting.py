@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Telegram composer: eski satır bazlı bölme (3500 karakter) vs blok paketleme (formatting.pack_units).
+Deterministik sentetik adaylar; ağ erişimi yok. Ölçülen: compose süresi, mesaj sayısı,
+iki mesaja bölünen aday sayısı.
+
+  python bench/bench_formatting.py --candidates 12 50 200
+"""
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import formatting as F                 # noqa: E402
+
+
+def synth_entry(r: random.Random, k: int) -> dict:
+    last = 10 ** r.uniform(-4, 4)
+    atr = r.uniform(0.003, 0.02)
+    return {
+        "symbol": f"C{k}{'X' * r.randint(0, 6)}/USDT:USDT",
+        "last": last, "atr_abs": last * atr, "atr_pct": atr, "range_pct": r.uniform(0.015, 0.2),
+        "adx": r.uniform(5, 30), "mid_cross": r.randint(18, 60), "drift_pct": r.uniform(0, 0.7),
+        "tags": ["PING-PONG OK"] + (["FAST S OK"] if r.random() < 0.5 else []),
+        "grid_low": last * 0.97, "grid_high": last * 1.03, "grid_lines": 12,
+        "speed": ({"xph": round(r.uniform(5, 40), 1), "med": f"{r.randint(3, 40)}m",
+                   "edgeph": round(r.uniform(2, 20), 1)} if r.random() < 0.6 else {}),
+    }
+
+
+def legacy_compose(s_behavior, top, fast) -> list:
+    """Önceki composer: tüm metin birleştirilip satır satır 3500'de kesilirdi."""
+    blocks = [F.format_s_behavior_block(s_behavior), F.format_top_candidates_block(top),
+              F.format_fast_candidates_block(fast)]
+    text = "\n".join(["<b>🟢 Scanner Up — Starting Scan</b>", "2024-01-01 00:00", ""]
+                     + [b + "\n" for b in blocks if b]).strip()
+    parts, buf, size = [], [], 0
+    for ln in text.splitlines(keepends=True):
+        if size + len(ln) > 3500 and buf:
+            parts.append("".join(buf)); buf, size = [], 0
+        buf.append(ln); size += len(ln)
+    if buf:
+        parts.append("".join(buf))
+    return parts
+
+
+def split_items(chunks: list, items: list) -> int:
+    """Hiçbir mesajda tam olarak bulunmayan aday bloğu sayısı."""
+    return sum(1 for it in items if not any(it in ch for ch in chunks))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Telegram composer benchmark")
+    ap.add_argument("--candidates", type=int, nargs="+", default=[12, 50, 200])
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    print(f"{'cand':>6} {'legacy_ms':>10} {'packed_ms':>10} {'legacy_msg':>10} {'packed_msg':>10}"
+          f" {'legacy_split':>12} {'packed_split':>12} {'max_len':>8}")
+    for n in args.candidates:
+        r = random.Random(n)
+        s_beh = synth_entry(r, 0)
+        top = [synth_entry(r, k) for k in range(1, n + 1)]
+        fast = [synth_entry(r, k) for k in range(n + 1, 2 * n + 1)][: max(1, n // 4)]
+        kw = dict(scan_started_at="2024-01-01 00:00", s_behavior=s_beh, top_candidates=top, fast_candidates=fast)
+
+        t_l = min(_timeit(lambda: legacy_compose(s_beh, top, fast)) for _ in range(args.repeat))
+        t_p = min(_timeit(lambda: F.format_telegram_scan_message(**kw)) for _ in range(args.repeat))
+        old, new = legacy_compose(s_beh, top, fast), F.format_telegram_scan_message(**kw)
+        items = ([F._render_candidate_item(i, d) for i, d in enumerate(top, 1)]
+                 + [F._render_candidate_item(i, d) for i, d in enumerate(fast, 1)])
+        print(f"{n:>6} {t_l * 1e3:>10.2f} {t_p * 1e3:>10.2f} {len(old):>10} {len(new):>10}"
+              f" {split_items(old, items):>12} {split_items(new, items):>12}"
+              f" {max(F.tg_len(c) for c in new):>8}")
+
+
+def _timeit(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    main()
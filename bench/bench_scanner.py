@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scanner hot path micro-benchmark on recorded OHLCV fixtures (no network).
+
+Per function: throughput (calls/s), time per call and allocations (tracemalloc:
+bytes/blocks still held after the run, per call, and the peak traced memory). Functions: adx14, atr_from_ohlc,
+crosses_per_hour, touches_per_hour, suggest_grid and the full per-symbol evaluation
+(scan_pairs, scalar and batch). Results go to a JSON file so revisions can be compared.
+
+  python bench/bench_scanner.py                                  # 80 500 2000, synth fixtures
+  python bench/bench_scanner.py --out bench/results/HEAD.json
+  python bench/bench_scanner.py --compare bench/results/base.json
+  python bench/bench_scanner.py --record-live --symbols 80       # fixtures from BingX (network)
+
+Fixtures: bench/fixtures/ohlcv_<n>.json.gz = {"now_ms", "tickers", "5m": {sym: rows}, "1m": {...}}.
+Missing fixtures are generated once from a seeded mean-reverting walk and kept on disk.
+"""
+import argparse, gzip, json, os, platform, subprocess, sys, time, tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CANDLE_STORE_DIR", "off")
+os.environ.setdefault("LISTING_INDEX_PATH", "off")
+os.environ.setdefault("SCAN_HISTORY_PATH", "off")
+
+import scan_bingx_grid as S                                      # noqa: E402
+from bench_batch_indicators import synth_series                  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+BARS5, BARS1 = 200, 360
+NOW_MS = 1_700_000_000_000 + BARS5 * 300_000
+
+
+# ---------- fixtures ----------
+
+def fixture_path(n: int) -> str:
+    return os.path.join(FIXTURES, f"ohlcv_{n}.json.gz")
+
+
+def synth_fixture(n: int) -> dict:
+    syms = [f"SYN{k:04d}/USDT:USDT" for k in range(n)]
+    s5 = {s: synth_series(k, BARS5, 300_000) for k, s in enumerate(syms)}
+    s1 = {s: synth_series(10_000 + k, BARS1, 60_000) for k, s in enumerate(syms)}
+    tickers = {}
+    for k, s in enumerate(syms):
+        rows = s5[s][-288:]
+        tickers[s] = {"symbol": s, "last": rows[-1][4], "high": max(r[2] for r in rows),
+                      "low": min(r[3] for r in rows), "quoteVolume": 2_000_000.0 + k}
+    return {"now_ms": NOW_MS, "tickers": tickers, "5m": s5, "1m": s1}
+
+
+def record_live(n: int) -> dict:
+    """BingX'ten TOP-n sembolün tickers + 5m×200 + 1m×360 kaydı."""
+    import ccxt
+    ex = ccxt.bingx({"enableRateLimit": True, "options": {"defaultType": "swap"}})
+    S.TOP_K = max(S.TOP_K, n)
+    markets, pairs = S.load_universe(ex)
+    pairs = sorted(pairs, key=lambda p: -(p[1].get("quoteVolume") or 0.0))[:n]
+    fx = {"now_ms": ex.milliseconds(), "tickers": dict(pairs), "5m": {}, "1m": {}}
+    for s, _ in pairs:
+        fx["5m"][s] = ex.fetch_ohlcv(s, timeframe="5m", limit=BARS5)
+        fx["1m"][s] = ex.fetch_ohlcv(s, timeframe="1m", limit=BARS1)
+    return fx
+
+
+def load_fixture(n: int) -> dict:
+    p = fixture_path(n)
+    if not os.path.exists(p):
+        save_fixture(n, synth_fixture(n))
+    with gzip.open(p, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fixture(n: int, fx: dict) -> None:
+    os.makedirs(FIXTURES, exist_ok=True)
+    with gzip.open(fixture_path(n), "wt", encoding="utf-8") as f:
+        json.dump(fx, f)
+
+
+class FixtureExchange:
+    def __init__(self, now_ms: int):
+        self._now = now_ms
+
+    def milliseconds(self) -> int:
+        return self._now
+
+
+class FixtureFetcher:
+    """fetch_many from the fixture (same interface as fetch_pool.SerialFetcher)."""
+
+    def __init__(self, fx: dict):
+        self.fx = fx
+
+    def fetch_many(self, jobs):
+        return [self.fx[tf][s][-lim:] for s, tf, lim, _ in jobs]
+
+    def close(self) -> None:
+        pass
+
+
+# ---------- measurement ----------
+
+def measure(fn, calls: int, repeat: int) -> dict:
+    """fn() runs `calls` operations; best-of-repeat wall time + one tracemalloc pass."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    snap0 = tracemalloc.take_snapshot()
+    fn()
+    snap1 = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = snap1.compare_to(snap0, "filename")
+    alloc_bytes = sum(max(st.size_diff, 0) for st in stats)
+    alloc_blocks = sum(max(st.count_diff, 0) for st in stats)
+    return {
+        "calls": calls,
+        "seconds": best,
+        "calls_per_s": calls / best if best > 0 else float("inf"),
+        "us_per_call": best / max(calls, 1) * 1e6,
+        "retained_bytes_per_call": alloc_bytes / max(calls, 1),
+        "retained_blocks_per_call": alloc_blocks / max(calls, 1),
+        "peak_bytes": peak,
+    }
+
+
+def bench_size(fx: dict, repeat: int) -> dict:
+    syms = list(fx["tickers"])
+    ohlc5 = [[(float(r[1]), float(r[2]), float(r[3]), float(r[4])) for r in fx["5m"][s]] for s in syms]
+    closes1 = [[float(r[4]) for r in fx["1m"][s]] for s in syms]
+    lasts = [o[-1][3] for o in ohlc5]
+    atrs = [S.atr_from_ohlc(o, 50) for o in ohlc5]
+    n = len(syms)
+    pairs = [(s, fx["tickers"][s]) for s in syms]
+    markets = {s: {"info": {"listingTime": fx["now_ms"] - 365 * 86_400_000}} for s in syms}
+    ex, fetcher = FixtureExchange(fx["now_ms"]), FixtureFetcher(fx)
+
+    def scan(batch: int):
+        def run():
+            prev = S.BATCH_COMPUTE
+            S.BATCH_COMPUTE = batch
+            try:
+                with open(os.devnull, "w") as devnull, redirect_stdout(devnull):  # [time]/SKIP satırları
+                    S.scan_pairs(ex, markets, pairs, fetcher)
+            finally:
+                S.BATCH_COMPUTE = prev
+        return run
+
+    out = {
+        "adx14": measure(lambda: [S.adx14(o[-150:]) for o in ohlc5], n, repeat),
+        "atr_from_ohlc": measure(lambda: [S.atr_from_ohlc(o, 50) for o in ohlc5], n, repeat),
+        "crosses_per_hour": measure(lambda: [S.crosses_per_hour(c) for c in closes1], n, repeat),
+        "touches_per_hour": measure(lambda: [S.touches_per_hour(c) for c in closes1], n, repeat),
+        "suggest_grid": measure(lambda: [S.suggest_grid(l, a) for l, a in zip(lasts, atrs)], n, repeat),
+        "scan_pairs_scalar": measure(scan(0), n, repeat),
+    }
+    if S._batch is not None:
+        out["scan_pairs_batch"] = measure(scan(1), n, repeat)
+    return out
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def print_table(results: dict, base: dict = None) -> None:
+    print(f"{'symbols':>8} {'function':<20} {'calls/s':>12} {'us/call':>10} {'B/call':>9} {'blk/call':>9} {'peak_MB':>8}"
+          + (f" {'vs base':>8}" if base else ""))
+    for n, funcs in results.items():
+        for name, m in funcs.items():
+            line = (f"{n:>8} {name:<20} {m['calls_per_s']:>12.0f} {m['us_per_call']:>10.1f}"
+                    f" {m['retained_bytes_per_call']:>9.0f} {m['retained_blocks_per_call']:>9.1f}"
+                    f" {m['peak_bytes'] / 1e6:>8.2f}")
+            ref = (base or {}).get(n, {}).get(name)
+            if ref:
+                line += f" {ref['us_per_call'] / max(m['us_per_call'], 1e-12):>7.2f}x"
+            print(line)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="scanner hot path benchmark (offline fixtures)")
+    ap.add_argument("--symbols", type=int, nargs="+", default=[80, 500, 2000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", default=os.path.join(HERE, "results", "latest.json"))
+    ap.add_argument("--compare", help="önceki sonuç JSON'u (hız oranı sütunu)")
+    ap.add_argument("--record-live", action="store_true", help="fixture'ları BingX'ten kaydet (ağ gerekir)")
+    args = ap.parse_args()
+
+    if args.record_live:
+        for n in args.symbols:
+            save_fixture(n, record_live(n))
+            print(f"[info] kaydedildi: {fixture_path(n)}")
+        return
+
+    results = {}
+    for n in args.symbols:
+        results[str(n)] = bench_size(load_fixture(n), args.repeat)
+
+    base = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f).get("results")
+    print_table(results, base)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"rev": _git_rev(), "python": platform.python_version(), "created": int(time.time()),
+                   "repeat": args.repeat, "results": results}, f, indent=1)
+    print(f"[info] sonuçlar: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# candle_store.py
+# Persistent incremental OHLCV store shared across scan runs.
+# One append-only binary file per (symbol, timeframe):
+#   16-byte header (magic, version, head_ts) + float64 rows [ts, o, h, l, c, v]
+# Reads are mmap-backed; column()/tail views are zero-copy memoryview slices.
+# Only bars newer than the last stored one are fetched; gaps inside the
+# requested window are detected and re-fetched from the gap start.
+
+import os, mmap, struct, bisect
+from typing import Any, List, Optional, Sequence, Tuple
+
+import ccxt
+
+MAGIC = b"CNDL"
+VERSION = 1
+HEADER = struct.Struct("<4sIq")          # magic, version, head_ts (history start; 0 = unknown)
+ROW = 6                                  # ts, o, h, l, c, v
+ROW_BYTES = ROW * 8
+COLUMNS = {"ts": 0, "open": 1, "high": 2, "low": 3, "close": 4, "volume": 5}
+
+DEFAULT_DIR = ".cache/candles"
+DEFAULT_MAX_BARS = 5000                  # per series; older rows are compacted away
+
+
+def timeframe_ms(tf: str) -> int:
+    return int(ccxt.Exchange.parse_timeframe(tf) * 1000)
+
+
+class CandleSeries:
+    """Read-only mmap view over one series file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, ver, head = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or ver != VERSION:
+            raise ValueError(f"bozuk candle dosyası: {path}")
+        self.head_ts = int(head)
+        nbytes = (len(self._mm) - HEADER.size) // ROW_BYTES * ROW_BYTES
+        self._flat = memoryview(self._mm)[HEADER.size:HEADER.size + nbytes].cast("d")
+        self._n = nbytes // ROW_BYTES
+
+    def __len__(self) -> int:
+        return self._n
+
+    def ts(self, i: int) -> int:
+        return int(self._flat[(i % self._n) * ROW])
+
+    def column(self, name: str) -> memoryview:
+        """Zero-copy strided view of one column (len == len(self))."""
+        return self._flat[COLUMNS[name]::ROW]
+
+    def tail(self, n: int) -> List[list]:
+        """Last n rows as ccxt-style [ts, o, h, l, c, v] lists."""
+        start = max(0, self._n - n)
+        flat = self._flat[start * ROW:]
+        return [[int(flat[k])] + flat[k + 1:k + ROW].tolist() for k in range(0, len(flat), ROW)]
+
+    def close(self) -> None:
+        try:
+            self._flat.release()
+            self._mm.close()
+        except BufferError:
+            pass  # caller still holds a column view; GC will unmap
+
+
+class CandleStore:
+    """
+    (symbol, timeframe) → append-only series on disk.
+    plan() tells the caller what to fetch, merge() writes the response,
+    window() serves the last `limit` bars. fetch() does all three for a sync exchange.
+    """
+
+    def __init__(self, root: str = DEFAULT_DIR, max_bars: int = DEFAULT_MAX_BARS):
+        self.root = root
+        self.max_bars = max(int(max_bars), 1)
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, symbol: str, tf: str) -> str:
+        safe = symbol.replace("/", "_").replace(":", "_")
+        return os.path.join(self.root, f"{safe}__{tf}.bin")
+
+    def open(self, symbol: str, tf: str) -> Optional[CandleSeries]:
+        p = self._path(symbol, tf)
+        if not os.path.exists(p) or os.path.getsize(p) < HEADER.size:
+            return None
+        try:
+            return CandleSeries(p)
+        except (ValueError, OSError):
+            return None
+
+    # ---------- planning ----------
+
+    def plan(self, symbol: str, tf: str, limit: int, now_ms: int) -> Tuple[Optional[int], int]:
+        """
+        (since, fetch_limit) for the next request.
+        since=None → full fetch of `limit` bars (empty/stale series or hole at window start).
+        """
+        step = timeframe_ms(tf)
+        cur_open = now_ms - now_ms % step
+        want_start = cur_open - (limit - 1) * step
+        ser = self.open(symbol, tf)
+        if ser is None or len(ser) == 0:
+            return None, limit
+        try:
+            ts = ser.column("ts")
+            first, last = int(ts[0]), int(ts[-1])
+            if last < want_start:
+                return None, limit
+            if first > want_start and first != ser.head_ts:
+                return None, limit
+            since = last  # last stored bar may still have been in progress
+            i = max(1, bisect.bisect_left(ts, want_start))
+            for k in range(i, len(ts)):
+                if ts[k] - ts[k - 1] > step:
+                    since = int(ts[k - 1]) + step
+                    break
+            del ts
+        finally:
+            ser.close()
+        return since, max(1, min(limit, (cur_open - since) // step + 1))
+
+    # ---------- writing ----------
+
+    def merge(self, symbol: str, tf: str, rows: Sequence[Sequence[Any]], *, full: bool, limit: int) -> None:
+        """Write a fetch response. full=True replaces the series; otherwise truncate-at-first-new + append."""
+        clean = {}
+        for r in rows or []:
+            try:
+                clean[int(r[0])] = [float(x) if x is not None else 0.0 for x in r[:ROW]]
+            except (TypeError, ValueError, IndexError):
+                continue
+        new = [clean[k] for k in sorted(clean)]
+        if not new:
+            return
+        path = self._path(symbol, tf)
+        head = 0
+        keep = 0
+        ser = None if full else self.open(symbol, tf)
+        if ser is not None:
+            head = ser.head_ts
+            keep = bisect.bisect_left(ser.column("ts"), new[0][0])
+            if keep + len(new) > self.max_bars:
+                old = ser.tail(len(ser))[:keep]
+                ser.close()
+                drop = keep + len(new) - self.max_bars
+                self._rewrite(path, head, old[drop:] + new)
+                return
+            ser.close()
+        elif full and len(new) < limit:
+            head = int(new[0][0])  # exchange had fewer bars than asked → history start
+
+        if ser is None:
+            self._rewrite(path, head, new[-self.max_bars:])
+            return
+        with open(path, "r+b") as f:
+            f.truncate(HEADER.size + keep * ROW_BYTES)
+            f.seek(0, os.SEEK_END)
+            f.write(_pack(new))
+
+    def _rewrite(self, path: str, head: int, rows: List[list]) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, int(head)))
+            f.write(_pack(rows))
+        os.replace(tmp, path)
+
+    # ---------- reading ----------
+
+    def window(self, symbol: str, tf: str, limit: int) -> List[list]:
+        ser = self.open(symbol, tf)
+        if ser is None:
+            return []
+        try:
+            return ser.tail(limit)
+        finally:
+            ser.close()
+
+    def fetch(self, ex, symbol: str, tf: str, limit: int) -> List[list]:
+        """Sync read-through: fetch only the missing bars, return the last `limit`."""
+        since, n = self.plan(symbol, tf, limit, ex.milliseconds())
+        rows = ex.fetch_ohlcv(symbol, timeframe=tf, since=since, limit=n)
+        self.merge(symbol, tf, rows, full=since is None, limit=limit)
+        return self.window(symbol, tf, limit)
+
+
+def _pack(rows: List[list]) -> bytes:
+    flat = [float(x) for r in rows for x in (list(r[:ROW]) + [0.0] * (ROW - len(r)))]
+    return struct.pack(f"<{len(flat)}d", *flat)
+
+
+def fetch_windows(fetcher, store: Optional[CandleStore], specs: Sequence[Tuple[str, str, int]], now_ms: int) -> List[Any]:
+    """
+    Batch read-through for the scanner: specs = [(symbol, tf, limit)].
+    Requests go through `fetcher.fetch_many` (serial or async pool).
+    Result per spec: OHLCV window or the Exception from its request.
+    """
+    if store is None:
+        return fetcher.fetch_many([(s, tf, lim, None) for s, tf, lim in specs])
+    plans = [store.plan(s, tf, lim, now_ms) for s, tf, lim in specs]
+    res = fetcher.fetch_many([(s, tf, n, since) for (s, tf, _), (since, n) in zip(specs, plans)])
+    out: List[Any] = []
+    for (s, tf, lim), (since, _), r in zip(specs, plans, res):
+        if isinstance(r, Exception):
+            out.append(r)
+            continue
+        try:
+            store.merge(s, tf, r, full=since is None, limit=lim)
+            out.append(store.window(s, tf, lim))
+        except OSError as e:
+            print(f"[warn] candle store yazılamadı ({s} {tf}): {e}")
+            out.append(r[-lim:])
+    return out
+
+
+def default_store() -> Optional[CandleStore]:
+    """CANDLE_STORE_DIR env (varsayılan .cache/candles); 'off'/'0' ile kapatılır."""
+    root = os.environ.get("CANDLE_STORE_DIR", "") or DEFAULT_DIR
+    if root.strip().lower() in ("0", "off", "none", "false"):
+        return None
+    try:
+        return CandleStore(root, int(os.environ.get("CANDLE_STORE_MAX_BARS", "") or DEFAULT_MAX_BARS))
+    except OSError as e:
+        print(f"[warn] candle store açılamadı ({root}): {e}")
+        return None
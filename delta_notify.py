@@ -0,0 +1,182 @@
+# delta_notify.py
+# Delta Telegram notifications: the previous run's candidate board (S / Top / FAST
+# entries as sent, grid bands included) is kept in a small JSON file, and a run only
+# sends what changed — entries, exits and band/metric shifts above a threshold.
+# The full list is still sent every `full_every_s` (and on the first run), so the chat
+# never drifts far from the real state. With edit=True a delta run edits the last full
+# message in place (no new message) instead of sending a change list.
+#
+#   state: {"last_full": epoch_s, "board": {list: {symbol: entry}}, "message_ids": [int]}
+
+import json, math, os, time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_PATH = ".cache/notify_state.json"
+LISTS = ("s", "top", "fast")
+SHIFT_METRICS = ("atr_pct", "range_pct", "adx")
+
+Board = Dict[str, Dict[str, Dict[str, Any]]]
+
+
+def make_board(s_behavior: Optional[Dict[str, Any]], top: List[Dict[str, Any]],
+               fast: List[Dict[str, Any]]) -> Board:
+    """_to_fmt_entry çıktılarından {list: {symbol: entry}} (sıra korunur)."""
+    return {
+        "s": {s_behavior["symbol"]: s_behavior} if s_behavior else {},
+        "top": {d["symbol"]: d for d in top},
+        "fast": {d["symbol"]: d for d in fast},
+    }
+
+
+def _num(x) -> float:
+    try:
+        v = float(x)
+        return v if math.isfinite(v) else float("nan")
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def shift_fields(old: Dict[str, Any], new: Dict[str, Any], band_tol: float, metric_tol: float) -> List[str]:
+    """
+    Anlamlı değişen alanlar:
+      grid      → bant kenarlarından biri fiyatın band_tol oranından fazla kaydı ya da seviye sayısı değişti
+      atr/range/adx → göreli değişim metric_tol'dan büyük
+    """
+    out = []
+    px = _num(new.get("last"))
+    if not px > 0:
+        px = _num(old.get("last"))
+    moved = max(abs(_num(new.get("grid_low")) - _num(old.get("grid_low"))),
+                abs(_num(new.get("grid_high")) - _num(old.get("grid_high"))))
+    if (px > 0 and moved > band_tol * px) or new.get("grid_lines") != old.get("grid_lines"):
+        out.append("grid")
+    for k in SHIFT_METRICS:
+        a, b = _num(old.get(k)), _num(new.get(k))
+        if math.isnan(a) or math.isnan(b):
+            continue
+        if abs(b - a) > metric_tol * max(abs(a), 1e-12):
+            out.append(k)
+    return out
+
+
+def diff(prev: Board, cur: Board, band_tol: float, metric_tol: float
+         ) -> Tuple[List[tuple], List[tuple], List[tuple], int]:
+    """(entered, exited, shifted, unchanged) — formatting.format_telegram_delta_message girdileri."""
+    entered, exited, shifted, same = [], [], [], 0
+    for lst in LISTS:
+        p, c = prev.get(lst) or {}, cur.get(lst) or {}
+        for sym, d in c.items():
+            if sym not in p:
+                entered.append((lst, d))
+                continue
+            fields = shift_fields(p[sym], d, band_tol, metric_tol)
+            if fields:
+                shifted.append((lst, p[sym], d, fields))
+            else:
+                same += 1
+        exited.extend((lst, d) for sym, d in p.items() if sym not in c)
+    return entered, exited, shifted, same
+
+
+class NotifyState:
+    def __init__(self, path: Optional[str] = DEFAULT_PATH):
+        self.path = path
+        self.last_full = 0.0
+        self.board: Board = {}
+        self.message_ids: List[int] = []
+        if path is None:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.last_full = float(data.get("last_full") or 0)
+            self.board = dict(data.get("board") or {})
+            self.message_ids = [int(m) for m in data.get("message_ids") or []]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[warn] notify state okunamadı ({path}): {e}")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"last_full": self.last_full, "board": self.board, "message_ids": self.message_ids}, f)
+        os.replace(tmp, self.path)
+
+
+def default_state() -> Optional[NotifyState]:
+    """NOTIFY_STATE_PATH env (varsayılan .cache/notify_state.json); 'off' ile kapatılır (her koşu tam liste)."""
+    path = os.environ.get("NOTIFY_STATE_PATH", "") or DEFAULT_PATH
+    if path.strip().lower() in ("0", "off", "none", "false"):
+        return None
+    return NotifyState(path)
+
+
+def publish(tg, state: Optional[NotifyState], board: Board, full_chunks: List[str], delta_compose,
+            *, full_every_s: float, band_tol: float, metric_tol: float, edit: bool = False,
+            now: float = None) -> str:
+    """
+    Bir koşunun Telegram çıktısı. delta_compose(entered, exited, shifted, unchanged) → chunks.
+    Dönüş: "full" | "delta" | "edit" | "none" (gönderilen bir şey yoksa).
+    """
+    now = time.time() if now is None else now
+    if state is None or not state.board or full_every_s <= 0 or now - state.last_full >= full_every_s:
+        _send_full(tg, state, board, full_chunks, now)
+        return "full"
+
+    entered, exited, shifted, same = diff(state.board, board, band_tol, metric_tol)
+    if not (entered or exited or shifted):
+        print(f"[info] önceki koşuya göre değişiklik yok ({same} aday); mesaj atılmadı")
+        return "none"
+
+    if edit and state.message_ids:
+        ids = list(state.message_ids)
+        for k, ch in enumerate(full_chunks):
+            if k < len(ids):
+                if not tg.edit_now(ids[k], ch, parse_mode="HTML", disable_preview=True):
+                    print("[info] önceki mesaj düzenlenemedi; tam liste yeniden gönderiliyor")
+                    _send_full(tg, state, board, full_chunks, now)
+                    return "full"
+            else:
+                ids.extend(tg.send_now(ch, parse_mode="HTML", disable_preview=True))
+        for mid in ids[len(full_chunks):]:   # liste kısaldı: artan eski parçalar boşaltılır
+            tg.edit_now(mid, "—")
+        state.board, state.message_ids = board, ids[:len(full_chunks)]
+        state.save()
+        return "edit"
+
+    ok = True
+    for ch in delta_compose(entered, exited, shifted, same):
+        ok = bool(tg.send_now(ch, parse_mode="HTML", disable_preview=True)) and ok
+    if ok:   # teslim edilemeyen değişiklik bir sonraki koşuda yeniden denenir
+        state.board = _notified(state.board, board, shifted)
+        state.save()
+    return "delta"
+
+
+def _notified(prev: Board, cur: Board, shifted: List[tuple]) -> Board:
+    """
+    Bildirilen son hâl: eşik altında kalan adaylar eski değerleriyle tutulur, böylece
+    yavaş kayma birikip eşiği aştığında yakalanır.
+    """
+    moved = {(lst, new["symbol"]) for lst, _, new, _ in shifted}
+    out = {}
+    for lst in LISTS:
+        p = prev.get(lst) or {}
+        out[lst] = {sym: (p[sym] if sym in p and (lst, sym) not in moved else d)
+                    for sym, d in (cur.get(lst) or {}).items()}
+    return out
+
+
+def _send_full(tg, state: Optional[NotifyState], board: Board, full_chunks: List[str], now: float) -> None:
+    ids = []
+    for ch in full_chunks:
+        ids.extend(tg.send_now(ch, parse_mode="HTML", disable_preview=True))
+    if state is not None and ids:
+        state.last_full, state.board, state.message_ids = now, board, ids
+        state.save()
@@ -0,0 +1,177 @@
+# fetch_pool.py
+# Concurrent OHLCV fetching for the BingX scanner (ccxt.async_support).
+# Bounded worker pool + weighted token bucket so the combined request rate stays
+# inside BingX's public market-data budget. Results come back in job order.
+
+import asyncio, multiprocessing, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import ccxt
+import ccxt.async_support as ccxt_async
+
+# BingX swap public endpoints are weight 1 each (ccxt api 'cost'); the documented
+# IP budget for market data is ~100 req / 10 s. ccxt's own bingx rateLimit is 100ms.
+REQUEST_WEIGHT: Dict[str, float] = {
+    "fetch_ohlcv": 1.0,
+    "fetch_ticker": 1.0,
+    "fetch_tickers": 1.0,
+}
+
+# (symbol, timeframe, limit, since)
+OhlcvJob = Tuple[str, str, int, Optional[int]]
+
+
+class AsyncTokenBucket:
+    """Weighted token bucket: `rate` tokens/sec, burst up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = max(float(rate), 1e-6)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._ts = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, weight: float = 1.0) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._ts) * self.rate)
+                self._ts = now
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return
+                await asyncio.sleep((weight - self._tokens) / self.rate)
+
+
+class SharedTokenBucket:
+    """
+    Cross-process weighted token bucket: state (tokens, last ts) lives in shared
+    memory, so worker processes (sharded scan) draw from one combined budget.
+    time.monotonic() is system-wide on Linux/macOS, so refill is consistent across processes.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, ctx=None):
+        self.rate = max(float(rate), 1e-6)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._state = (ctx or multiprocessing).Array("d", [self.capacity, time.monotonic()])
+
+    def take(self, weight: float = 1.0) -> float:
+        """Token düşer ve 0 döner; yetmiyorsa beklenecek saniye (hiçbir şey düşmez)."""
+        with self._state.get_lock():
+            now = time.monotonic()
+            tokens = min(self.capacity, self._state[0] + (now - self._state[1]) * self.rate)
+            self._state[1] = now
+            if tokens >= weight:
+                self._state[0] = tokens - weight
+                return 0.0
+            self._state[0] = tokens
+            return (weight - tokens) / self.rate
+
+    def acquire(self, weight: float = 1.0) -> None:
+        wait = self.take(weight)
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.take(weight)
+
+    async def acquire_async(self, weight: float = 1.0) -> None:
+        wait = self.take(weight)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.take(weight)
+
+
+class OhlcvPool:
+    """
+    Async twin of a sync ccxt exchange with a bounded worker pool.
+    - workers: eşzamanlı istek sayısı üst sınırı
+    - rate   : ağırlıklı istek/sn bütçesi (REQUEST_WEIGHT)
+    - observer: observer("fetch_ohlcv", seconds, err_or_None) her istekten sonra (bucket beklemesi hariç)
+    - shared  : SharedTokenBucket verilirse `rate` yerine süreçler arası ortak bütçe kullanılır
+    Markets are copied from the sync instance, so no extra load_markets request.
+    """
+
+    def __init__(self, sync_ex, workers: int = 6, rate: float = 8.0, observer=None,
+                 shared: SharedTokenBucket = None):
+        self.workers = max(1, int(workers))
+        self.rate = float(rate)
+        self.observer = observer
+        self.shared = shared
+        self._loop = asyncio.new_event_loop()
+        cls = getattr(ccxt_async, sync_ex.id)
+        self._aex = cls({"enableRateLimit": True, "options": dict(sync_ex.options or {})})
+        if getattr(sync_ex, "markets", None):
+            self._aex.set_markets(sync_ex.markets, getattr(sync_ex, "currencies", None))
+        self._bucket = None
+
+    async def _one(self, sem: asyncio.Semaphore, job: OhlcvJob):
+        sym, tf, limit, since = job
+        async with sem:
+            if self.shared is not None:
+                await self.shared.acquire_async(REQUEST_WEIGHT["fetch_ohlcv"])
+            else:
+                await self._bucket.acquire(REQUEST_WEIGHT["fetch_ohlcv"])
+            t0 = time.perf_counter()
+            try:
+                res = await self._aex.fetch_ohlcv(sym, timeframe=tf, since=since, limit=limit)
+            except Exception as e:  # NetworkError / ExchangeError → caller decides
+                res = e
+            if self.observer is not None:
+                self.observer("fetch_ohlcv", time.perf_counter() - t0, res if isinstance(res, Exception) else None)
+            return res
+
+    async def _run(self, jobs: Sequence[OhlcvJob]) -> List[Any]:
+        if self._bucket is None:
+            self._bucket = AsyncTokenBucket(self.rate)
+        sem = asyncio.Semaphore(self.workers)
+        return await asyncio.gather(*(self._one(sem, j) for j in jobs))
+
+    def fetch_many(self, jobs: Sequence[OhlcvJob]) -> List[Any]:
+        """Her job için OHLCV listesi ya da Exception döner (job sırasıyla)."""
+        if not jobs:
+            return []
+        return self._loop.run_until_complete(self._run(list(jobs)))
+
+    def close(self) -> None:
+        try:
+            self._loop.run_until_complete(self._aex.close())
+        finally:
+            self._loop.close()
+
+
+class SerialFetcher:
+    """Sync path: same interface as OhlcvPool, one request at a time (shared → ortak bütçe, pause yok)."""
+
+    def __init__(self, ex, pause: float = 0.25, shared: SharedTokenBucket = None):
+        self.ex = ex
+        self.pause = 0.0 if shared is not None else pause
+        self.shared = shared
+
+    def fetch_many(self, jobs: Sequence[OhlcvJob]) -> List[Any]:
+        out: List[Any] = []
+        for sym, tf, limit, since in jobs:
+            if self.shared is not None:
+                self.shared.acquire(REQUEST_WEIGHT["fetch_ohlcv"])
+            try:
+                out.append(self.ex.fetch_ohlcv(sym, timeframe=tf, since=since, limit=limit))
+            except Exception as e:
+                out.append(e)
+            if self.pause:
+                time.sleep(self.pause)
+        return out
+
+    def close(self) -> None:
+        pass
+
+
+def make_fetcher(ex, workers: int, rate: float, observer=None, shared: SharedTokenBucket = None):
+    """
+    workers <= 1 → serial (eski davranış), aksi halde async havuz.
+    Serial yol istekleri `ex` üzerinden yapar; ölçüm için ex sarılır, observer sadece havuza gider.
+    """
+    if workers and workers > 1 and hasattr(ccxt_async, getattr(ex, "id", "")):
+        return OhlcvPool(ex, workers=workers, rate=rate, observer=observer, shared=shared)
+    return SerialFetcher(ex, shared=shared)
+
+
+def is_network_error(res: Any) -> bool:
+    return isinstance(res, ccxt.NetworkError)
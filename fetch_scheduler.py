@@ -0,0 +1,164 @@
+# fetch_scheduler.py
+# One fetch scheduler for several exchanges (multi-venue scan).
+# A single asyncio loop runs in a background thread; every venue has its own async
+# exchange, token bucket (req/s budget) and in-flight cap, so venues never wait on each
+# other: a slow or rate-limited venue only delays its own jobs while the loop keeps
+# serving the rest. Scanner threads call fetcher(venue).fetch_many(jobs), the same
+# interface as fetch_pool.OhlcvPool / SerialFetcher.
+#
+# Offline fairness check with fake venues (no network):
+#   python fetch_scheduler.py --fake slow:2:0.5 fast:20:0.01 --jobs 40
+# (tests/test_fetch_scheduler.py asserts the same property.)
+
+import argparse, asyncio, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence
+
+import ccxt
+import ccxt.async_support as ccxt_async
+
+from fetch_pool import REQUEST_WEIGHT, AsyncTokenBucket, OhlcvJob
+
+
+class _Venue:
+    def __init__(self, aex, rate: float, workers: int, observer=None):
+        self.aex = aex
+        self.bucket = AsyncTokenBucket(rate)
+        self.sem = asyncio.Semaphore(max(1, int(workers)))
+        self.observer = observer
+
+
+class FetchScheduler:
+    """
+    Per-venue OHLCV fetching on one event loop.
+      add_exchange(name, sync_ex, rate, workers)  ccxt async twin (markets kopyalanır)
+      add_venue(name, aex, rate, workers)         herhangi bir async exchange (FakeAsyncExchange)
+      fetcher(name).fetch_many(jobs)              thread-safe; sonuçlar job sırasıyla
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fetch-scheduler", daemon=True)
+        self._thread.start()
+        self._venues: Dict[str, _Venue] = {}
+
+    def add_venue(self, name: str, aex, rate: float, workers: int, observer=None) -> None:
+        async def make():
+            return _Venue(aex, rate, workers, observer)
+        self._venues[name] = asyncio.run_coroutine_threadsafe(make(), self._loop).result()
+
+    def add_exchange(self, name: str, sync_ex, rate: float, workers: int, observer=None) -> None:
+        cls = getattr(ccxt_async, sync_ex.id)
+        aex = cls({"enableRateLimit": True, "options": dict(sync_ex.options or {})})
+        if getattr(sync_ex, "markets", None):
+            aex.set_markets(sync_ex.markets, getattr(sync_ex, "currencies", None))
+        self.add_venue(name, aex, rate, workers, observer)
+
+    async def _one(self, v: _Venue, job: OhlcvJob):
+        sym, tf, limit, since = job
+        async with v.sem:
+            await v.bucket.acquire(REQUEST_WEIGHT["fetch_ohlcv"])
+            t0 = time.perf_counter()
+            try:
+                res = await v.aex.fetch_ohlcv(sym, timeframe=tf, since=since, limit=limit)
+            except Exception as e:  # NetworkError / ExchangeError → caller decides
+                res = e
+            if v.observer is not None:
+                v.observer("fetch_ohlcv", time.perf_counter() - t0, res if isinstance(res, Exception) else None)
+            return res
+
+    async def _run(self, v: _Venue, jobs: Sequence[OhlcvJob]) -> List[Any]:
+        return await asyncio.gather(*(self._one(v, j) for j in jobs))
+
+    def fetch_many(self, venue: str, jobs: Sequence[OhlcvJob]) -> List[Any]:
+        if not jobs:
+            return []
+        v = self._venues[venue]
+        return asyncio.run_coroutine_threadsafe(self._run(v, list(jobs)), self._loop).result()
+
+    def fetcher(self, venue: str) -> "VenueFetcher":
+        return VenueFetcher(self, venue)
+
+    def close(self) -> None:
+        async def close_all():
+            for v in self._venues.values():
+                try:
+                    await v.aex.close()
+                except Exception:
+                    pass
+        try:
+            asyncio.run_coroutine_threadsafe(close_all(), self._loop).result(timeout=30)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+
+
+class VenueFetcher:
+    """scan_pairs fetcher for one venue of a FetchScheduler (close() is the scheduler's job)."""
+
+    def __init__(self, sched: FetchScheduler, venue: str):
+        self.sched = sched
+        self.venue = venue
+
+    def fetch_many(self, jobs: Sequence[OhlcvJob]) -> List[Any]:
+        return self.sched.fetch_many(self.venue, jobs)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeAsyncExchange:
+    """Offline async exchange: fixed latency, synthetic bars, call timestamps kept for fairness checks."""
+
+    def __init__(self, name: str, latency: float = 0.05, fail_every: int = 0):
+        self.id = name
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls: List[float] = []
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        await asyncio.sleep(self.latency)
+        self.calls.append(time.monotonic())
+        if self.fail_every and len(self.calls) % self.fail_every == 0:
+            raise ccxt.NetworkError(f"{self.id}: fake timeout")
+        step = 60_000
+        start = (since or 1_700_000_000_000)
+        return [[start + k * step, 1.0, 1.0, 1.0, 1.0, 0.0] for k in range(limit or 1)]
+
+    async def close(self) -> None:
+        pass
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FetchScheduler fairness check (fake venues, no network)")
+    ap.add_argument("--fake", nargs="+", default=["slow:2:0.5", "fast:20:0.01"],
+                    help="name:rate:latency_s (workers = --workers)")
+    ap.add_argument("--jobs", type=int, default=40)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+
+    sched = FetchScheduler()
+    fakes = {}
+    for spec in args.fake:
+        name, rate, latency = spec.split(":")
+        fakes[name] = FakeAsyncExchange(name, float(latency))
+        sched.add_venue(name, fakes[name], float(rate), args.workers)
+
+    def run(name: str):
+        t0 = time.monotonic()
+        res = sched.fetcher(name).fetch_many([(f"S{k}", "1m", 5, None) for k in range(args.jobs)])
+        return name, time.monotonic() - t0, sum(1 for r in res if isinstance(r, Exception))
+
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(len(fakes)) as pool:
+        results = list(pool.map(run, fakes))
+    sched.close()
+    for name, took, errs in results:
+        rate = args.jobs / took if took > 0 else float("inf")
+        print(f"{name:>8}: {args.jobs} job {took:6.2f}s ({rate:.1f} req/s, hata {errs})")
+    print(f"toplam: {time.monotonic() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
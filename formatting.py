@@ -1,10 +1,13 @@
 # formatting.py
 # Rich Telegram message formatting for BingX Grid Scan
-# No pin logic, no file/CSV emission. Returns a list[str] (each is a chunk).
+# No pin logic, no file/CSV emission. Returns a list[str] (each is one Telegram message,
+# candidate blocks are never split across messages).
 
 from typing import List, Dict, Any, Optional
 import html
 
+from src.core.notifier import MAX_LEN, split_message, tg_len
+
 # === number formatting helpers ===
 
 def _fmt_pct(x) -> str:
@@ -115,59 +118,108 @@ def _render_candidate_item(idx: int, d: Dict[str, Any]) -> str:
     ]
     return "\n".join([ln for ln in lines if ln])
 
+TOP_TITLE = "<b>📋 BingX Grid Scan — En İyi Adaylar</b>"
+FAST_TITLE = "<b>⚡ FAST-S — Wide & Quick S</b>"
+
+def _section_units(title: str, items: List[Dict[str, Any]]) -> List[str]:
+    """Başlık ilk adayla aynı birimde (başlık tek başına mesaj sonunda kalmaz); her aday ayrı birim."""
+    units = [_render_candidate_item(i, d) for i, d in enumerate(items, 1)]
+    if units:
+        units[0] = title + "\n" + units[0]
+    return units
+
 def format_top_candidates_block(items: List[Dict[str, Any]]) -> Optional[str]:
-    if not items:
-        return None
-    out = ["<b>📋 BingX Grid Scan — En İyi Adaylar</b>"]
-    for i, d in enumerate(items, 1):
-        out.append(_render_candidate_item(i, d))
-        out.append("")  # no long separators
-    if out and out[-1] == "":
-        out.pop()
-    return "\n".join(out)
+    return UNIT_SEP.join(_section_units(TOP_TITLE, items)) or None
 
 def format_fast_candidates_block(items: List[Dict[str, Any]]) -> Optional[str]:
-    if not items:
-        return None
-    out = ["<b>⚡ FAST-S — Wide & Quick S</b>"]
-    for i, d in enumerate(items, 1):
-        out.append(_render_candidate_item(i, d))
-        out.append("")
-    if out and out[-1] == "":
-        out.pop()
-    return "\n".join(out)
+    return UNIT_SEP.join(_section_units(FAST_TITLE, items)) or None
 
 # === final composer ===
-
-def _split_chunks(text: str, max_len: int = 3500) -> List[str]:
-    if not text or len(text) <= max_len:
-        return [text] if text else []
-    parts, buf, size = [], [], 0
-    for ln in text.splitlines(keepends=True):
-        if size + len(ln) > max_len and buf:
-            parts.append("".join(buf)); buf, size = [], 0
-        buf.append(ln); size += len(ln)
-    if buf:
-        parts.append("".join(buf))
-    return parts
+# Mesajlar bölünmez birimlerden (başlık, S bloğu, her aday) oluşur; birimler sırayla
+# açgözlü paketlenir. Sıra korunarak (sıralama anlamlı) bu, en az mesaj sayısını verir:
+# bir birim mevcut mesaja sığıyorsa onu sonraya bırakmak hiçbir zaman mesaj kazandırmaz.
+
+UNIT_SEP = "\n\n"
+SEP_LEN = tg_len(UNIT_SEP)
+
+def pack_units(units: List[str], limit: int = MAX_LEN) -> List[str]:
+    """Birimleri limit (UTF-16) altında en az mesaja paketler; her birimin uzunluğu bir kez ölçülür."""
+    out: List[str] = []
+    cur: List[str] = []
+    size = 0
+    for u in units:
+        if not u:
+            continue
+        n = tg_len(u)
+        if n > limit:   # tek birim sığmıyor (pratikte olmaz): satır sınırında bölünür
+            if cur:
+                out.append(UNIT_SEP.join(cur)); cur, size = [], 0
+            out.extend(split_message(u, limit))
+            continue
+        if cur and size + SEP_LEN + n > limit:
+            out.append(UNIT_SEP.join(cur)); cur, size = [], 0
+        size += (SEP_LEN if cur else 0) + n
+        cur.append(u)
+    if cur:
+        out.append(UNIT_SEP.join(cur))
+    return out
+
+def _header(title: str, scan_started_at: str, digest: Optional[str]) -> str:
+    return "\n".join([title, _esc(scan_started_at)] + ([f"<i>{_esc(digest)}</i>"] if digest else []))
 
 def format_telegram_scan_message(*, scan_started_at: str, s_behavior: Optional[Dict[str, Any]] = None,
                                  top_candidates: Optional[List[Dict[str, Any]]] = None,
-                                 fast_candidates: Optional[List[Dict[str, Any]]] = None) -> List[str]:
-    header_lines = [
-        "<b>🟢 Scanner Up — Starting Scan</b>",
-        _esc(scan_started_at),
-        ""
-    ]
-    blocks = []
-    sb = format_s_behavior_block(s_behavior) if s_behavior else None
-    if sb:
-        blocks.append(sb); blocks.append("")
-    topb = format_top_candidates_block(top_candidates or [])
-    if topb:
-        blocks.append(topb); blocks.append("")
-    fastb = format_fast_candidates_block(fast_candidates or [])
-    if fastb:
-        blocks.append(fastb)
-    text = "\n".join(header_lines + blocks).strip()
-    return _split_chunks(text, max_len=3500)
+                                 fast_candidates: Optional[List[Dict[str, Any]]] = None,
+                                 digest: Optional[str] = None) -> List[str]:
+    units = [_header("<b>🟢 Scanner Up — Starting Scan</b>", scan_started_at, digest)]
+    if s_behavior:
+        units.append(format_s_behavior_block(s_behavior))
+    units += _section_units(TOP_TITLE, top_candidates or [])
+    units += _section_units(FAST_TITLE, fast_candidates or [])
+    return pack_units(units)
+
+# === delta (değişiklik) mesajı ===
+
+_LIST_LABEL = {"s": "S", "top": "Top", "fast": "FAST"}
+
+def _fmt_grid(d: Dict[str, Any]) -> str:
+    return f"[{_fmt_price(d.get('grid_low'))} – {_fmt_price(d.get('grid_high'))}] × {d.get('grid_lines', 12)}"
+
+def _render_shift_item(lst: str, old: Dict[str, Any], new: Dict[str, Any], fields: List[str]) -> str:
+    lines = [f"🔄 {_esc(new.get('symbol', '-'))} ({_LIST_LABEL.get(lst, lst)})"]
+    for f in fields:
+        if f == "grid":
+            lines.append(f" • Grid: {_fmt_grid(old)} → {_fmt_grid(new)}")
+        elif f == "adx":
+            lines.append(f" • ADX: ≈{_fmt_float(old.get('adx'), 1)} → ≈{_fmt_float(new.get('adx'), 1)}")
+        elif f == "atr_pct":
+            lines.append(f" • ATR: {_fmt_pct(old.get('atr_pct'))} → {_fmt_pct(new.get('atr_pct'))}")
+        elif f == "range_pct":
+            lines.append(f" • Range: ≈{_fmt_pct(old.get('range_pct'))} → ≈{_fmt_pct(new.get('range_pct'))}")
+    return "\n".join(lines)
+
+def format_telegram_delta_message(*, scan_started_at: str,
+                                  entered: List[tuple], exited: List[tuple], shifted: List[tuple],
+                                  unchanged: int = 0, digest: Optional[str] = None) -> List[str]:
+    """
+    Önceki koşuya göre değişiklikler:
+      entered/exited: [(list, entry)]   shifted: [(list, old, new, fields)]
+    """
+    units = [_header("<b>🔁 Scanner — Değişiklikler</b>", scan_started_at, digest)]
+    new_items = []
+    for i, (lst, d) in enumerate(entered, 1):
+        first, _, rest = _render_candidate_item(i, d).partition("\n")
+        new_items.append(f"{first} ({_LIST_LABEL.get(lst, lst)})\n{rest}")
+    if new_items:
+        new_items[0] = "<b>🆕 Yeni Adaylar</b>\n" + new_items[0]
+        units += new_items
+    moved = [_render_shift_item(lst, old, new, fields) for lst, old, new, fields in shifted]
+    if moved:
+        moved[0] = "<b>📐 Bant / Metrik Değişimi</b>\n" + moved[0]
+        units += moved
+    if exited:
+        units.append("<b>❌ Listeden Çıkanlar</b>\n"
+                     + "\n".join(f"• {_esc(d.get('symbol', '-'))} ({_LIST_LABEL.get(lst, lst)})" for lst, d in exited))
+    if unchanged:
+        units.append(f"<i>{unchanged} aday değişmedi</i>")
+    return pack_units(units)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch grid sizer: many (symbol, lower, upper, levels, capital) rows in one run.
+- markets bir kez (market_cache snapshot'ı), son fiyatlar tek fetch_tickers çağrısıyla
+- bütün planların seviyeleri tek düz NumPy dizisinde hesaplanır (satır başına döngü yok);
+  sonuçlar grid_sizer.plan_grid ile birebir aynıdır
+- çıktı tek CSV (seviye başına satır) ya da JSON (plan listesi)
+
+Girdi: CSV (başlık: symbol,lower,upper,levels,capital[,reserve,lev]) ya da aynı alanlarla
+JSON liste. Scanner tarafında rows_from_fmt(top_fmt + fast_fmt, capital) aynı satırları üretir.
+
+  python grid_batch.py --in rows.csv --out plans.csv
+  python grid_batch.py --in rows.json --out plans.json --capital 200
+"""
+from __future__ import annotations
+
+import argparse, csv, json, time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+import ccxt
+from grid_sizer import Lattice, qty_ticks_vec, ticks_to_float, ticks_vec
+from market_cache import default_market_cache, market_filters
+
+ORDER_FIELDS = ["symbol", "lvl", "side", "price", "qty", "notional", "tp"]
+
+
+def _row(r: Dict[str, Any], capital: float) -> Dict[str, Any]:
+    return {
+        "symbol": str(r["symbol"]).strip(),
+        "lower": float(r["lower"]),
+        "upper": float(r["upper"]),
+        "levels": int(float(r.get("levels") or 12)),
+        "capital": float(r.get("capital") or capital),
+        "reserve": float(r.get("reserve") or 0.05),
+        "lev": int(float(r.get("lev") or 3)),
+    }
+
+
+def load_rows(path: str, capital: float = 100.0) -> List[Dict[str, Any]]:
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            raw = list(csv.DictReader(f))
+    return [_row(r, capital) for r in raw]
+
+
+def rows_from_fmt(entries: Sequence[Dict[str, Any]], capital: float) -> List[Dict[str, Any]]:
+    """Scanner _to_fmt_entry çıktıları (top_fmt/fast_fmt) → satırlar; aynı sembol bir kez."""
+    out, seen = [], set()
+    for d in entries:
+        sym = str(d.get("symbol") or "").split(" · ")[0]
+        lo, hi = d.get("grid_low"), d.get("grid_high")
+        if not sym or sym in seen or lo is None or hi is None:
+            continue
+        seen.add(sym)
+        out.append(_row({"symbol": sym, "lower": lo, "upper": hi, "levels": d.get("grid_lines") or 12}, capital))
+    return out
+
+
+def size_grids(rows: Sequence[Dict[str, Any]], filters: Sequence[Sequence[float]], last: Sequence[float],
+               steps_out_for_sl: int = 2) -> List[Dict[str, Any]]:
+    """
+    Ağsız vektörel çekirdek: rows[k] için filters[k] (extract_filters) ve last[k].
+    Dönüş plan_grid ile aynı biçimde plan listesi. Uç tick'ler ticks_vec ile (yalnızca
+    tamsayıya yakın olanlar skaler Lattice); seviye/miktar tick'leri düz int64 dizileri.
+    """
+    n = len(rows)
+    if not n:
+        return []
+    lower = np.array([r["lower"] for r in rows], dtype=np.float64)
+    upper = np.array([r["upper"] for r in rows], dtype=np.float64)
+    levels = np.array([r["levels"] for r in rows], dtype=np.int64)
+    capital = np.array([r["capital"] for r in rows], dtype=np.float64)
+    reserve = np.array([r["reserve"] for r in rows], dtype=np.float64)
+    f = np.asarray(filters, dtype=np.float64).reshape(n, 5)
+    ps, qs, min_not, min_qty, min_px = (f[:, k] for k in range(5))
+
+    step_abs = (upper - lower) / (levels - 1)
+    mid = (upper + lower) / 2.0
+    per_q = capital * (1.0 - reserve) / levels
+
+    plats = [Lattice(s) for s in ps.tolist()]
+    qlats = [Lattice(s) for s in qs.tolist()]
+    p_unit = np.array([pl.unit for pl in plats], dtype=np.int64)
+    p_scale = np.array([pl.scale for pl in plats], dtype=np.float64)
+    q_unit = np.array([ql.unit for ql in qlats], dtype=np.int64)
+    q_scale = np.array([ql.scale for ql in qlats], dtype=np.float64)
+    k_lo = ticks_vec(lower, plats)
+    span = ticks_vec(upper, plats) - k_lo
+    k_mid = ticks_vec(mid, plats)
+    k_min_px = ticks_vec(min_px, plats, "up")
+    k_min_qty = ticks_vec(min_qty, qlats, "up")
+
+    # düz seviye dizisi: r = plan indeksi, i = plan içindeki seviye
+    r = np.repeat(np.arange(n), levels)
+    start = np.concatenate(([0], np.cumsum(levels)[:-1]))
+    i = np.arange(int(levels.sum())) - start[r]
+    k = k_lo[r] + (i * span[r]) // np.maximum(levels - 1, 1)[r]
+    buy = k <= k_mid[r]
+
+    kp = np.maximum(k, k_min_px[r])
+    kp1 = np.maximum(kp, 1)
+    steps = ps * qs
+    kq = np.maximum(qty_ticks_vec(per_q[r], kp1, r, steps, plats, qlats), k_min_qty[r])
+    kb = qty_ticks_vec(min_not[r], kp1, r, steps, plats, qlats, "up")
+    bump = kb > kq
+    p = ticks_to_float(kp, p_unit[r], p_scale[r])
+    extra = np.where(bump, ticks_to_float(kb - kq, q_unit[r], q_scale[r]) * p, 0.0)
+    qty = ticks_to_float(np.where(bump, kb, kq), q_unit[r], q_scale[r])
+    notional = p * qty
+
+    j = np.where(buy, np.minimum(i + 1, levels[r] - 1), np.maximum(i - 1, 0))
+    tp = ticks_to_float(k[start[r] + j], p_unit[r], p_scale[r])
+
+    total = np.bincount(r, weights=notional, minlength=n)
+    extra_tot = np.bincount(r, weights=extra, minlength=n)
+    sl_up = upper + steps_out_for_sl * step_abs
+    sl_lo = lower - steps_out_for_sl * step_abs
+
+    p_l, q_l, n_l, tp_l, buy_l = p.tolist(), qty.tolist(), notional.tolist(), tp.tolist(), buy.tolist()
+    plans = []
+    for k, row in enumerate(rows):
+        a, b = int(start[k]), int(start[k] + levels[k])
+        plans.append({
+            "symbol": row["symbol"],
+            "price_step": float(ps[k]), "qty_step": float(qs[k]), "min_notional": float(min_not[k]),
+            "min_qty": float(min_qty[k]), "min_price": float(min_px[k]),
+            "lower": row["lower"], "upper": row["upper"], "levels": row["levels"],
+            "step_abs": float(step_abs[k]), "step_pct": float(step_abs[k] / mid[k]), "mid": float(mid[k]),
+            "per_order_quote": float(per_q[k]), "capital": row["capital"], "reserve": row["reserve"],
+            "leverage": row["lev"],
+            "orders": [{"lvl": x - a + 1, "side": "BUY" if buy_l[x] else "SELL", "price": p_l[x], "qty": q_l[x],
+                        "notional": round(n_l[x], 2), "tp": tp_l[x]} for x in range(a, b)],
+            "total_quote": round(float(total[k]), 2),
+            "extra_quote_needed": round(float(extra_tot[k]), 2),
+            "sl_upper": float(sl_up[k]), "sl_lower": float(sl_lo[k]),
+            "last": float(last[k]),
+        })
+    return plans
+
+
+def _fetch_last(ex, symbols: List[str]) -> Dict[str, float]:
+    """Tek toplu fetch_tickers; sembol listesi desteklenmezse tüm tickers süzülür."""
+    try:
+        tickers = ex.fetch_tickers(symbols)
+    except Exception as e:
+        print("[info] fetch_tickers(symbols) desteklenmedi, tüm tickers çekiliyor…", e)
+        tickers = ex.fetch_tickers()
+    out = {}
+    for s in symbols:
+        t = tickers.get(s) or {}
+        v = t.get("last") or t.get("close")
+        if v:
+            out[s] = float(v)
+    return out
+
+
+def build_grids(rows: Sequence[Dict[str, Any]], ex=None, last: Optional[Dict[str, float]] = None,
+                steps_out_for_sl: int = 2) -> List[Dict[str, Any]]:
+    """
+    Çok sembollü build_grid: markets bir kez, fiyatlar tek çağrıda (ya da `last` ile verilir).
+    Geçersiz satırlar ve bulunamayan semboller uyarıyla atlanır.
+    """
+    ex = ex or ccxt.bingx({"enableRateLimit": True, "options": {"defaultType": "swap"}})
+    markets = getattr(ex, "markets", None)
+    if not markets:   # scanner'ın exchange'i zaten yüklü gelir
+        cache = default_market_cache(ex.id)
+        markets = cache.load(ex) if cache is not None else ex.load_markets()
+    ok = []
+    for r in rows:
+        if not (r["levels"] >= 2 and r["upper"] > r["lower"] > 0):
+            print(f"[warn] {r['symbol']}: geçersiz grid parametreleri, atlandı")
+        elif r["symbol"] not in markets:
+            print(f"[warn] {r['symbol']}: sembol bulunamadı, atlandı")
+        else:
+            ok.append(r)
+    if not ok:
+        return []
+    prices = dict(last or {})
+    missing = sorted({r["symbol"] for r in ok if not prices.get(r["symbol"])})
+    if missing:
+        prices.update(_fetch_last(ex, missing))
+    rows_p = [r for r in ok if prices.get(r["symbol"])]
+    for r in ok:
+        if not prices.get(r["symbol"]):
+            print(f"[warn] {r['symbol']}: fiyat yok, atlandı")
+    return size_grids(rows_p, [market_filters(ex, r["symbol"]) for r in rows_p],
+                      [prices[r["symbol"]] for r in rows_p], steps_out_for_sl)
+
+
+def write_plans(plans: List[Dict[str, Any]], path: str) -> None:
+    """JSON: plan listesi; CSV: seviye başına satır (planlarda venue varsa venue sütunu eklenir)."""
+    if path.endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(plans, f, indent=1)
+        return
+    venues = any("venue" in pl for pl in plans)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=ORDER_FIELDS + (["venue"] if venues else []))
+        w.writeheader()
+        for pl in plans:
+            extra = {"venue": pl.get("venue", "")} if venues else {}
+            for o in pl["orders"]:
+                w.writerow({"symbol": pl["symbol"], **o, **extra})
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="BingX USDT-M batch grid sizer")
+    ap.add_argument("--in", dest="src", required=True, help="satırlar: .csv ya da .json")
+    ap.add_argument("--out", required=True, help="planlar: .csv (seviye başına) ya da .json")
+    ap.add_argument("--capital", type=float, default=100.0, help="satırda capital yoksa")
+    ap.add_argument("--sl_steps", type=int, default=2)
+    args = ap.parse_args()
+
+    rows = load_rows(args.src, args.capital)
+    t0 = time.perf_counter()
+    plans = build_grids(rows, steps_out_for_sl=args.sl_steps)
+    write_plans(plans, args.out)
+    print(f"{len(plans)}/{len(rows)} plan, {sum(len(p['orders']) for p in plans)} emir"
+          f" → {args.out} ({time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@
 import re, sys, argparse
 from pathlib import Path
 
+from resample import SCAN_TFS
+from scan_history import DEFAULT_VENUE, ScanHistory
+
 DASH = r"(?:—|-)"
 ELLIPSIS = r"(?:…|\.\.\.)"
 
@@ -34,10 +37,50 @@ def parse_line(line):
         "lrng": lrng, "cv": cv, "drift": drift, "altR": altR,
     }
 
+def item_from_row(r):
+    """scan_history satırı → parse_line ile aynı alanlar (cv/score yok: filtrelenmez)."""
+    low, high = r["grid_lower"], r["grid_upper"]
+    mid = (low + high) / 2.0
+    lrng = r["range_pct"] * 100.0
+    sym = r["symbol"] if r.get("venue", DEFAULT_VENUE) == DEFAULT_VENUE else f"{r['symbol']} [{r['venue']}]"
+    raw = (f"— {sym} | Lrng {lrng:.2f}% | d {r['drift_ratio']:.2f} | adx {r['adx']:.1f}"
+           f" | mid× {r['midcross']} | grid [{low:.6g} … {high:.6g}] mid {mid:.6g}")
+    return {
+        "raw": raw, "sym": r["symbol"], "low": low, "high": high, "mid": mid, "score": None,
+        "lrng": lrng, "cv": 0.0, "drift": r["drift_ratio"], "altR": 0.0,
+        "rank": (0 if r["pingpong_ok"] else 1, 0 if r["fast_ok"] else 1, -(r["atr_pct"] * r["range_pct"])),
+    }
+
+def load_items(args):
+    if args.history:
+        h = ScanHistory(args.history)
+        ranged = args.since_ms is not None or args.until_ms is not None
+        rows = h.between(args.since_ms, args.until_ms) if ranged else h.run()   # açık uç → None
+        h.close()
+        latest = {}
+        for r in rows:  # aralıkta (borsa, sembol) başına en son satır
+            latest[(r["venue"], r["symbol"])] = r
+        return [item_from_row(r) for r in latest.values()]
+
+    p = Path(args.file)
+    if not p.exists():
+        print(f"⚠️ Input file not found: {p}"); sys.exit(0)
+
+    items = []
+    for ln in p.read_text(encoding="utf-8", errors="ignore").splitlines():
+        ln = ln.strip()
+        if not ln: continue
+        it = parse_line(ln)
+        if it: items.append(it)
+    return items
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("file", help="scan_*.txt")
-    ap.add_argument("--tf", choices=["3m","5m","15m","1h"], default="5m")
+    ap.add_argument("file", nargs="?", help="scan_*.txt (eski metin çıktısı)")
+    ap.add_argument("--history", help="scan_history.sqlite: metin yerine son koşu (ya da --since-ms/--until-ms aralığı)")
+    ap.add_argument("--since-ms", type=int)
+    ap.add_argument("--until-ms", type=int)
+    ap.add_argument("--tf", choices=list(SCAN_TFS), default="5m")
     ap.add_argument("--min-range", type=float, default=1.0)
     ap.add_argument("--max-drift", type=float, default=0.40)
     ap.add_argument("--max-cv", type=float, default=0.60)
@@ -48,17 +91,10 @@ def main():
     ap.add_argument("--top", type=int, default=24)
     ap.add_argument("--print-okx", action="store_true")
     args = ap.parse_args()
+    if not args.file and not args.history:
+        ap.error("file ya da --history gerekli")
 
-    p = Path(args.file)
-    if not p.exists():
-        print(f"⚠️ Input file not found: {p}"); sys.exit(0)
-
-    items = []
-    for ln in p.read_text(encoding="utf-8", errors="ignore").splitlines():
-        ln = ln.strip()
-        if not ln: continue
-        it = parse_line(ln)
-        if it: items.append(it)
+    items = load_items(args)
 
     if not items:
         print("⚠️ No parsable candidates found."); sys.exit(0)
@@ -69,10 +105,14 @@ def main():
         if is_fb:
             ok = (it["lrng"] >= args.min_range and it["cv"] <= args.fb_max_cv and it["drift"] <= args.fb_max_drift and it["score"] >= args.fb_min_score)
         else:
-            ok = (it["lrng"] >= args.min_range and it["cv"] <= args.max_cv and it["drift"] <= args.max_drift and it["score"] >= args.min_score)
+            ok = (it["lrng"] >= args.min_range and it["cv"] <= args.max_cv and it["drift"] <= args.max_drift
+                  and (it["score"] is None or it["score"] >= args.min_score))
         if ok: kept.append(it)
 
-    kept.sort(key=lambda x: x["score"], reverse=True)
+    if args.history:
+        kept.sort(key=lambda x: x["rank"])
+    else:
+        kept.sort(key=lambda x: x["score"], reverse=True)
     kept = kept[: args.top]
 
     if not kept:
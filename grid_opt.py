@@ -0,0 +1,129 @@
+# grid_opt.py
+# Grid configuration optimizer: (lower, upper, levels) searched against a symbol's recent
+# 1m close path instead of the fixed rules (suggest_grid: ATR×6 in 2–6 %, 12 levels;
+# DynamicGrid._compute_band: mid ± 2σ).
+#
+# Candidate space: band width (fraction of last, geometric), band centre offset from last
+# and level count. Candidates are scored in blocks of CHUNK as one (bars × candidates)
+# NumPy panel, stepping through the bars with the whole block as a vector; the order is a
+# fixed-seed shuffle, so a block cut off by the time budget still samples the whole space
+# evenly.
+#
+# Fills follow the order book, not raw line crossings: buys rest on lines ≤ lo, sells on
+# lines ≥ hi (u = (close − lower) / step, lines at 0..levels−1). A close at or below a buy
+# line fills every buy down to it; the filled line j is left empty (lo = j−1, hi = j+1), so
+# it fills again only after the opposite adjacent line has been hit. Jitter around one line
+# is one fill, not one per crossing.
+#
+# Score (quote currency, over the path):
+#   fills       = bu defterle dolan emir sayısı
+#   round_trips = fills / 2
+#   net_per_rt  = per_order_quote × (step / centre − 2 × fee)
+#   inventory   = qty × (step × k(k+1)/2 + k × dış mesafe), k = |cell_end − cell_start|
+#                 (açık kalan emirlerin yol sonundaki tahmini zararı)
+#   score       = round_trips × net_per_rt − inventory
+# Candidates that break extract_filters limits are dropped before scoring: per-order quote
+# below min_notional or min_qty × upper, or a step smaller than price_step. The winner is
+# sized with grid_sizer.plan_grid (tick-exact), so it is placeable as returned.
+
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from grid_sizer import plan_grid, snap_band
+
+CHUNK = 1024         # aday bloğu (bellek: CHUNK × bar float64; bar döngüsü blok başına)
+FEE = 0.0006         # taker/maker ücreti (emir başına oran)
+
+
+def candidate_space(widths: Tuple[float, float] = (0.005, 0.10), n_widths: int = 24,
+                    offsets: Sequence[float] = (-0.25, -0.125, 0.0, 0.125, 0.25),
+                    levels: Tuple[int, int] = (4, 40), seed: int = 0) -> np.ndarray:
+    """(width_frac, centre_offset, levels) satırları; offset bant genişliğinin kesri. Sabit tohumla karışık."""
+    w = np.geomspace(widths[0], widths[1], n_widths)
+    o = np.asarray(offsets, dtype=np.float64)
+    n = np.arange(levels[0], levels[1] + 1, dtype=np.float64)
+    grid = np.stack(np.meshgrid(w, o, n, indexing="ij"), axis=-1).reshape(-1, 3)
+    return grid[np.random.default_rng(seed).permutation(len(grid))]
+
+
+def score_candidates(closes: np.ndarray, last: float, cand: np.ndarray, capital: float,
+                     filters: Tuple[float, float, float, float, float],
+                     fee: float = FEE, reserve: float = 0.05) -> Dict[str, np.ndarray]:
+    """Aday bloğu → skor dizileri (uygunsuz adaylar −inf)."""
+    price_step, _, min_notional, min_qty, _ = filters
+    width, off, levels = cand[:, 0], cand[:, 1], cand[:, 2]
+    centre = last * (1.0 + off * width)
+    lower = centre * (1.0 - width / 2.0)
+    upper = centre * (1.0 + width / 2.0)
+    step = (upper - lower) / (levels - 1)
+    per_q = capital * (1.0 - reserve) / levels
+
+    top = levels - 1
+    u = (closes[:, None] - lower[None, :]) / step[None, :]
+    lo = np.minimum(np.ceil(u[0]) - 1.0, top)     # en üst alış çizgisi
+    hi = np.maximum(np.floor(u[0]) + 1.0, 0.0)    # en alt satış çizgisi
+    fills = np.zeros(len(cand))
+    for ut in u[1:]:
+        d = np.maximum(np.ceil(ut), 0.0)
+        f = np.minimum(np.floor(ut), top)
+        dn, up = d <= lo, f >= hi
+        fills += np.where(dn, lo - d + 1.0, 0.0) + np.where(up, f - hi + 1.0, 0.0)
+        j = np.where(dn, d, f)
+        moved = dn | up
+        lo = np.where(moved, j - 1.0, lo)
+        hi = np.where(moved, j + 1.0, hi)
+    round_trips = fills / 2.0
+    net_per_rt = per_q * (step / centre - 2.0 * fee)
+
+    end = closes[-1]
+    cell = np.clip(np.floor(u[[0, -1]]), -1.0, top)
+    k = np.abs(cell[1] - cell[0])
+    outside = np.maximum(np.maximum(lower - end, end - upper), 0.0)
+    inventory = (per_q / centre) * (step * k * (k + 1) / 2.0 + k * outside)
+
+    score = round_trips * net_per_rt - inventory
+    ok = (lower > 0) & (per_q >= min_notional) & (per_q >= min_qty * upper) & (step >= price_step)
+    return {"score": np.where(ok, score, -np.inf), "round_trips": round_trips, "net_per_rt": net_per_rt,
+            "inventory": inventory, "lower": lower, "upper": upper}
+
+
+def optimize_grid(symbol: str, closes: Sequence[float], filters: Tuple[float, float, float, float, float],
+                  capital: float, last: float = None, *, fee: float = FEE, reserve: float = 0.05,
+                  budget_s: float = 0.05, space: np.ndarray = None) -> Optional[Dict[str, Any]]:
+    """
+    closes: son 1m kapanışları (eskiden yeniye); filters: extract_filters / market_filters.
+    budget_s dolunca o ana kadarki en iyi aday döner (en az bir blok değerlendirilir).
+    Dönüş: {lower, upper, levels, score, round_trips, net_per_rt, inventory, evaluated, plan}
+    ya da uygun/kârlı aday yoksa None.
+    """
+    path = np.asarray(closes, dtype=np.float64)
+    path = path[np.isfinite(path) & (path > 0)]
+    if len(path) < 2:
+        return None
+    last = float(last) if last and last > 0 else float(path[-1])
+    space = candidate_space() if space is None else space
+
+    t_end = time.perf_counter() + budget_s
+    best, best_score, evaluated = None, -np.inf, 0
+    for a in range(0, len(space), CHUNK):
+        block = space[a:a + CHUNK]
+        res = score_candidates(path, last, block, capital, filters, fee, reserve)
+        k = int(np.argmax(res["score"]))
+        if res["score"][k] > best_score:
+            best_score = float(res["score"][k])
+            best = {"lower": float(res["lower"][k]), "upper": float(res["upper"][k]), "levels": int(block[k, 2]),
+                    "score": best_score, "round_trips": float(res["round_trips"][k]),
+                    "net_per_rt": float(res["net_per_rt"][k]), "inventory": float(res["inventory"][k])}
+        evaluated += len(block)
+        if time.perf_counter() >= t_end:
+            break
+    if best is None or not best_score > 0:
+        return None
+
+    best["lower"], best["upper"] = snap_band(best["lower"], best["upper"], filters[0])
+    best["evaluated"] = evaluated
+    best["plan"] = plan_grid(symbol, best["lower"], best["upper"], best["levels"], capital, filters, last,
+                             reserve=reserve)
+    return best
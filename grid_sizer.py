@@ -3,7 +3,10 @@
 """
 BingX (USDT-M) grid order sizer
 - ccxt'den market filtrelerini (tick/step/minNotional/minQty) okur
+  (market_cache snapshot'ı üzerinden; MARKET_CACHE_DIR=off → her seferinde load_markets)
 - Verilen [lower..upper] bandında, eşit-quote dağıtımıyla grid üretir
+- fiyat/miktar içeride tamsayı tick (price_step / qty_step katı) olarak tutulur;
+  float'a yalnızca emir sınırında dönülür (0.9500000000000001 gibi gürültü yok)
 - CLI (build_grid) + programatik kullanım (compute_grid_inline)
 
 Kullanım (CLI):
@@ -13,14 +16,19 @@ Kullanım (CLI):
 from __future__ import annotations
 import argparse
 import csv
-import math
-from typing import Any, Dict, Tuple, List
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 try:
     import ccxt  # type: ignore
 except Exception:
     raise SystemExit("ccxt gerekli: pip install ccxt")
 
+from market_cache import default_market_cache, market_filters
+
 
 # ---------- utils ----------
 
@@ -33,20 +41,145 @@ def _to_float(x: Any, default: float = 0.0) -> float:
 
 def round_step(x: float, step: float, mode: str = "down") -> float:
     """
-    Borsa adımına göre yuvarla.
+    Borsa adımına göre yuvarla (tam tick: Lattice üzerinden, epsilon yok).
     - mode='down': tabana yuvarla (güvenli)
     - mode='up'  : tavana yuvarla (minNotional için gerektiğinde)
+    - diğer      : en yakın
     """
     if step is None or step <= 0:
         return x
-    n = x / step
-    if mode == "down":
-        n = math.floor(n + 1e-12)
-    elif mode == "up":
-        n = math.ceil(n - 1e-12)
-    else:  # nearest
-        n = round(n)
-    return n * step
+    lat = Lattice(step)
+    return lat.to_float(lat.ticks(x, mode))
+
+
+# ---------- tamsayı tick ızgarası ----------
+
+@lru_cache(maxsize=4096)
+def _ratio(x: float) -> Tuple[int, int]:
+    """x'in kısa ondalık gösteriminin tam kesri: 0.1 → (1, 10) (ikili 0.1000000000000000055… değil)."""
+    return Decimal(repr(float(x))).as_integer_ratio()
+
+
+class Lattice:
+    """
+    Bir adımın (price_step / qty_step) katları: k (int) ↔ k × step.
+    step tam kesir unit/scale olarak tutulur; float'a yalnızca to_float() ile, emir
+    sınırında dönülür (int/int bölmesi doğru yuvarlanır → sonuç her zaman tam tick).
+    """
+    __slots__ = ("step", "unit", "scale")
+
+    def __init__(self, step: float):
+        self.step = float(step)
+        self.unit, self.scale = _ratio(step)
+
+    def ticks(self, x: float, mode: str = "down") -> int:
+        """x / step → tick sayısı (down: taban, up: tavan, diğer: en yakın)."""
+        n, d = _ratio(x)
+        num, den = n * self.scale, d * self.unit
+        if mode == "down":
+            return num // den
+        if mode == "up":
+            return -(-num // den)
+        return (2 * num + den) // (2 * den)
+
+    def to_float(self, k: int) -> float:
+        return k * self.unit / self.scale
+
+
+def qty_ticks(quote: float, kp: int, plat: Lattice, qlat: Lattice, mode: str = "down") -> int:
+    """quote / (kp fiyat tick'i × qty_step), tam tamsayı bölme (kp ≥ 1)."""
+    n, d = _ratio(quote)
+    num, den = n * plat.scale * qlat.scale, d * kp * plat.unit * qlat.unit
+    return num // den if mode == "down" else -(-num // den)
+
+
+def ticks_vec(x: np.ndarray, lat, mode: str = "down") -> np.ndarray:
+    """
+    Lattice.ticks'in vektörel hali (lat: tek Lattice ya da eleman başına Lattice listesi; mode down/up):
+    tam tick'teki değerler ve tamsayıya yakın olmayanlar float'tan, geri kalanlar skaler tam bölmeyle
+    → sonuç skaler çekirdekle birebir aynı.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if isinstance(lat, Lattice):
+        lats, step, unit, scale = None, lat.step, float(lat.unit), float(lat.scale)
+    else:
+        lats = list(lat)
+        step = np.array([l.step for l in lats], dtype=np.float64)
+        unit = np.array([l.unit for l in lats], dtype=np.float64)
+        scale = np.array([l.scale for l in lats], dtype=np.float64)
+    est = x / step
+    near = np.rint(est)
+    k = np.ceil(est) if mode == "up" else np.floor(est)
+    on_tick = (near * unit) / scale == x
+    k = np.where(on_tick, near, k)
+    fix = ~on_tick & ((np.abs(est - near) <= 1e-9 * np.maximum(np.abs(est), 1.0)) | (np.abs(est) >= 2.0 ** 52))
+    for j in np.flatnonzero(fix):
+        k[j] = (lat if lats is None else lats[j]).ticks(float(x[j]), mode)
+    return k.astype(np.int64)
+
+
+def ticks_to_float(k: np.ndarray, unit: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Vektörel k tick → float; Lattice.to_float ile aynı (k·unit < 2^53 iken iki tam float'ın bölmesi doğru yuvarlanır)."""
+    return (k * unit).astype(np.float64) / scale
+
+
+def qty_ticks_vec(quote: np.ndarray, kp: np.ndarray, r: np.ndarray, steps: np.ndarray,
+                  plats: List[Lattice], qlats: List[Lattice], mode: str = "down") -> np.ndarray:
+    """
+    qty_ticks'in vektörel hali (r: eleman → plats/qlats/steps satırı, steps = price_step × qty_step):
+    float tahmin, tamsayıya çok yakın (ya da çok büyük) olanlar tam tamsayı bölmeyle düzeltilir
+    → sonuç skaler çekirdekle birebir aynı.
+    """
+    est = quote / (kp * steps[r])
+    k = np.ceil(est) if mode == "up" else np.floor(est)
+    near = (np.abs(est - np.rint(est)) <= 1e-9 * np.maximum(est, 1.0)) | (est >= 2.0 ** 52)
+    for x in np.flatnonzero(near):
+        k[x] = qty_ticks(float(quote[x]), int(kp[x]), plats[r[x]], qlats[r[x]], mode)
+    return k.astype(np.int64)
+
+
+class TickGrid:
+    """
+    [lower..upper] bandında `levels` seviye, fiyat tick'i cinsinden: uçlar tabana
+    yuvarlanır, ara seviyeler k_i = k_lo + ⌊i·span/(levels−1)⌋ (tamsayı, tam).
+    level_of(price) O(1): fiyatın tam olarak denk geldiği seviye.
+    """
+    __slots__ = ("lat", "k_lo", "span", "n")
+
+    def __init__(self, lat: Lattice, lower: float, upper: float, levels: int):
+        self.lat = lat
+        self.k_lo = lat.ticks(lower)
+        self.span = lat.ticks(upper) - self.k_lo
+        self.n = int(levels)
+
+    def tick(self, i: int) -> int:
+        return self.k_lo + (i * self.span) // max(1, self.n - 1)
+
+    def ticks(self) -> List[int]:
+        return [self.tick(i) for i in range(self.n)]
+
+    def price(self, i: int) -> float:
+        return self.lat.to_float(self.tick(i))
+
+    def level_of(self, price: float) -> Optional[int]:
+        """Fiyat bir seviyenin tam tick'iyse o seviye (aynı tick'e düşen seviyelerden ilki), değilse None."""
+        n, d = _ratio(price)
+        num, den = n * self.lat.scale, d * self.lat.unit
+        if num % den:
+            return None
+        off = num // den - self.k_lo
+        if self.span <= 0:
+            return 0 if off == 0 else None
+        i = -(-off * (self.n - 1) // self.span)    # tick(i) ≥ k olan en küçük i
+        return i if 0 <= i < self.n and self.tick(i) == off + self.k_lo else None
+
+
+def snap_band(lower: float, upper: float, price_step: float) -> Tuple[float, float]:
+    """Bant uçları fiyat tick ızgarasına: alt aşağı, üst yukarı (bant daralmaz)."""
+    if not price_step or price_step <= 0 or lower <= 0:
+        return lower, upper
+    lat = Lattice(price_step)
+    return lat.to_float(lat.ticks(lower, "down")), lat.to_float(lat.ticks(upper, "up"))
 
 
 def extract_filters(market: Dict[str, Any]) -> Tuple[float, float, float, float, float]:
@@ -123,10 +256,6 @@ def extract_filters(market: Dict[str, Any]) -> Tuple[float, float, float, float,
 
 # ---------- çekirdek mantık ----------
 
-def _equal_quote_qty(price: float, per_quote: float) -> float:
-    return per_quote / max(price, 1e-12)
-
-
 def build_grid(symbol: str, lower: float, upper: float, levels: int,
                capital_usdt: float, reserve: float = 0.05,
                leverage: int = 3,
@@ -138,64 +267,69 @@ def build_grid(symbol: str, lower: float, upper: float, levels: int,
         raise ValueError("geçersiz grid parametreleri")
 
     ex = ccxt.bingx({"enableRateLimit": True, "options": {"defaultType": "swap"}})
-    markets = ex.load_markets()
+    cache = default_market_cache(ex.id)
+    markets = cache.load(ex) if cache is not None else ex.load_markets()
     if symbol not in markets:
         alts = [s for s in markets if s.split(":")[0] == symbol.split(":")[0]]
         raise ValueError(f"Sembol bulunamadı: {symbol}. Örnekler: {alts[:5]}")
 
-    mkt = markets[symbol]
-    price_step, qty_step, min_notional, min_qty, min_price = extract_filters(mkt)
+    filters = market_filters(ex, symbol)
+    last = ex.fetch_ticker(symbol)['last']
+    return plan_grid(symbol, lower, upper, levels, capital_usdt, filters, last,
+                     reserve=reserve, leverage=leverage, steps_out_for_sl=steps_out_for_sl)
+
+
+def plan_grid(symbol: str, lower: float, upper: float, levels: int, capital_usdt: float,
+              filters: Tuple[float, float, float, float, float], last: float,
+              reserve: float = 0.05, leverage: int = 3, steps_out_for_sl: int = 2) -> Dict[str, Any]:
+    """build_grid'in ağsız çekirdeği: filtreler (extract_filters) ve son fiyat verilir."""
+    price_step, qty_step, min_notional, min_qty, min_price = filters
+    plat, qlat = Lattice(price_step), Lattice(qty_step)
 
     step_abs = (upper - lower) / (levels - 1)
     mid = (upper + lower) / 2.0
     step_pct = step_abs / mid
 
     per_order_quote = capital_usdt * (1.0 - reserve) / levels
-    prices = [lower + i * step_abs for i in range(levels)]
+    # seviyeler fiyat tick'i cinsinden (tamsayı); float'a yalnızca emir alanlarında dönülür
+    ks = TickGrid(plat, lower, upper, levels).ticks()
+    k_mid = plat.ticks(mid)
+    k_min_px = plat.ticks(min_price, "up") if min_price else 0
+    k_min_qty = qlat.ticks(min_qty, "up") if min_qty else 0
 
     orders: List[Dict[str, Any]] = []
     total_quote = 0.0
     extra_quote_needed = 0.0
 
-    last = ex.fetch_ticker(symbol)['last']
-
-    for i, raw_p in enumerate(prices):
-        side = "BUY" if raw_p <= mid else "SELL"
+    for i, k in enumerate(ks):
+        side = "BUY" if k <= k_mid else "SELL"
 
-        # fiyatı adım + minPrice'a göre düzelt
-        p = round_step(raw_p, price_step, "down")
-        if min_price:
-            p = max(p, min_price)
+        # minPrice (tick'e yukarı yuvarlanmış)
+        kp = max(k, k_min_px)
+        p = plat.to_float(kp)
 
-        # eşit-quote → miktar
-        qty_f = _equal_quote_qty(p, per_order_quote)
-        qty = round_step(qty_f, qty_step, "down")
-        if min_qty:
-            qty = max(qty, min_qty)
+        # eşit-quote → miktar tick'i (tam tamsayı bölme)
+        kq = max(qty_ticks(per_order_quote, max(kp, 1), plat, qlat), k_min_qty)
 
+        # minNotional: kp·kq·step'ler < min_notional ⇔ kq < kb (tam karşılaştırma)
+        kb = qty_ticks(min_notional, max(kp, 1), plat, qlat, "up")
+        if kb > kq:
+            extra_quote_needed += qlat.to_float(kb - kq) * p
+            kq = kb
+        qty = qlat.to_float(kq)
         notional = p * qty
 
-        # minNotional'i sağla (gerekirse yukarı yuvarla)
-        if notional < min_notional:
-            need_qty = min_notional / max(p, 1e-12)
-            bumped = round_step(need_qty, qty_step, "up")
-            if bumped > qty:
-                extra_quote_needed += (bumped - qty) * p
-                qty = bumped
-                notional = qty * p
-
         # TP: komşu çizgi
-        tp_raw = prices[min(i + 1, levels - 1)] if side == "BUY" \
-                 else prices[max(i - 1, 0)]
-        tp = round_step(tp_raw, price_step, "down")
+        j = min(i + 1, levels - 1) if side == "BUY" else max(i - 1, 0)
+        tp = plat.to_float(ks[j])
 
         orders.append({
             "lvl": i + 1,
             "side": side,
-            "price": float(p),
-            "qty": float(qty),
+            "price": p,
+            "qty": qty,
             "notional": round(notional, 2),
-            "tp": float(tp),
+            "tp": tp,
         })
         total_quote += notional
 
@@ -230,55 +364,44 @@ def build_grid(symbol: str, lower: float, upper: float, levels: int,
 
 def compute_grid_inline(symbol: str, lower: float, upper: float, levels: int,
                         capital: float, reserve: float = 0.05, lev: int = 1,
-                        exchange=None) -> List[Dict[str, float]]:
+                        exchange=None, last: float = None) -> List[Dict[str, float]]:
     """
     Programatik kullanım: dynamic_grid, runner vb. yerlerden çağrılır.
     - exchange: varsa mevcut ccxt instance'ını ver; yoksa yeni açar.
+    - last: çağıranın elindeki son fiyat (build_metrics); verilmezse fetch_ticker.
+    - filtreler memo'lu (market_cache.market_filters): last verildiğinde retune ağsızdır.
     Dönüş: [{'side','price','qty','notional'}, ...]
     """
     ex = exchange or ccxt.bingx({"enableRateLimit": True, "options": {"defaultType": "swap"}})
-    markets = ex.load_markets()
-    m = markets[symbol]
-
-    price_step, qty_step, min_notional, min_qty, min_price = extract_filters(m)
+    price_step, qty_step, min_notional, min_qty, min_price = market_filters(ex, symbol)
+    plat, qlat = Lattice(price_step), Lattice(qty_step)
 
     # eşit-quote
     alloc = capital * (1.0 - reserve)
     per_n = alloc / max(1, levels)
 
-    step_abs = (upper - lower) / max(1, levels - 1)
-    raw_prices = [lower + i * step_abs for i in range(levels)]
-
-    last = ex.fetch_ticker(symbol)['last']
+    if last is None or not last > 0:
+        last = ex.fetch_ticker(symbol)['last']
+    # k·step < last ⇔ k < ⌈last/step⌉ ;  k·step > last ⇔ k > ⌊last/step⌋
+    k_last_up, k_last_dn = plat.ticks(last, "up"), plat.ticks(last, "down")
+    k_min_px = plat.ticks(min_price, "up") if min_price else 0
+    k_min_qty = qlat.ticks(min_qty, "up") if min_qty else 0
     out: List[Dict[str, float]] = []
 
-    for rp in raw_prices:
-        side = 'buy' if rp < last else ('sell' if rp > last else None)
+    for k in TickGrid(plat, lower, upper, levels).ticks():
+        side = 'buy' if k < k_last_up else ('sell' if k > k_last_dn else None)
         if not side:
             continue
 
-        p = round_step(rp, price_step, "down")
-        if min_price:
-            p = max(p, min_price)
-
-        qty = _equal_quote_qty(p, per_n)
-        qty = round_step(qty, qty_step, "down")
-        if min_qty:
-            qty = max(qty, min_qty)
-
-        notional = p * qty
-        if min_notional and notional < min_notional:
-            need_qty = min_notional / max(p, 1e-12)
-            bumped = round_step(need_qty, qty_step, "up")
-            if bumped <= 0:
-                continue
-            qty = bumped
-            notional = p * qty
-
-        if qty <= 0:
+        kp = max(k, k_min_px)
+        kq = max(qty_ticks(per_n, max(kp, 1), plat, qlat), k_min_qty)
+        if min_notional:
+            kq = max(kq, qty_ticks(min_notional, max(kp, 1), plat, qlat, "up"))
+        if kq <= 0:
             continue
 
-        out.append({'side': side, 'price': float(p), 'qty': float(qty), 'notional': float(notional)})
+        p, qty = plat.to_float(kp), qlat.to_float(kq)
+        out.append({'side': side, 'price': p, 'qty': qty, 'notional': p * qty})
 
     return out
 
@@ -0,0 +1,165 @@
+# kline_feed.py
+# Kline update feeds for the daemon scanner (scan_bingx_grid.py --daemon).
+# A feed yields (symbol, timeframe, bar) events, bar = ccxt-style [ts, o, h, l, c, v].
+# The same ts may arrive several times while the bar is in progress; the first event
+# with a newer ts means the previous bar closed. poll() returns None once the feed ended.
+#   PollingFeed : REST polling right after each bar boundary, through the scanner's fetcher
+#   WsFeed      : ccxt.pro watch_ohlcv subscriptions on a background event loop
+#   FakeFeed    : pushed / scripted bars, no network (tests and offline runs)
+
+import abc, asyncio, queue, threading, time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from candle_store import timeframe_ms
+
+KlineEvent = Tuple[str, str, list]
+
+
+class KlineFeed(abc.ABC):
+    """Feed interface: subscribe once, then poll until it returns None."""
+
+    @abc.abstractmethod
+    def subscribe(self, symbols: Sequence[str], timeframes: Sequence[str]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def poll(self, timeout: float) -> Optional[List[KlineEvent]]:
+        """Events that arrived within `timeout` seconds ([] = none yet, None = feed ended)."""
+
+    def close(self) -> None:
+        pass
+
+
+class PollingFeed(KlineFeed):
+    """
+    Wakes `grace` seconds after the next bar boundary of any subscribed timeframe and
+    fetches the last two bars of every (symbol, tf) whose boundary passed: the bar
+    that just closed and the new in-progress one. One request per pair per bar.
+    """
+
+    def __init__(self, fetcher, grace: float = 2.0, clock=time.time):
+        self.fetcher = fetcher
+        self.grace = float(grace)
+        self._clock = clock
+        self._subs: Dict[str, List[str]] = {}
+        self._next: Dict[str, float] = {}
+
+    def subscribe(self, symbols: Sequence[str], timeframes: Sequence[str]) -> None:
+        now = self._clock()
+        for tf in timeframes:
+            self._subs.setdefault(tf, [])
+            self._subs[tf] += [s for s in symbols if s not in self._subs[tf]]
+            step = timeframe_ms(tf) / 1000.0
+            self._next.setdefault(tf, (now // step + 1) * step + self.grace)
+
+    def poll(self, timeout: float) -> Optional[List[KlineEvent]]:
+        if not self._subs:
+            return None
+        due_at = min(self._next.values())
+        wait = due_at - self._clock()
+        if wait > timeout:
+            time.sleep(max(timeout, 0.0))
+            return []
+        if wait > 0:
+            time.sleep(wait)
+        now = self._clock()
+        jobs = []
+        for tf, t in self._next.items():
+            if t <= now:
+                step = timeframe_ms(tf) / 1000.0
+                self._next[tf] = (now // step + 1) * step + self.grace
+                jobs += [(s, tf, 2, None) for s in self._subs[tf]]
+        events: List[KlineEvent] = []
+        for (sym, tf, _, _), bars in zip(jobs, self.fetcher.fetch_many(jobs)):
+            if isinstance(bars, Exception):
+                print(f"[warn] kline poll ({sym} {tf}): {bars}")
+                continue
+            events += [(sym, tf, list(b)) for b in bars]
+        return events
+
+
+class WsFeed(KlineFeed):
+    """ccxt.pro watch_ohlcv per (symbol, tf); updates are queued from a background loop."""
+
+    def __init__(self, sync_ex):
+        import ccxt.pro as ccxtpro  # ccxt>=4 ships pro; yoksa PollingFeed kullanılır
+        self._q: "queue.Queue[KlineEvent]" = queue.Queue()
+        self._loop = asyncio.new_event_loop()
+        cls = getattr(ccxtpro, sync_ex.id)
+        self._ex = cls({"enableRateLimit": True, "options": dict(sync_ex.options or {})})
+        if getattr(sync_ex, "markets", None):
+            self._ex.set_markets(sync_ex.markets, getattr(sync_ex, "currencies", None))
+        self._stop = False
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    async def _watch(self, sym: str, tf: str) -> None:
+        while not self._stop:
+            try:
+                for bar in await self._ex.watch_ohlcv(sym, tf):
+                    self._q.put((sym, tf, list(bar)))
+            except Exception as e:  # bağlantı koptu → ccxt yeniden bağlanır
+                print(f"[warn] kline ws ({sym} {tf}): {e}")
+                await asyncio.sleep(5)
+
+    def subscribe(self, symbols: Sequence[str], timeframes: Sequence[str]) -> None:
+        for tf in timeframes:
+            for s in symbols:
+                asyncio.run_coroutine_threadsafe(self._watch(s, tf), self._loop)
+
+    def poll(self, timeout: float) -> Optional[List[KlineEvent]]:
+        try:
+            events = [self._q.get(timeout=max(timeout, 0.0))]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                events.append(self._q.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self) -> None:
+        self._stop = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._ex.close(), self._loop).result(timeout=10)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class FakeFeed(KlineFeed):
+    """
+    In-memory feed. script = [[event, ...], ...]: each poll() returns the next batch;
+    push() adds events to the current batch. Once the script is used up, poll()
+    returns None (eof=True) or [] (eof=False, keep waiting for push()).
+    """
+
+    def __init__(self, script: Iterable[Sequence[KlineEvent]] = (), eof: bool = True):
+        self._batches = [list(b) for b in script]
+        self._pushed: List[KlineEvent] = []
+        self.eof = eof
+        self.subscribed: List[Tuple[str, str]] = []
+
+    def subscribe(self, symbols: Sequence[str], timeframes: Sequence[str]) -> None:
+        self.subscribed += [(s, tf) for tf in timeframes for s in symbols]
+
+    def push(self, symbol: str, tf: str, bar: Sequence[float]) -> None:
+        self._pushed.append((symbol, tf, list(bar)))
+
+    def poll(self, timeout: float) -> Optional[List[KlineEvent]]:
+        if self._pushed:
+            out, self._pushed = self._pushed, []
+            return out
+        if self._batches:
+            return self._batches.pop(0)
+        return None if self.eof else []
+
+
+def make_feed(kind: str, ex, fetcher) -> KlineFeed:
+    """'ws' → WsFeed (ccxt.pro yoksa polling'e düşer), aksi halde PollingFeed."""
+    if kind == "ws":
+        try:
+            return WsFeed(ex)
+        except Exception as e:
+            print(f"[warn] ws feed açılamadı, polling kullanılıyor: {e}")
+    return PollingFeed(fetcher)
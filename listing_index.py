@@ -0,0 +1,155 @@
+# listing_index.py
+# Persistent first-seen index for contracts (symbol → listing timestamp, ms).
+# Filled from market info keys, from load_markets diffs (a symbol that was not there
+# at the previous sync is new *now*), and by a one-time OHLCV backfill for the rest.
+# Lookups are a dict hit, so the 500-bar fallback is never repeated for a known symbol.
+
+import json, os
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_PATH = ".cache/listing_index.json"
+DAY_MS = 24 * 60 * 60 * 1000
+
+INFO_KEYS = ("listingTime", "createTime", "listTime", "onboardDate", "launchTime", "created")
+
+# one-time backfill: 1h × 500 first; if the page is full the contract is older,
+# so a coarser 1d probe finds the real first bar.
+BACKFILL_1H = ("1h", 500)
+BACKFILL_1D = ("1d", 1000)
+
+
+def listing_ts_from_info(market_info: Dict[str, Any]) -> Optional[int]:
+    """Market info'daki listing zaman damgası (ms); anahtar yoksa None."""
+    info = market_info.get("info", {}) if isinstance(market_info, dict) else {}
+    for key in INFO_KEYS:
+        if key in info:
+            try:
+                ts = int(info[key])
+                if ts > 1e12:
+                    while ts > 1e13:
+                        ts //= 10
+                if ts < 1e11:
+                    ts *= 1000
+                return ts
+            except Exception:
+                continue
+    return None
+
+
+class ListingIndex:
+    """
+    JSON-backed index:
+      symbols: {sym: {"first_ms": int, "src": "info|diff|backfill|backfill_1d|floor"}}
+      pending: symbols seen at a sync but not dated yet (backfill when first needed)
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_PATH):
+        self.path = path
+        self.symbols: Dict[str, Dict[str, Any]] = {}
+        self.pending: set = set()
+        self.last_sync_ms = 0
+        self._dirty = False
+        if path is None:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.symbols = dict(data.get("symbols") or {})
+            self.pending = set(data.get("pending") or [])
+            self.last_sync_ms = int(data.get("last_sync_ms") or 0)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[warn] listing index okunamadı ({path}): {e}")
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "ListingIndex":
+        """state() çıktısından bellek içi index (path yok, save() yazmaz)."""
+        idx = cls(None)
+        idx.symbols = {k: dict(v) for k, v in (state.get("symbols") or {}).items()}
+        idx.pending = set(state.get("pending") or [])
+        idx.last_sync_ms = int(state.get("last_sync_ms") or 0)
+        return idx
+
+    def state(self) -> Dict[str, Any]:
+        return {"version": 1, "last_sync_ms": self.last_sync_ms,
+                "symbols": self.symbols, "pending": sorted(self.pending)}
+
+    # ---------- queries ----------
+
+    def first_seen(self, symbol: str) -> Optional[int]:
+        rec = self.symbols.get(symbol)
+        return int(rec["first_ms"]) if rec else None
+
+    def age_days(self, symbol: str, now_ms: int) -> Optional[float]:
+        ts = self.first_seen(symbol)
+        return None if ts is None else (now_ms - ts) / DAY_MS
+
+    # ---------- updates ----------
+
+    def _set(self, symbol: str, first_ms: int, src: str) -> None:
+        self.symbols[symbol] = {"first_ms": int(first_ms), "src": src}
+        self.pending.discard(symbol)
+        self._dirty = True
+
+    def sync(self, markets: Dict[str, Any], symbols: Iterable[str], now_ms: int) -> None:
+        """
+        load_markets sonrası: info'da zaman damgası olanlar doğrudan yazılır;
+        önceki sync'te hiç görülmemiş semboller 'şimdi listelendi' kabul edilir;
+        ilk sync'te tarihsizler pending'e düşer (gerektiğinde backfill).
+        """
+        first_sync = self.last_sync_ms == 0
+        for s in symbols:
+            if s in self.symbols:
+                continue
+            ts = listing_ts_from_info(markets.get(s, {}))
+            if ts is not None:
+                self._set(s, ts, "info")
+            elif s in self.pending:
+                continue
+            elif first_sync:
+                self.pending.add(s)
+                self._dirty = True
+            else:
+                self._set(s, now_ms, "diff")
+        self.last_sync_ms = now_ms
+        self._dirty = True
+
+    def record_backfill(self, symbol: str, bars: List[list], timeframe: str, limit: int) -> bool:
+        """
+        Backfill yanıtını işler. True → sayfa doluydu, daha kaba TF ile tekrar sorulmalı.
+        """
+        if not bars:
+            return False
+        first = int(bars[0][0])
+        full = len(bars) >= limit
+        if full and timeframe == BACKFILL_1H[0]:
+            return True
+        self._set(symbol, first, "floor" if full else ("backfill_1d" if timeframe == BACKFILL_1D[0] else "backfill"))
+        return False
+
+    def absorb(self, other: "ListingIndex") -> None:
+        """Başka bir kopyada (shard worker) tarihlenen sembolleri bu index'e alır."""
+        for s, rec in other.symbols.items():
+            if s not in self.symbols:
+                self._set(s, rec["first_ms"], rec["src"])
+
+    def save(self) -> None:
+        if not self._dirty or not self.path:
+            return
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state(), f)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def default_index() -> Optional[ListingIndex]:
+    """LISTING_INDEX_PATH env (varsayılan .cache/listing_index.json); 'off' ile kapatılır."""
+    path = os.environ.get("LISTING_INDEX_PATH", "") or DEFAULT_PATH
+    if path.strip().lower() in ("0", "off", "none", "false"):
+        return None
+    return ListingIndex(path)
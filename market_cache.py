@@ -0,0 +1,191 @@
+# market_cache.py
+# Persisted load_markets snapshot per exchange id, so cold starts (scanner, grid_sizer,
+# paper bot) and grid retunes do not download and parse every contract definition.
+#   fresh (age < ttl)            → snapshot only, no request
+#   stale (ttl ≤ age < max_age)  → snapshot now, load_markets refreshed in a background
+#                                  thread (separate public instance) and written back
+#   missing / older than max_age → synchronous load_markets, then saved
+# The snapshot also carries an extract_filters index per symbol
+# (price_step, qty_step, min_notional, min_qty, min_price), so order sizing reads a dict.
+#
+#   MARKET_CACHE_DIR   (varsayılan .cache/markets; 'off' → her seferinde load_markets)
+#   MARKET_CACHE_TTL   saniye (varsayılan 3600)
+#   MARKET_CACHE_MAX_AGE saniye (varsayılan 7 gün)
+
+import atexit, gzip, json, os, threading, time
+from typing import Any, Dict, Optional, Tuple
+
+import ccxt
+
+DEFAULT_DIR = ".cache/markets"
+VERSION = 1
+
+Filters = Tuple[float, float, float, float, float]
+
+
+def filters_index(markets: Dict[str, Any]) -> Dict[str, list]:
+    """{symbol: [price_step, qty_step, min_notional, min_qty, min_price]} (grid_sizer.extract_filters)."""
+    from grid_sizer import extract_filters   # grid_sizer bu modülü import eder
+    out = {}
+    for sym, m in markets.items():
+        try:
+            out[sym] = list(extract_filters(m))
+        except Exception:
+            continue
+    return out
+
+
+class MarketCache:
+    def __init__(self, path: str, ttl: float = 3600.0, max_age: float = 7 * 86400.0):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.saved = 0.0
+        self.markets: Optional[Dict[str, Any]] = None
+        self.currencies: Optional[Dict[str, Any]] = None
+        self.filters_by_symbol: Dict[str, list] = {}
+        self.status = "miss"        # son load(): hit | stale | miss
+        self._lock = threading.Lock()
+        self._refresh: Optional[threading.Thread] = None
+        self._read()
+
+    def _read(self) -> None:
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, EOFError) as e:
+            print(f"[warn] market snapshot okunamadı ({self.path}): {e}")
+            return
+        if data.get("version") != VERSION or not data.get("markets"):
+            return
+        self.saved = float(data.get("saved") or 0)
+        self.markets = data["markets"]
+        self.currencies = data.get("currencies")
+        self.filters_by_symbol = data.get("filters") or filters_index(self.markets)
+
+    def age(self) -> float:
+        return time.time() - self.saved if self.markets else float("inf")
+
+    # ---------- loading ----------
+
+    def load(self, ex) -> Dict[str, Any]:
+        """
+        ex.load_markets() yerine: snapshot varsa ex.set_markets ile yüklenir (ağ yok).
+        ex: sync ccxt exchange ya da ccxt'e yönlenen bir wrapper (MeteredExchange…).
+        """
+        age = self.age()
+        if age >= self.max_age:
+            self.status = "miss"
+            markets = ex.load_markets()
+            self._store(markets, getattr(ex, "currencies", None))
+            return markets
+        self.status = "hit" if age < self.ttl else "stale"
+        ex.set_markets(self.markets, self.currencies)
+        if self.status == "stale":
+            self.refresh_async(ex.id, getattr(ex, "options", None))
+        return ex.markets
+
+    def filters(self, symbol: str) -> Optional[Filters]:
+        f = self.filters_by_symbol.get(symbol)
+        return tuple(f) if f else None
+
+    # ---------- refresh ----------
+
+    def refresh(self, exchange_id: str, options: Dict[str, Any] = None) -> None:
+        """Ayrı (public) instance ile load_markets; snapshot ve bellekteki index güncellenir."""
+        ex = getattr(ccxt, exchange_id)({"enableRateLimit": True, "options": dict(options or {})})
+        markets = ex.load_markets()
+        self._store(markets, ex.currencies)
+
+    def refresh_async(self, exchange_id: str, options: Dict[str, Any] = None) -> None:
+        def run():
+            try:
+                self.refresh(exchange_id, options)
+                print(f"[info] market snapshot yenilendi: {self.path}")
+            except Exception as e:
+                print(f"[warn] market snapshot yenilenemedi ({exchange_id}): {e}")
+        with self._lock:
+            if self._refresh is not None and self._refresh.is_alive():
+                return
+            self._refresh = threading.Thread(target=run, name=f"markets-{exchange_id}", daemon=True)
+            self._refresh.start()
+
+    def wait(self, timeout: float = 30.0) -> None:
+        t = self._refresh
+        if t is not None:
+            t.join(timeout)
+
+    def _store(self, markets: Dict[str, Any], currencies: Optional[Dict[str, Any]]) -> None:
+        index = filters_index(markets)
+        now = time.time()
+        try:
+            d = os.path.dirname(self.path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            tmp = self.path + ".tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump({"version": VERSION, "saved": now, "markets": markets,
+                           "currencies": currencies, "filters": index}, f, default=str)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[warn] market snapshot yazılamadı ({self.path}): {e}")
+        with self._lock:
+            self.saved, self.markets, self.currencies, self.filters_by_symbol = now, markets, currencies, index
+
+
+_caches: Dict[str, MarketCache] = {}
+_caches_lock = threading.Lock()
+
+
+def default_market_cache(exchange_id: str) -> Optional[MarketCache]:
+    """Süreç başına exchange id başına tek cache (MARKET_CACHE_DIR/<id>.json.gz); 'off' → None."""
+    root = os.environ.get("MARKET_CACHE_DIR", "") or DEFAULT_DIR
+    if root.strip().lower() in ("0", "off", "none", "false"):
+        return None
+    with _caches_lock:
+        cache = _caches.get(exchange_id)
+        if cache is None:
+            cache = _caches[exchange_id] = MarketCache(
+                os.path.join(root, f"{exchange_id}.json.gz"),
+                ttl=float(os.environ.get("MARKET_CACHE_TTL", "") or 3600.0),
+                max_age=float(os.environ.get("MARKET_CACHE_MAX_AGE", "") or 7 * 86400.0))
+            atexit.register(cache.wait, 30.0)   # arka plan yenilemesi yarıda kalmasın
+        return cache
+
+
+def load_markets_cached(ex) -> Dict[str, Any]:
+    """ex.load_markets() ile aynı dönüş; cache kapalıysa doğrudan o."""
+    cache = default_market_cache(ex.id)
+    if cache is None:
+        return ex.load_markets()
+    return cache.load(ex)
+
+
+_filters_memo: Dict[Tuple[str, str], Tuple[Any, Filters]] = {}
+
+
+def market_filters(ex, symbol: str) -> Filters:
+    """
+    Sembolün emir filtreleri, (exchange id, symbol) başına memo'lu. Memo yalnızca market
+    verisi değişince geçersizleşir: snapshot yenilenince (cache.saved) ya da cache kapalıyken
+    ex.markets yeniden yüklenince. Kaynak: snapshot index'i, yoksa load_markets + extract_filters.
+    """
+    cache = default_market_cache(ex.id)
+    if cache is not None:
+        if not getattr(ex, "markets", None):
+            cache.load(ex)
+        token = cache.saved
+    else:
+        token = id(ex.load_markets())   # yüklüyse ccxt ağa çıkmaz
+    key = (ex.id, symbol)
+    hit = _filters_memo.get(key)
+    if hit is not None and hit[0] == token:
+        return hit[1]
+    f = cache.filters(symbol) if cache is not None else None
+    if f is None:
+        from grid_sizer import extract_filters
+        f = extract_filters(ex.load_markets()[symbol])
+    _filters_memo[key] = (token, f)
+    return f
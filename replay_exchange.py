@@ -0,0 +1,152 @@
+# replay_exchange.py
+# Record / replay a full scanner run without the network.
+#   python scan_bingx_grid.py --record snap.json.gz   # normal live run, responses saved
+#   python scan_bingx_grid.py --replay snap.json.gz   # same run from the snapshot, no network
+# The snapshot holds load_markets, fetch_tickers, every OHLCV window the scan consumed
+# (after the candle store merge, so replay needs no store), the milliseconds() sequence,
+# the listing index state before the run and the Telegram chunks that were sent.
+# ReplayExchange is a drop-in for ccxt.bingx in scan_bingx_grid.main(); replay prints
+# whether the composed Telegram output is identical to the recorded one.
+
+import gzip, json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import ccxt
+
+from candle_store import CandleStore, fetch_windows
+from listing_index import ListingIndex
+
+VERSION = 1
+
+
+def _key(symbol: str, tf: str, limit: int, since: Optional[int]) -> str:
+    return f"{symbol}|{tf}|{int(limit)}|{'' if since is None else int(since)}"
+
+
+class Snapshot:
+    def __init__(self, data: Dict[str, Any] = None):
+        self.data = data or {"version": VERSION, "markets": None, "currencies": None, "tickers": {},
+                             "ohlcv": {}, "ms": [], "listing_index": None, "started_at": None,
+                             "telegram": None}
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            raise ValueError(f"desteklenmeyen snapshot sürümü: {data.get('version')}")
+        return cls(data)
+
+    def save(self, path: str) -> None:
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(self.data, f)
+
+    def listing_index(self) -> Optional[ListingIndex]:
+        state = self.data.get("listing_index")
+        return None if state is None else ListingIndex.from_state(state)
+
+
+class RecordingExchange:
+    """Sync ccxt exchange wrapper: load_markets/fetch_tickers/fetch_ohlcv/milliseconds are recorded."""
+
+    def __init__(self, ex, snap: Snapshot):
+        self._ex = ex
+        self.snap = snap
+
+    def __getattr__(self, name):
+        return getattr(self._ex, name)
+
+    def load_markets(self, *a, **kw):
+        markets = self._ex.load_markets(*a, **kw)
+        self.snap.data["markets"] = markets
+        self.snap.data["currencies"] = getattr(self._ex, "currencies", None)
+        return markets
+
+    def fetch_tickers(self, symbols=None, *a, **kw):
+        res = self._ex.fetch_tickers(symbols, *a, **kw)
+        self.snap.data["tickers"]["*" if symbols is None else "sel"] = res
+        return res
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, *a, **kw):
+        rows = self._ex.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit, *a, **kw)
+        self.snap.data["ohlcv"][_key(symbol, timeframe, limit or 0, since)] = rows
+        return rows
+
+    def milliseconds(self) -> int:
+        ms = self._ex.milliseconds()
+        self.snap.data["ms"].append(ms)
+        return ms
+
+
+class RecordingFetcher:
+    """
+    Scanner fetcher wrapper: jobs go through the candle store (as scan_pairs would)
+    and the resulting windows are recorded under since=None, so scan_pairs is called
+    with store=None and the replay needs no store state.
+    direct: (tf, limit) pairs the live path fetches without the store (listing index
+    backfill, BACKFILL_1H / BACKFILL_1D); those bypass it here too.
+    """
+
+    def __init__(self, fetcher, store: Optional[CandleStore], snap: Snapshot, now_ms: int,
+                 direct: Sequence[Tuple[str, int]] = ()):
+        self.fetcher = fetcher
+        self.store = store
+        self.snap = snap
+        self.now_ms = now_ms
+        self.direct = {tuple(d) for d in direct}
+
+    def fetch_many(self, jobs: Sequence[tuple]) -> List[Any]:
+        res: List[Any] = [None] * len(jobs)
+        direct = [k for k, job in enumerate(jobs) if (job[1], job[2]) in self.direct]
+        skip = set(direct)
+        stored = [k for k in range(len(jobs)) if k not in skip]
+        if stored:
+            specs = [(jobs[k][0], jobs[k][1], jobs[k][2]) for k in stored]
+            for k, rows in zip(stored, fetch_windows(self.fetcher, self.store, specs, self.now_ms)):
+                res[k] = rows
+        if direct:
+            for k, rows in zip(direct, self.fetcher.fetch_many([jobs[k] for k in direct])):
+                res[k] = rows
+        for (s, tf, lim, since), rows in zip(jobs, res):
+            if not isinstance(rows, Exception):
+                self.snap.data["ohlcv"][_key(s, tf, lim, since)] = rows
+        return res
+
+    def close(self) -> None:
+        self.fetcher.close()
+
+
+class ReplayExchange:
+    """Drop-in for ccxt.bingx: every answer comes from the snapshot."""
+
+    id = "replay"
+
+    def __init__(self, snap: Snapshot):
+        self.snap = snap
+        self.markets = snap.data["markets"]
+        self.currencies = snap.data.get("currencies")
+        self.options = {"defaultType": "swap"}
+        self._ms = list(snap.data.get("ms") or [0])
+        self._k = 0
+
+    def load_markets(self, reload: bool = False):
+        return self.markets
+
+    def fetch_tickers(self, symbols=None):
+        t = self.snap.data["tickers"]
+        if symbols is not None and "sel" in t:
+            return t["sel"]
+        if "*" in t:
+            return t["*"]
+        raise ccxt.NotSupported("replay: fetch_tickers kaydı yok")
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        rows = self.snap.data["ohlcv"].get(_key(symbol, timeframe, limit or 0, since))
+        if rows is None:
+            raise ccxt.ExchangeError(f"replay: kayıt yok {symbol} {timeframe} limit={limit} since={since}")
+        return rows
+
+    def milliseconds(self) -> int:
+        ms = self._ms[min(self._k, len(self._ms) - 1)]
+        self._k += 1
+        return ms
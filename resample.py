@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# resample.py
+# Build 3m/5m/15m/1h (any multiple) OHLCV from one 1m series in memory.
+# Buckets are aligned to UTC epoch multiples of the timeframe, like the exchange's
+# own klines: open = first, high = max, low = min, close = last, volume = sum.
+# A leading bucket that does not start at its boundary is dropped (its first minutes
+# are missing, so it would not match the exchange bar); the trailing bucket is kept,
+# it is the in-progress bar exactly as the exchange reports it.
+#
+# Spot check against the exchange:
+#   python resample.py "BTC/USDT:USDT" --tf 5m 15m 1h
+
+import argparse
+from itertools import chain
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from candle_store import timeframe_ms
+
+SCAN_TFS = ("3m", "5m", "15m", "1h")
+
+
+def resample_ohlcv(rows: Sequence[Sequence[float]], tf: str, base_tf: str = "1m") -> List[list]:
+    """ccxt-style [ts,o,h,l,c,v] rows at base_tf → rows at tf (tf must be a multiple)."""
+    if not rows:
+        return []
+    step, base = timeframe_ms(tf), timeframe_ms(base_tf)
+    if step == base:
+        return [list(r) for r in rows]
+    if step % base:
+        raise ValueError(f"{tf} {base_tf}'nin katı değil")
+    a = np.fromiter(chain.from_iterable(r[:6] for r in rows), np.float64, len(rows) * 6).reshape(-1, 6)
+    ts = a[:, 0].astype(np.int64)
+    bucket = ts - ts % step
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(a)] - 1
+    out = np.column_stack([
+        bucket[starts].astype(np.float64),
+        a[starts, 1],
+        np.maximum.reduceat(a[:, 2], starts),
+        np.minimum.reduceat(a[:, 3], starts),
+        a[ends, 4],
+        np.add.reduceat(a[:, 5], starts),
+    ])
+    if ts[0] != bucket[0]:
+        out = out[1:]
+    res = out.tolist()
+    for r in res:
+        r[0] = int(r[0])
+    return res
+
+
+def resample_many(rows_1m: Sequence[Sequence[float]], tfs: Sequence[str] = SCAN_TFS) -> Dict[str, List[list]]:
+    """Tek 1m seriden birden çok TF."""
+    return {tf: resample_ohlcv(rows_1m, tf) for tf in tfs}
+
+
+def base_limit_1m(tf: str, bars: int) -> int:
+    """`bars` tam tf barı için gereken 1m bar sayısı (baştaki yarım kova payı dahil)."""
+    k = timeframe_ms(tf) // 60_000
+    return bars * k + (k - 1)
+
+
+def mismatches(resampled: List[list], native: List[list], rel_tol: float = 1e-9) -> List[tuple]:
+    """Ortak zaman damgalarında OHLC farkları: [(ts, field, ours, exchange)]."""
+    ours = {int(r[0]): r for r in resampled}
+    out = []
+    for r in native:
+        mine = ours.get(int(r[0]))
+        if mine is None:
+            continue
+        for k, name in ((1, "open"), (2, "high"), (3, "low"), (4, "close")):
+            a, b = float(mine[k]), float(r[k])
+            if abs(a - b) > rel_tol * max(abs(a), abs(b), 1e-12):
+                out.append((int(r[0]), name, a, b))
+    return out
+
+
+def main() -> None:
+    import ccxt
+    ap = argparse.ArgumentParser(description="1m → TF resample spot check vs exchange klines")
+    ap.add_argument("symbol")
+    ap.add_argument("--tf", nargs="+", default=list(SCAN_TFS))
+    ap.add_argument("--limit", type=int, default=1440)
+    args = ap.parse_args()
+
+    ex = ccxt.bingx({"enableRateLimit": True, "options": {"defaultType": "swap"}})
+    base = ex.fetch_ohlcv(args.symbol, timeframe="1m", limit=args.limit)
+    for tf in args.tf:
+        ours = resample_ohlcv(base, tf)
+        native = ex.fetch_ohlcv(args.symbol, timeframe=tf, limit=len(ours))
+        # son bar iki istek arasında değişmiş olabilir → karşılaştırma dışı
+        bad = mismatches(ours[:-1], native[:-1])
+        print(f"{tf:>4}: {len(ours)} bar, {len(bad)} fark" + (f" | ilk: {bad[0]}" if bad else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# run_metrics.py
+# Per-run timing and request counters for the scanner (stdlib only).
+#   stage(name)          → wall + CPU time per pipeline stage (context manager, re-entrant per name)
+#   request(ep, s, err)  → per-endpoint request count, latency percentiles, NETERR / ERR counts
+#                          (ccxt.NetworkError ve requests/OSError → NETERR)
+#   count(key)           → free counters (retries, skips…)
+# summary() is the JSON written after each run (SCAN_METRICS_PATH); digest() is the
+# one-line version that can go into the Telegram header (SCAN_METRICS_DIGEST=1).
+
+import json, math, os, time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional
+
+import ccxt
+
+DEFAULT_PATH = ".cache/scan_metrics.json"
+LATENCY_KEEP = 4096   # endpoint başına tutulan son gecikme örnekleri (daemon'da bellek sınırı)
+
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(q / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+
+class _Endpoint:
+    def __init__(self):
+        self.n = 0
+        self.neterr = 0
+        self.err = 0
+        self.total = 0.0
+        self.lat: Deque[float] = deque(maxlen=LATENCY_KEEP)
+
+
+class RunMetrics:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.started = time.time()
+        self._wall0, self._cpu0 = time.perf_counter(), time.process_time()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.endpoints: Dict[str, _Endpoint] = {}
+        self.counters: Dict[str, int] = {}
+
+    # ---------- recording ----------
+
+    @contextmanager
+    def stage(self, name: str):
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            st = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+            st["wall_s"] += time.perf_counter() - w0
+            st["cpu_s"] += time.process_time() - c0
+            st["calls"] += 1
+
+    def request(self, endpoint: str, seconds: float, err: Exception = None) -> None:
+        ep = self.endpoints.get(endpoint)
+        if ep is None:
+            ep = self.endpoints[endpoint] = _Endpoint()
+        ep.n += 1
+        ep.total += seconds
+        ep.lat.append(seconds)
+        if err is not None:
+            if isinstance(err, (ccxt.NetworkError, OSError)):   # requests hataları OSError
+                ep.neterr += 1
+            else:
+                ep.err += 1
+
+    def count(self, key: str, n: int = 1) -> None:
+        self.counters[key] = self.counters.get(key, 0) + n
+
+    def merge(self, other: "RunMetrics") -> None:
+        """
+        Paralel bir koşunun (shard worker) ölçümleri: istek/sayaçlar toplanır;
+        aşamalarda CPU toplanır, wall en uzun shard'ınki (paralel koştular).
+        """
+        for name, st in other.stages.items():
+            cur = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+            cur["wall_s"] = max(cur["wall_s"], st["wall_s"])
+            cur["cpu_s"] += st["cpu_s"]
+            cur["calls"] += st["calls"]
+        for name, ep in other.endpoints.items():
+            cur = self.endpoints.get(name)
+            if cur is None:
+                cur = self.endpoints[name] = _Endpoint()
+            cur.n += ep.n
+            cur.neterr += ep.neterr
+            cur.err += ep.err
+            cur.total += ep.total
+            cur.lat.extend(ep.lat)
+        for k, n in other.counters.items():
+            self.count(k, n)
+
+    # ---------- output ----------
+
+    def summary(self, extra: Dict[str, Any] = None) -> Dict[str, Any]:
+        reqs = {}
+        for name, ep in sorted(self.endpoints.items()):
+            lat = sorted(ep.lat)
+            reqs[name] = {
+                "n": ep.n, "neterr": ep.neterr, "err": ep.err, "total_s": round(ep.total, 4),
+                "p50_ms": round(percentile(lat, 50) * 1e3, 1),
+                "p90_ms": round(percentile(lat, 90) * 1e3, 1),
+                "p99_ms": round(percentile(lat, 99) * 1e3, 1),
+                "max_ms": round((lat[-1] if lat else 0.0) * 1e3, 1),
+            }
+        out = {
+            "started": int(self.started),
+            "wall_s": round(time.perf_counter() - self._wall0, 4),
+            "cpu_s": round(time.process_time() - self._cpu0, 4),
+            "stages": {k: {"wall_s": round(v["wall_s"], 4), "cpu_s": round(v["cpu_s"], 4), "calls": v["calls"]}
+                       for k, v in self.stages.items()},
+            "requests": reqs,
+            "neterr": sum(ep.neterr for ep in self.endpoints.values()),
+            "err": sum(ep.err for ep in self.endpoints.values()),
+            "counters": dict(self.counters),
+        }
+        if extra:
+            out.update(extra)
+        return out
+
+    def digest(self, top: int = 3) -> str:
+        """Tek satır: toplam süre, en uzun aşamalar, istek sayısı/p90, NETERR."""
+        s = self.summary()
+        slow = sorted(s["stages"].items(), key=lambda kv: -kv[1]["wall_s"])[:top]
+        n = sum(r["n"] for r in s["requests"].values())
+        p90 = percentile(sorted(x for ep in self.endpoints.values() for x in ep.lat), 90) * 1e3
+        parts = [f"⏱ {s['wall_s']:.1f}s (cpu {s['cpu_s']:.1f}s)"]
+        if slow:
+            parts.append(" · ".join(f"{k} {v['wall_s']:.1f}s" for k, v in slow))
+        parts.append(f"{n} req p90 {p90:.0f}ms")
+        parts.append(f"NETERR {s['neterr']}" + (f" ERR {s['err']}" if s["err"] else ""))
+        return " | ".join(parts)
+
+    def write(self, path: str, extra: Dict[str, Any] = None) -> None:
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.summary(extra), f, indent=1)
+        os.replace(tmp, path)
+
+
+class MeteredExchange:
+    """
+    Sync ccxt exchange wrapper: load_markets/fetch_tickers/fetch_ohlcv latencies go to `metrics`
+    (endpoint adı `prefix` ile, örn. "bybit." — çoklu borsa taramasında).
+    """
+
+    def __init__(self, ex, metrics: RunMetrics, prefix: str = ""):
+        self._ex = ex
+        self.metrics = metrics
+        self.prefix = prefix
+
+    def __getattr__(self, name):
+        return getattr(self._ex, name)
+
+    def _call(self, endpoint: str, fn, *a, **kw):
+        endpoint = self.prefix + endpoint
+        t0 = time.perf_counter()
+        try:
+            res = fn(*a, **kw)
+        except Exception as e:
+            self.metrics.request(endpoint, time.perf_counter() - t0, e)
+            raise
+        self.metrics.request(endpoint, time.perf_counter() - t0)
+        return res
+
+    def load_markets(self, *a, **kw):
+        return self._call("load_markets", self._ex.load_markets, *a, **kw)
+
+    def fetch_tickers(self, *a, **kw):
+        return self._call("fetch_tickers", self._ex.fetch_tickers, *a, **kw)
+
+    def fetch_ohlcv(self, *a, **kw):
+        return self._call("fetch_ohlcv", self._ex.fetch_ohlcv, *a, **kw)
+
+
+def metrics_path() -> Optional[str]:
+    """SCAN_METRICS_PATH env (varsayılan .cache/scan_metrics.json); 'off' ile kapatılır."""
+    path = os.environ.get("SCAN_METRICS_PATH", "") or DEFAULT_PATH
+    return None if path.strip().lower() in ("0", "off", "none", "false") else path
@@ -1,8 +1,32 @@
-import os, time, math, requests
-from typing import List, Dict, Any, Tuple
+import os, time, math, argparse, multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple
 
 import ccxt  # uses public endpoints
-from formatting import format_telegram_scan_message
+from formatting import format_telegram_delta_message, format_telegram_scan_message
+from fetch_pool import OhlcvPool, SerialFetcher, SharedTokenBucket, is_network_error, make_fetcher
+from fetch_scheduler import FetchScheduler
+from replay_exchange import RecordingExchange, RecordingFetcher, ReplayExchange, Snapshot
+from kline_feed import make_feed
+from candle_store import CandleStore, default_store, fetch_windows, timeframe_ms
+from resample import base_limit_1m, resample_ohlcv
+from src.core.notifier import get_notifier
+from scan_history import ScanHistory, default_history
+from run_metrics import MeteredExchange, RunMetrics, metrics_path
+from delta_notify import default_state, make_board, publish
+from market_cache import default_market_cache
+from grid_batch import build_grids, rows_from_fmt, write_plans
+from grid_opt import optimize_grid
+from grid_sizer import extract_filters, snap_band
+from listing_index import BACKFILL_1D, BACKFILL_1H, ListingIndex, default_index, listing_ts_from_info
+from src.core.indicators import adx14, atr_from_ohlc, crosses_per_hour, mid_cross_count, sma_series, touches_per_hour
+
+try:
+    import batch_indicators as _batch  # numpy; yoksa skaler yol
+except Exception:
+    _batch = None
 
 # ====================== ENV & CONSTANTS ======================
 def _env_float(n: str, d: float) -> float:
@@ -60,142 +84,80 @@ FAST_REQUIRE_PINGPONG = _env_int("FAST_REQUIRE_PINGPONG", 1)
 TOP_FAST = _env_int("TOP_FAST", 12)
 TOP_SEND = _env_int("TOP_SEND", 12)
 
-# Telegram knobs
-TELEGRAM_DEBUG = str(os.environ.get("TELEGRAM_DEBUG", "0")).strip().lower() not in ("", "0", "false", "no")
+# Fetch concurrency (0/1 = serial; >1 = async pool with that many workers)
+FETCH_WORKERS = _env_int("FETCH_WORKERS", 0)
+FETCH_RATE = _env_float("FETCH_RATE", 8.0)   # weighted req/sec budget (BingX ~100 req / 10s)
 
-# ====================== HELPERS ======================
-def sma(vals: List[float], period: int) -> List[float]:
-    out, s = [], 0.0
-    for i, v in enumerate(vals):
-        s += v
-        if i >= period:
-            s -= vals[i - period]
-        out.append(s / period if i >= period - 1 else float("nan"))
-    return out
+# Single-fetch mode: one 1m download per symbol, 5m and FAST_TF are resampled from it
+SINGLE_FETCH_1M = _env_int("SINGLE_FETCH_1M", 0)
+SINGLE_FETCH_MAX_1M = 1440   # tek 1m indirmesinin üst sınırı (single_fetch_limit)
 
-def atr_from_ohlc(values: List[Tuple[float, float, float, float]], period: int = 14) -> float:
-    if len(values) < period + 1:
-        return 0.0
-    trs = []
-    prev_close = values[0][3]
-    for (o, h, l, c) in values[1:]:
-        tr = max(h - l, abs(h - prev_close), abs(l - prev_close))
-        trs.append(tr)
-        prev_close = c
-    if len(trs) < period:
-        return 0.0
-    return sum(trs[-period:]) / period
-
-def adx14(ohlc: List[Tuple[float, float, float, float]]) -> float:
-    n = 14
-    if len(ohlc) < n + 1:
-        return 100.0
-    trs, pdms, ndms = [], [], []
-    prev = ohlc[0]
-    for cur in ohlc[1:]:
-        (po, ph, pl, pc) = prev
-        (o, h, l, c) = cur
-        tr = max(h - l, abs(h - pc), abs(l - pc))
-        up_move = h - ph
-        down_move = pl - l
-        plus_dm = max(up_move, 0.0)
-        minus_dm = max(down_move, 0.0)
-        if plus_dm < minus_dm:
-            plus_dm = 0.0
-        elif minus_dm < plus_dm:
-            minus_dm = 0.0
-        trs.append(tr); pdms.append(plus_dm); ndms.append(minus_dm)
-        prev = cur
-
-    def wilder(arr: List[float], p: int) -> List[float]:
-        out = []
-        sm = sum(arr[:p]); out.append(sm)
-        for i in range(p, len(arr)):
-            sm = sm - (sm / p) + arr[i]
-            out.append(sm)
-        return out
+def single_fetch_tf_error(tf: str, limit: int) -> Optional[str]:
+    """SINGLE_FETCH_1M ile tf × limit 1m'den türetilemiyorsa sebep, türetilebiliyorsa None."""
+    step = timeframe_ms(tf)
+    if step % 60_000:
+        return f"{tf} 1m'nin katı değil"
+    if limit * (step // 60_000) > SINGLE_FETCH_MAX_1M:
+        return f"{tf} × {limit} bar > {SINGLE_FETCH_MAX_1M} 1m bar"
+    return None
 
-    if min(len(trs), len(pdms), len(ndms)) < n:
-        return 100.0
+if SINGLE_FETCH_1M and single_fetch_tf_error(FAST_TF, FAST_LIMIT):
+    print(f"[warn] SINGLE_FETCH_1M kapatıldı: FAST_TF {single_fetch_tf_error(FAST_TF, FAST_LIMIT)}; normal fetch")
+    SINGLE_FETCH_1M = 0
 
-    atr_ws, pdi_ws, ndi_ws = wilder(trs, n), wilder(pdms, n), wilder(ndms, n)
-    ln = min(len(atr_ws), len(pdi_ws), len(ndi_ws))
-    atr_ws, pdi_ws, ndi_ws = atr_ws[-ln:], pdi_ws[-ln:], ndi_ws[-ln:]
+# Venues (--exchanges): "bingx" or "bingx,bybit:5,okx:4:3" → ccxt id[:req/s[:workers]]
+# (defaults FETCH_RATE / FETCH_WORKERS); more than one → one shared FetchScheduler
+SCAN_EXCHANGES = _env_str("SCAN_EXCHANGES", "bingx")
 
-    plus_di = [(pdi_ws[i] / atr_ws[i] * 100.0) if atr_ws[i] > 0 else 0.0 for i in range(ln)]
-    minus_di = [(ndi_ws[i] / atr_ws[i] * 100.0) if atr_ws[i] > 0 else 0.0 for i in range(ln)]
+# Sharded scan (--shards N): pairs split across N worker processes, one shared FETCH_RATE budget
+SCAN_SHARDS = _env_int("SCAN_SHARDS", 0)
 
-    dx = []
-    for i in range(ln):
-        s = plus_di[i] + minus_di[i]
-        dx.append((abs(plus_di[i] - minus_di[i]) / s * 100.0) if s > 0 else 0.0)
+# Daemon mode (--daemon): kline feed kind, poll wait and ticker refresh period
+DAEMON_FEED = _env_str("DAEMON_FEED", "poll")
+DAEMON_POLL_SEC = _env_float("DAEMON_POLL_SEC", 5.0)
+DAEMON_TICKER_SEC = _env_float("DAEMON_TICKER_SEC", 300.0)
 
-    if len(dx) < n:
-        return 100.0
-    return sum(dx[-n:]) / n
+# Batch (NumPy) indicator engine for the compute stages (0 = scalar loops)
+BATCH_COMPUTE = _env_int("BATCH_COMPUTE", 1)
 
-def mid_cross_count(closes: List[float], mid: List[float]) -> int:
-    cnt, prev_diff = 0, None
-    for c, m in zip(closes, mid):
-        if m != m:
-            continue
-        diff = c - m
-        if prev_diff is not None:
-            if diff == 0:
-                cnt += 1
-            elif (diff > 0 and prev_diff < 0) or (diff < 0 and prev_diff > 0):
-                cnt += 1
-        prev_diff = diff
-    return cnt
-
-def percentile(sorted_vals: List[float], q: float) -> float:
-    if not sorted_vals:
-        return float("nan")
-    q = min(max(q, 0.0), 1.0)
-    idx = q * (len(sorted_vals) - 1)
-    lo, hi = int(math.floor(idx)), int(math.ceil(idx))
-    if lo == hi:
-        return sorted_vals[lo]
-    frac = idx - lo
-    return sorted_vals[lo] * (1 - frac) + sorted_vals[hi] * frac
-
-def touches_per_hour(closes: List[float], q_lo: float = 0.2, q_hi: float = 0.8) -> float:
-    S = sorted(closes)
-    lo = percentile(S, q_lo); hi = percentile(S, q_hi)
-    touches = 0
-    for c in closes:
-        if c <= lo or c >= hi:
-            touches += 1
-    hours = max(len(closes) / 60.0, 1e-6)
-    return touches / hours
-
-def crosses_per_hour(closes: List[float]) -> Tuple[float, float]:
-    mid = sma(closes, 20)
-    cross_idx = []
-    prev_diff = None
-    for i, (c, m) in enumerate(zip(closes, mid)):
-        if m != m:
-            continue
-        diff = c - m
-        if prev_diff is not None:
-            if diff == 0 or (diff > 0 and prev_diff < 0) or (diff < 0 and prev_diff > 0):
-                cross_idx.append(i)
-        prev_diff = diff
-
-    warmup = 19
-    effective_len = max(len(closes) - warmup, 1)
-    hours = max(effective_len / 60.0, 1e-6)
-
-    count_rate = len(cross_idx) / hours
-    intervals = [(cross_idx[i] - cross_idx[i - 1]) for i in range(1, len(cross_idx))]
-    if not intervals:
-        return count_rate, float('inf')
-    intervals.sort()
-    med = float(intervals[len(intervals) // 2])
-    rate_from_med = (60.0 / med) if (med > 0 and math.isfinite(med)) else 0.0
-
-    return max(count_rate, rate_from_med), med
+# Early-reject pipeline, cheapest stage first. A symbol only reaches a stage
+# if every earlier one kept it; each stage reports how many it rejected.
+SCAN_STAGES = (
+    ("ticker",      "24h ticker: likidite + 24h aralık (istek yok)"),
+    ("stats_5m",    "5m fetch + ATR/aralık/drift/mid-cross → base_ok"),
+    ("adx",         "ADX14 (sadece base_ok) → ADX/MID/DRIFT"),
+    ("listing_age", "listing yaşı (index; gerekirse fallback fetch)"),
+    ("fast",        "FAST_TF fetch + xph/med/edge"),
+)
+
+# Run metrics: per-stage wall/CPU, per-endpoint latency → SCAN_METRICS_PATH (JSON);
+# SCAN_METRICS_DIGEST=1 adds a one-line digest to the Telegram header
+SCAN_METRICS_DIGEST = _env_int("SCAN_METRICS_DIGEST", 0)
+METRICS = RunMetrics()
+
+# Grid plans for the sent candidates (grid_batch; no extra requests): GRID_PLAN_PATH=.csv/.json
+GRID_PLAN_PATH = _env_str("GRID_PLAN_PATH", "off")
+GRID_PLAN_CAPITAL = _env_float("GRID_PLAN_CAPITAL", 100.0)
 
+# Grid optimizer (grid_opt): result candidates' band/levels searched on their 1m path
+# (FAST_TF=1m or SINGLE_FETCH_1M) instead of suggest_grid; per-symbol time budget
+GRID_OPTIMIZE = _env_int("GRID_OPTIMIZE", 0)
+GRID_OPT_BUDGET_MS = _env_float("GRID_OPT_BUDGET_MS", 20.0)
+GRID_OPT_FEE = _env_float("GRID_OPT_FEE", 0.0006)
+
+# Telegram knobs
+TELEGRAM_DEBUG = str(os.environ.get("TELEGRAM_DEBUG", "0")).strip().lower() not in ("", "0", "false", "no")
+TELEGRAM_FLUSH_S = _env_float("TELEGRAM_FLUSH_S", 60.0)   # tek tarama sonunda kuyruk boşaltma üst sınırı
+
+# Delta notifications: only entries/exits/band-metric shifts vs. the previous run
+# (NOTIFY_STATE_PATH); full list every NOTIFY_FULL_EVERY_H hours. NOTIFY_MODE=full → old behaviour.
+NOTIFY_MODE = _env_str("NOTIFY_MODE", "delta").strip().lower()
+NOTIFY_FULL_EVERY_H = _env_float("NOTIFY_FULL_EVERY_H", 24.0)
+NOTIFY_BAND_SHIFT = _env_float("NOTIFY_BAND_SHIFT", 0.01)      # grid kenarı fiyatın %1'inden fazla kayarsa
+NOTIFY_METRIC_SHIFT = _env_float("NOTIFY_METRIC_SHIFT", 0.25)  # ATR%/Range%/ADX göreli değişim
+NOTIFY_EDIT = _env_int("NOTIFY_EDIT", 0)                       # 1 → delta koşusu son tam mesajı yerinde düzenler
+
+# ====================== HELPERS ======================
 def suggest_grid(last: float, atr_abs: float) -> Tuple[float, float, int]:
     if last <= 0:
         return (last, last, 12)
@@ -206,56 +168,45 @@ def suggest_grid(last: float, atr_abs: float) -> Tuple[float, float, int]:
     half = last * width_pct / 2.0
     return (last - half, last + half, 12)
 
-def send_telegram(msg: str, *, parse_mode: str = None, disable_preview: bool = True) -> None:
-    token = os.environ.get("TELEGRAM_BOT_TOKEN") or ""
-    chat_id = os.environ.get("TELEGRAM_CHAT_ID") or ""
-    dbg = str(os.environ.get("TELEGRAM_DEBUG", "0")).strip().lower() not in ("", "0", "false", "no")
-    if not token or not chat_id:
-        print("[info] Telegram env yok; mesaj atılmadı.")
-        return
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    def _mask_chat(cid: str) -> str:
-        s = str(cid)
-        return s[:2] + "***" + s[-3:] if len(s) > 6 else "***"
-    HARD_LIMIT = 4096
-    SAFE = 560
-    LIM = HARD_LIMIT - SAFE
-    lines = msg.splitlines(keepends=True)
-    parts, buf, size = [], [], 0
-    for ln in lines:
-        if size + len(ln) > LIM and buf:
-            parts.append("".join(buf))
-            buf, size = [], 0
-        buf.append(ln); size += len(ln)
-    if buf:
-        parts.append("".join(buf))
-    if not parts:
-        parts = [msg]
-    for idx, part in enumerate(parts, 1):
-        try:
-            payload = {"chat_id": chat_id, "text": part, "disable_web_page_preview": "true" if disable_preview else "false"}
-            if parse_mode:
-                payload["parse_mode"] = parse_mode
-            if dbg:
-                preview = part.replace("\n", " ")[:120]
-                print(f"[tg-debug] send chunk {idx}/{len(parts)} to {_mask_chat(chat_id)} | len={len(part)} | preview='{preview}…'")
-            r = requests.post(url, data=payload, timeout=20)
-        except Exception as e:
-            print(f"[warn] Telegram exception (chunk {idx}/{len(parts)}): {e}")
+def snap_grids(states: List[Dict[str, Any]], markets: Dict[str, Any]) -> None:
+    """suggest_grid bantlarını sembolün fiyat tick'ine oturt (grid_sizer ile aynı ızgara; alt ↓, üst ↑)."""
+    for st in states:
+        m = markets.get(st["symbol"])
+        if not m:
             continue
-        ok, desc, code = False, "", None
         try:
-            j = r.json(); ok = bool(j.get("ok", False)); desc = j.get("description", ""); code = j.get("error_code")
+            price_step = extract_filters(m)[0]
         except Exception:
-            pass
-        if r.status_code != 200 or not ok:
-            body = ""
-            try: body = r.text[:300]
-            except Exception: pass
-            print(f"[warn] Telegram API error (chunk {idx}/{len(parts)}): status={r.status_code}, ok={ok}, code={code}, desc={desc}, body={body}")
-        else:
-            if dbg: print(f"[tg-debug] chunk {idx}/{len(parts)} delivered: ok={ok}")
-        time.sleep(0.2)
+            continue
+        st["grid_lower"], st["grid_upper"] = snap_band(st["grid_lower"], st["grid_upper"], price_step)
+
+def optimize_grids(pairs: List[Tuple[Dict[str, Any], List[list]]], markets: Dict[str, Any]) -> int:
+    """grid_opt: (state, 1m OHLCV) çiftlerinde suggest_grid bandını optimize edilmiş olanla değiştir."""
+    done = 0
+    for st, rows in pairs:
+        m = markets.get(st["symbol"])
+        if not m or not rows:
+            continue
+        try:
+            best = optimize_grid(st["symbol"], [float(r[4]) for r in rows], extract_filters(m),
+                                 GRID_PLAN_CAPITAL, st["last"], fee=GRID_OPT_FEE,
+                                 budget_s=GRID_OPT_BUDGET_MS / 1000.0)
+        except Exception as e:
+            print("[warn] grid_opt", st["symbol"], e)
+            continue
+        if best is not None:
+            st["grid_lower"], st["grid_upper"], st["levels"] = best["lower"], best["upper"], best["levels"]
+            done += 1
+    return done
+
+def send_telegram(msg: str, *, parse_mode: str = None, disable_preview: bool = True) -> None:
+    """Kuyruğa bırakır (bloklamaz); teslimat src.core.notifier arka plan thread'inde."""
+    tg = get_notifier()
+    if not tg.enabled:
+        print("[info] Telegram env yok; mesaj atılmadı.")
+        return
+    tg.observer = METRICS.request
+    tg.send(msg, parse_mode=parse_mode, disable_preview=disable_preview)
 
 def ticker_quote_usdt(tk: Dict[str, Any]) -> float:
     qv = tk.get("quoteVolume")
@@ -271,23 +222,41 @@ def ticker_quote_usdt(tk: Dict[str, Any]) -> float:
     except Exception:
         return 0.0
 
-def estimate_listing_age_days(exchange, symbol: str, market_info: Dict[str, Any]) -> float:
-    info = market_info.get("info", {}) if isinstance(market_info, dict) else {}
-    for key in ("listingTime", "createTime", "listTime", "onboardDate", "launchTime", "created"):
-        if key in info:
-            try:
-                ts = int(info[key])
-                if ts > 1e12:
-                    while ts > 1e13:
-                        ts //= 10
-                if ts < 1e11:
-                    ts *= 1000
-                now_ms = exchange.milliseconds()
-                return (now_ms - ts) / (1000 * 60 * 60 * 24)
-            except Exception:
-                continue
+def ticker_range_pct(tk: Dict[str, Any]) -> Optional[float]:
+    """24h (high-low)/last from the ticker; None if the ticker lacks the fields."""
     try:
-        bars = exchange.fetch_ohlcv(symbol, timeframe="1h", limit=500)
+        hi, lo = float(tk.get("high")), float(tk.get("low"))
+        last = float(tk.get("last") or tk.get("close"))
+    except (TypeError, ValueError):
+        return None
+    return (hi - lo) / last if last > 0 else None
+
+def listing_age_from_info(now_ms: int, market_info: Dict[str, Any]):
+    """Market info'daki listing zaman damgasından yaş (gün); anahtar yoksa None."""
+    ts = listing_ts_from_info(market_info)
+    return None if ts is None else (now_ms - ts) / (1000 * 60 * 60 * 24)
+
+def estimate_listing_age_days(exchange, symbol: str, market_info: Dict[str, Any],
+                              store: CandleStore = None, index: ListingIndex = None) -> float:
+    now_ms = exchange.milliseconds()
+    days = listing_age_from_info(now_ms, market_info)
+    if days is None and index is not None:
+        days = index.age_days(symbol, now_ms)
+    if days is not None:
+        return days
+    try:
+        if index is not None:
+            tf, lim = BACKFILL_1H
+            bars = exchange.fetch_ohlcv(symbol, timeframe=tf, limit=lim)
+            if index.record_backfill(symbol, bars, tf, lim):
+                tf, lim = BACKFILL_1D
+                index.record_backfill(symbol, exchange.fetch_ohlcv(symbol, timeframe=tf, limit=lim), tf, lim)
+            known = index.age_days(symbol, now_ms)
+            return known if known is not None else (len(bars) / 24.0)
+        if store is not None:
+            bars = store.fetch(exchange, symbol, "1h", 500)
+        else:
+            bars = exchange.fetch_ohlcv(symbol, timeframe="1h", limit=500)
         return (len(bars) / 24.0)
     except Exception:
         return -1.0
@@ -305,7 +274,7 @@ def _to_fmt_speed(d):
 
 def _to_fmt_entry(d):
     return {
-        "symbol": d.get("symbol"),
+        "symbol": f"{d.get('symbol')} · {d['venue']}" if d.get("venue") else d.get("symbol"),
         "last": d.get("last"),
         "atr_abs": d.get("atr_abs"),
         "atr_pct": d.get("atr_pct"),
@@ -320,26 +289,723 @@ def _to_fmt_entry(d):
         "speed": _to_fmt_speed(d) if d.get("fast_checked") or d.get("speed") else d.get("speed", {}),
     }
 
+# ====================== PER-SYMBOL EVALUATION ======================
+def _log_fetch_error(sym: str, err: Exception) -> None:
+    if is_network_error(err):
+        print("NETERR", sym, err)
+    else:
+        print("ERR", sym, err)
+
+def eval_5m(sym: str, tk: Dict[str, Any], ohlcv5: List[list], with_adx: bool = True) -> Dict[str, Any]:
+    """
+    5m penceresinden temel metrikler + base_ok. (Listing yaşı ve FAST sonra eklenir.)
+    with_adx=False → adx None kalır; apply_adx ile sonradan doldurulur.
+    """
+    closes5 = [float(c) for _, o, h, l, c, v in ohlcv5]
+    ohlc5 = [(float(o), float(h), float(l), float(c)) for _, o, h, l, c, v in ohlcv5]
+    last = closes5[-1]
+
+    atr50 = atr_from_ohlc(ohlc5, period=50)
+    window = closes5[-180:] if len(closes5) >= 180 else closes5
+    total_range = (max(window) - min(window)) if window else 0.0
+    rng = (total_range / last) if last > 0 else 0.0
+
+    adx_val = adx14(ohlc5[-150:]) if with_adx else None
+    mid5 = sma_series(closes5, 20)
+    midcross5 = mid_cross_count(closes5[-180:], mid5[-180:])
+    drift = abs(closes5[-1] - closes5[0])
+    drift_ratio = (drift / total_range) if total_range > 0 else 0.0
+    return _state_5m(sym, tk, last, atr50, rng, adx_val, midcross5, drift_ratio)
+
+def _state_5m(sym: str, tk: Dict[str, Any], last: float, atr50: float, rng: float,
+              adx_val: float, midcross5: int, drift_ratio: float) -> Dict[str, Any]:
+    qvol = ticker_quote_usdt(tk)
+    liq_ok = (qvol >= MIN_QVOL_USDT) if MIN_QVOL_USDT > 0 else True
+    lower, upper, levels = suggest_grid(last, atr50)
+    atr_pct = (atr50 / last) if last > 0 else 0.0
+    base_ok = (atr_pct >= ATR_PCT_MIN and rng >= RANGE_PCT_MIN and liq_ok)
+    return {
+        "symbol": sym, "last": last, "atr_abs": atr50, "atr_pct": atr_pct, "range_pct": rng,
+        "grid_lower": lower, "grid_upper": upper, "levels": levels,
+        "adx": adx_val, "midcross": midcross5, "drift_ratio": drift_ratio,
+        "liq_ok": liq_ok, "base_ok": base_ok, "age_ok": True,
+    }
+
+def eval_5m_many(items: List[Tuple[str, Dict[str, Any], List[list]]], with_adx: bool = True) -> List[Dict[str, Any]]:
+    """eval_5m for many symbols; NumPy batch engine when available (same values, one pass)."""
+    if _batch is not None and BATCH_COMPUTE and items:
+        try:
+            m = _batch.scan_metrics_5m([o for _, _, o in items], with_adx=with_adx)
+            return [
+                _state_5m(sym, tk, float(m["last"][r]), float(m["atr_abs"][r]), float(m["range_pct"][r]),
+                          float(m["adx"][r]) if with_adx else None, int(m["midcross"][r]),
+                          float(m["drift_ratio"][r]))
+                for r, (sym, tk, _) in enumerate(items)
+            ]
+        except Exception as e:
+            print("[warn] batch compute başarısız, skaler yola dönülüyor:", e)
+    out = []
+    for sym, tk, ohlcv5 in items:
+        try:
+            out.append(eval_5m(sym, tk, ohlcv5, with_adx))
+        except Exception as e:
+            print("ERR", sym, e)
+    return out
+
+def apply_adx_many(pairs: List[Tuple[Dict[str, Any], List[list]]]) -> None:
+    """ADX stage: fills st["adx"] for the given (state, 5m window) pairs."""
+    if _batch is not None and BATCH_COMPUTE and pairs:
+        try:
+            vals = _batch.adx_5m([o for _, o in pairs])
+            for (st, _), v in zip(pairs, vals.tolist()):
+                st["adx"] = float(v)
+            return
+        except Exception as e:
+            print("[warn] batch compute başarısız, skaler yola dönülüyor:", e)
+    for st, ohlcv5 in pairs:
+        st["adx"] = adx14([(float(o), float(h), float(l), float(c)) for _, o, h, l, c, v in ohlcv5[-150:]])
+
+def apply_listing_age(st: Dict[str, Any], days: float) -> None:
+    st["age_ok"] = (days < 0) or (days >= LISTED_MIN_DAYS)
+
+def pingpong_of(st: Dict[str, Any]) -> bool:
+    return (
+        st["base_ok"] and st["age_ok"] and (st["adx"] <= ADX_MAX)
+        and (st["midcross"] >= MID_CROSS_MIN) and (st["drift_ratio"] <= DRIFT_MAX_RATIO)
+    )
+
+def allow_fast_of(st: Dict[str, Any]) -> bool:
+    return bool(FAST_S_MODE and (pingpong_of(st) or (FAST_REQUIRE_PINGPONG == 0)))
+
+def fast_bypasses_base() -> bool:
+    """FAST_REQUIRE_PINGPONG=0: base_ok olmayan sembol de FAST listesine girebilir."""
+    return bool(FAST_S_MODE and FAST_REQUIRE_PINGPONG == 0)
+
+def ticker_reject(tk: Dict[str, Any]) -> str:
+    """
+    Ticker-only stage: reason tag if the symbol can not pass base_ok (or the FAST
+    wide-range gate), None otherwise. The 24h range covers the 15h 5m window, so
+    a 24h range under the floor means the 5m range is under it too.
+    """
+    bypass = fast_bypasses_base()
+    if not bypass and MIN_QVOL_USDT > 0 and ticker_quote_usdt(tk) < MIN_QVOL_USDT:
+        return "LOWLIQ"
+    floor = min(RANGE_PCT_MIN, WIDE_MIN_RANGE_PCT) if bypass else RANGE_PCT_MIN
+    rng = ticker_range_pct(tk)
+    if rng is not None and rng < floor:
+        return "LOWRANGE"
+    return None
+
+def eval_fast(st: Dict[str, Any], ohlcv1: List[list]) -> Dict[str, Any]:
+    """FAST S (1m ya da seçilen TF) metrikleri."""
+    if ohlcv1 and len(ohlcv1) >= 120:
+        closes1 = [float(c) for _, o, h, l, c, v in ohlcv1]
+        xph_val, med_min = crosses_per_hour(closes1)
+        edgeph_val = touches_per_hour(closes1, 0.2, 0.8)
+        return _fast_state(st, xph_val, med_min, edgeph_val)
+    return _fast_state(st)
+
+def _fast_state(st: Dict[str, Any], xph_val: float = None, med_min: float = None,
+                edgeph_val: float = None) -> Dict[str, Any]:
+    out = {"fast_checked": True, "fast_ok": False,
+           "xph": "NA", "med": "NA", "edgeph": "NA",
+           "xph_n": 0.0, "med_n": 0.0, "edgeph_n": 0.0}
+    if xph_val is not None:
+        wide_ok = (st["range_pct"] >= WIDE_MIN_RANGE_PCT)
+        out["fast_ok"] = (
+            xph_val >= MIN_CROSSES_PER_HOUR
+            and (CYCLE_MIN_MIN <= med_min <= CYCLE_MAX_MIN)
+            and edgeph_val >= MIN_EDGE_TOUCHES_PH
+            and wide_ok
+        )
+        out["xph"], out["med"], out["edgeph"] = f"{xph_val:.1f}", f"{med_min:.0f}", f"{edgeph_val:.1f}"
+        out["xph_n"], out["med_n"], out["edgeph_n"] = float(xph_val), float(med_min), float(edgeph_val)
+    return out
+
+def eval_fast_many(pairs: List[Tuple[Dict[str, Any], List[list]]]) -> List[Dict[str, Any]]:
+    """eval_fast for many symbols (batch engine when available). Exceptions are returned in place."""
+    out: List[Any] = [None] * len(pairs)
+    todo = []
+    for k, (st, ohlcv1) in enumerate(pairs):
+        if _batch is not None and BATCH_COMPUTE and ohlcv1 and len(ohlcv1) >= 120:
+            todo.append(k)
+        else:
+            try:
+                out[k] = eval_fast(st, ohlcv1)
+            except Exception as e:
+                out[k] = e
+    if todo:
+        try:
+            m = _batch.fast_metrics([pairs[k][1] for k in todo])
+            for r, k in enumerate(todo):
+                out[k] = _fast_state(pairs[k][0], float(m["xph"][r]), float(m["med"][r]), float(m["edgeph"][r]))
+        except Exception as e:
+            print("[warn] batch compute başarısız, skaler yola dönülüyor:", e)
+            for k in todo:
+                try:
+                    out[k] = eval_fast(*pairs[k])
+                except Exception as e2:
+                    out[k] = e2
+    return out
+
+def result_row(st: Dict[str, Any], fast: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Ara durumdan formatlayıcıya giden sonuç satırı."""
+    pingpong_ok = pingpong_of(st)
+    fast = fast or {"fast_checked": False, "fast_ok": False,
+                    "xph": "NA", "med": "NA", "edgeph": "NA",
+                    "xph_n": 0.0, "med_n": 0.0, "edgeph_n": 0.0}
+
+    why = []
+    if st["atr_pct"] < ATR_PCT_MIN:  why.append("LOWVOL")
+    if st["range_pct"] < RANGE_PCT_MIN: why.append("LOWRANGE")
+    if not st["liq_ok"]:             why.append("LOWLIQ")
+    if LISTED_MIN_DAYS > 0 and st["base_ok"] and not st["age_ok"]: why.append("NEW")
+    if st["adx"] > ADX_MAX:          why.append("TREND")
+    if st["midcross"] < MID_CROSS_MIN: why.append("MID")
+    if st["drift_ratio"] > DRIFT_MAX_RATIO: why.append("DRIFT")
+
+    return {
+        "symbol": st["symbol"],
+        "last": st["last"],
+        "atr_abs": st["atr_abs"],
+        "atr_pct": st["atr_pct"],
+        "range_pct": st["range_pct"],
+        "grid_lower": st["grid_lower"],
+        "grid_upper": st["grid_upper"],
+        "levels": st["levels"],
+        "adx": st["adx"],
+        "midcross": st["midcross"],
+        "drift_ratio": st["drift_ratio"],
+        "pingpong_ok": pingpong_ok,
+        "why_tags": ([] if pingpong_ok else why),
+        "fast_checked": fast["fast_checked"],
+        "fast_ok": fast["fast_ok"],
+        "xph": fast["xph"], "med": fast["med"], "edgeph": fast["edgeph"],
+        "xph_n": fast["xph_n"], "med_n": fast["med_n"], "edgeph_n": fast["edgeph_n"],
+    }
+
+@contextmanager
+def _timed(stage: str):
+    t0 = time.perf_counter()
+    try:
+        with METRICS.stage(stage):
+            yield
+    finally:
+        print(f"[time] {stage}: {time.perf_counter() - t0:.2f}s")
+
+def single_fetch_limit() -> int:
+    """1m bars needed to resample both the 5m window and FAST_TF × FAST_LIMIT."""
+    return min(max(base_limit_1m("5m", 200), FAST_LIMIT * (timeframe_ms(FAST_TF) // 60_000)), SINGLE_FETCH_MAX_1M)
+
+class StageCounter:
+    """In/rejected counts per SCAN_STAGES entry; report() prints them in pipeline order."""
+
+    def __init__(self):
+        self.counts: Dict[str, Tuple[int, int]] = {}
+
+    def record(self, stage: str, n_in: int, n_kept: int) -> None:
+        self.counts[stage] = (n_in, n_in - n_kept)
+
+    def report(self) -> None:
+        for name, _ in SCAN_STAGES:
+            if name in self.counts:
+                n_in, rej = self.counts[name]
+                print(f"[stage] {name}: {n_in} girdi, {rej} elendi, {n_in - rej} kaldı")
+
+    def merge(self, counts: Dict[str, Tuple[int, int]]) -> None:
+        for stage, (n_in, rej) in counts.items():
+            a, b = self.counts.get(stage, (0, 0))
+            self.counts[stage] = (a + n_in, b + rej)
+
+    def as_dict(self) -> Dict[str, Dict[str, int]]:
+        return {name: {"in": n_in, "rejected": rej} for name, (n_in, rej) in self.counts.items()}
+
+def scan_pairs(ex, markets: Dict[str, Any], pairs: List[Tuple[str, Dict[str, Any]]], fetcher,
+               store: CandleStore = None, index: ListingIndex = None,
+               stages: StageCounter = None) -> Tuple[list, list, list]:
+    """
+    Staged scan over ranked pairs, cheapest stage first (SCAN_STAGES): ticker-only
+    predicates drop symbols before any OHLCV request, ADX is computed only for
+    symbols that can still reach a result list, FAST is fetched only for the rest.
+    Every stage issues its requests through `fetcher` (serial or async pool), so
+    both paths see identical inputs and produce identical rows.
+    With a candle store only bars newer than the stored ones are requested; with a
+    listing index the listing-age fallback is fetched once per symbol, ever.
+    Returns (allres, pp, fast_pp) in `pairs` order.
+    """
+    now_ms = ex.milliseconds()
+    stages = stages if stages is not None else StageCounter()
+
+    # ----- ticker-only predicates (no request) -----
+    live = [(sym, tk) for sym, tk in pairs if ticker_reject(tk) is None]
+    stages.record("ticker", len(pairs), len(live))
+
+    # ----- 5m window (native, or resampled from a single 1m download) -----
+    base_1m: Dict[str, List[list]] = {}
+    with _timed("fetch_5m"):
+        if SINGLE_FETCH_1M:
+            res_base = fetch_windows(fetcher, store, [(sym, "1m", single_fetch_limit()) for sym, _ in live], now_ms)
+            res5 = []
+            for (sym, _), rows in zip(live, res_base):
+                if isinstance(rows, Exception):
+                    res5.append(rows)
+                    continue
+                base_1m[sym] = rows
+                res5.append(resample_ohlcv(rows, "5m")[-200:])
+        else:
+            res5 = fetch_windows(fetcher, store, [(sym, "5m", 200) for sym, _ in live], now_ms)
+
+    with _timed("compute_5m"):
+        items = []
+        for (sym, tk), ohlcv5 in zip(live, res5):
+            if isinstance(ohlcv5, Exception):
+                _log_fetch_error(sym, ohlcv5)
+                continue
+            if not ohlcv5 or len(ohlcv5) < 60:
+                print("SKIP (yetersiz 5m OHLCV) ", sym)
+                METRICS.count("skip_short_5m")
+                continue
+            items.append((sym, tk, ohlcv5))
+        states = eval_5m_many(items, with_adx=False)
+    rows5 = {sym: ohlcv5 for sym, _, ohlcv5 in items}
+    bypass = fast_bypasses_base()
+    states = [st for st in states if st["base_ok"] or bypass]
+    snap_grids(states, markets)
+    stages.record("stats_5m", len(live), len(states))
+
+    # ----- ADX (only symbols that can still reach a result list) -----
+    with _timed("compute_adx"):
+        apply_adx_many([(st, rows5[st["symbol"]]) for st in states])
+    candidates = [st for st in states if st["base_ok"] and st["adx"] <= ADX_MAX
+                  and st["midcross"] >= MID_CROSS_MIN and st["drift_ratio"] <= DRIFT_MAX_RATIO]
+    stages.record("adx", len(states), len(candidates))
+
+    # ----- listing age: free lookups first, fallback fetch for the rest of base_ok (NEW tag in Top) -----
+    with _timed("listing_age"):
+        if LISTED_MIN_DAYS > 0:
+            fallback = []
+            for st in states:
+                if not st["base_ok"]:
+                    continue
+                days = listing_age_from_info(now_ms, markets.get(st["symbol"], {}))
+                if days is None and index is not None:
+                    days = index.age_days(st["symbol"], now_ms)
+                if days is not None:
+                    apply_listing_age(st, days)
+                else:
+                    fallback.append(st)
+            if index is None:
+                res_age = fetch_windows(fetcher, store, [(st["symbol"], "1h", 500) for st in fallback], now_ms)
+                for st, bars in zip(fallback, res_age):
+                    apply_listing_age(st, -1.0 if isinstance(bars, Exception) else len(bars) / 24.0)
+            else:
+                # one-time backfill: 1h×500, full page → 1d probe for the real first bar
+                tf, lim = BACKFILL_1H
+                res_age = fetcher.fetch_many([(st["symbol"], tf, lim, None) for st in fallback])
+                deep = []
+                for st, bars in zip(fallback, res_age):
+                    if isinstance(bars, Exception):
+                        apply_listing_age(st, -1.0)
+                    elif index.record_backfill(st["symbol"], bars, tf, lim):
+                        deep.append((st, bars))
+                    else:
+                        known = index.age_days(st["symbol"], now_ms)
+                        apply_listing_age(st, known if known is not None else len(bars) / 24.0)
+                tf, lim = BACKFILL_1D
+                res_deep = fetcher.fetch_many([(st["symbol"], tf, lim, None) for st, _ in deep])
+                for (st, bars1h), bars in zip(deep, res_deep):
+                    if not isinstance(bars, Exception):
+                        index.record_backfill(st["symbol"], bars, tf, lim)
+                    known = index.age_days(st["symbol"], now_ms)
+                    apply_listing_age(st, known if known is not None else len(bars1h) / 24.0)
+                if fallback:
+                    print(f"[info] listing index backfill: {len(fallback)} sembol ({len(deep)} derin)")
+    stages.record("listing_age", len(candidates), sum(1 for st in candidates if st["age_ok"]))
+
+    # ----- FAST S (1m or chosen TF) -----
+    fast_by_sym: Dict[str, Dict[str, Any]] = {}
+    with _timed("fetch_fast"):
+        need_fast = [st for st in states if allow_fast_of(st)]
+        if SINGLE_FETCH_1M:
+            res1 = [resample_ohlcv(base_1m[st["symbol"]], FAST_TF)[-FAST_LIMIT:] for st in need_fast]
+        else:
+            res1 = fetch_windows(fetcher, store, [(st["symbol"], FAST_TF, FAST_LIMIT) for st in need_fast], now_ms)
+    with _timed("compute_fast"):
+        dropped = set()
+        ok_pairs = []
+        for st, ohlcv1 in zip(need_fast, res1):
+            if isinstance(ohlcv1, Exception):
+                _log_fetch_error(st["symbol"], ohlcv1)
+                dropped.add(st["symbol"])
+            else:
+                ok_pairs.append((st, ohlcv1))
+        for (st, _), fast in zip(ok_pairs, eval_fast_many(ok_pairs)):
+            if isinstance(fast, Exception):
+                print("ERR", st["symbol"], fast)
+                dropped.add(st["symbol"])
+            else:
+                fast_by_sym[st["symbol"]] = fast
+    stages.record("fast", len(need_fast), sum(1 for f in fast_by_sym.values() if f["fast_ok"]))
+
+    if GRID_OPTIMIZE and (SINGLE_FETCH_1M or FAST_TF == "1m"):
+        with _timed("grid_opt"):
+            shown = [st for st in states if st["symbol"] not in dropped and (
+                pingpong_of(st) or fast_by_sym.get(st["symbol"], {}).get("fast_ok"))]
+            rows1 = {st["symbol"]: rows for st, rows in ok_pairs}
+            opt = [(st, base_1m[st["symbol"]][-FAST_LIMIT:] if SINGLE_FETCH_1M else rows1.get(st["symbol"]))
+                   for st in shown]
+            METRICS.count("grid_opt", optimize_grids(opt, markets))
+
+    pp, fast_pp, allres = [], [], []
+    for st in states:
+        if st["symbol"] in dropped:
+            continue
+        d = result_row(st, fast_by_sym.get(st["symbol"]))
+        if st["base_ok"]:      allres.append(d)
+        if d["pingpong_ok"]:   pp.append(d)
+        if d["fast_ok"] and (d["pingpong_ok"] or FAST_REQUIRE_PINGPONG == 0):
+            fast_pp.append(d)
+    return allres, pp, fast_pp
+
+# ====================== SHARDED ======================
+_SHARD: Dict[str, Any] = {}
+
+def _shard_init(bucket: SharedTokenBucket) -> None:
+    _SHARD["bucket"] = bucket
+
+def _scan_shard(job: tuple) -> tuple:
+    """Worker: kendi exchange/fetcher/store'u ile scan_pairs; istekler ortak bucket'tan."""
+    ex_id, markets, currencies, pairs, index_state = job
+    METRICS.reset()
+    ex = getattr(ccxt, ex_id)({"enableRateLimit": True, "options": {"defaultType": "swap"}})
+    ex.set_markets(markets, currencies)
+    ex = MeteredExchange(ex, METRICS)
+    index = ListingIndex.from_state(index_state) if index_state is not None else None
+    fetcher = make_fetcher(ex, FETCH_WORKERS, FETCH_RATE, observer=METRICS.request, shared=_SHARD["bucket"])
+    stages = StageCounter()
+    try:
+        allres, pp, fast_pp = scan_pairs(ex, markets, pairs, fetcher, default_store(), index, stages)
+    finally:
+        fetcher.close()
+    return allres, pp, fast_pp, stages.counts, (index.state() if index is not None else None), METRICS
+
+def scan_sharded(ex, markets: Dict[str, Any], pairs: List[Tuple[str, Dict[str, Any]]], shards: int,
+                 index: ListingIndex = None, stages: StageCounter = None) -> Tuple[list, list, list]:
+    """
+    scan_pairs across `shards` worker processes. Pairs are dealt round-robin so every
+    shard gets a similar mix of ranks; all workers draw from one SharedTokenBucket
+    (FETCH_RATE), so the combined request rate is the same as a single process.
+    Candle store files are per symbol, so shards never write the same file; listing
+    ages dated by a worker are merged back into `index`.
+    Returns (allres, pp, fast_pp) in `pairs` order, exactly like scan_pairs.
+    """
+    stages = stages if stages is not None else StageCounter()
+    parts = [p for p in (pairs[k::shards] for k in range(shards)) if p]
+    if not parts:
+        return [], [], []
+    bucket = SharedTokenBucket(FETCH_RATE)
+    state = index.state() if index is not None else None
+    jobs = [(ex.id, markets, getattr(ex, "currencies", None), part, state) for part in parts]
+    with multiprocessing.Pool(len(jobs), initializer=_shard_init, initargs=(bucket,)) as pool:
+        outs = pool.map(_scan_shard, jobs)
+    pos = {sym: k for k, (sym, _) in enumerate(pairs)}
+    allres, pp, fast_pp = [], [], []
+    for a, p, f, counts, idx_state, metrics in outs:
+        allres += a; pp += p; fast_pp += f
+        stages.merge(counts)
+        if index is not None and idx_state is not None:
+            index.absorb(ListingIndex.from_state(idx_state))
+        METRICS.merge(metrics)
+    order = lambda d: pos[d["symbol"]]
+    return sorted(allres, key=order), sorted(pp, key=order), sorted(fast_pp, key=order)
+
+# ====================== MULTI-VENUE ======================
+def parse_venues(spec: str) -> List[Tuple[str, float, int]]:
+    """'bingx,bybit:5,okx:4:3' → [(ccxt id, req/s, workers)]"""
+    out = []
+    for part in spec.split(","):
+        bits = [b.strip() for b in part.split(":")]
+        if not bits[0]:
+            continue
+        rate = float(bits[1]) if len(bits) > 1 and bits[1] else FETCH_RATE
+        workers = int(bits[2]) if len(bits) > 2 and bits[2] else max(FETCH_WORKERS, 1)
+        out.append((bits[0].lower(), rate, workers))
+    return out or [("bingx", FETCH_RATE, max(FETCH_WORKERS, 1))]
+
+def make_exchange(venue: str):
+    return getattr(ccxt, venue)({"enableRateLimit": True, "options": {"defaultType": "swap"}})
+
+def _scan_venue(venue: str, rate: float, workers: int, sched: FetchScheduler,
+                store: CandleStore = None, index: ListingIndex = None) -> tuple:
+    ex = MeteredExchange(make_exchange(venue), METRICS, prefix=f"{venue}.")
+    markets, pairs = load_universe(ex, index, cached=True)
+    sched.add_exchange(venue, ex, rate, workers,
+                       observer=lambda ep, sec, err: METRICS.request(f"{venue}.{ep}", sec, err))
+    stages = StageCounter()
+    allres, pp, fast_pp = scan_pairs(ex, markets, pairs, sched.fetcher(venue), store, index, stages)
+    for d in allres + pp + fast_pp:
+        d["venue"] = venue
+    return allres, pp, fast_pp, stages, len(pairs)
+
+def scan_venues(venues: List[Tuple[str, float, int]], store: CandleStore = None, index: ListingIndex = None,
+                stages: StageCounter = None) -> Tuple[list, list, list, Dict[str, int]]:
+    """
+    Same scan on several USDT-M venues at once. Each venue runs its own load_universe +
+    scan_pairs in a thread; all OHLCV requests go through one FetchScheduler where every
+    venue has its own rate budget and in-flight cap, so a slow venue does not stall the
+    others. Rows carry d["venue"]. The listing index and candle store root belong to the
+    first venue; the others get a per-venue store subdirectory and no index.
+    A venue that fails is reported and skipped. Returns (allres, pp, fast_pp, {venue: symbols}).
+    """
+    stages = stages if stages is not None else StageCounter()
+    sched = FetchScheduler()
+    allres, pp, fast_pp, sizes = [], [], [], {}
+    try:
+        with ThreadPoolExecutor(len(venues)) as pool:
+            futs = []
+            for k, (venue, rate, workers) in enumerate(venues):
+                vstore = store if (k == 0 or store is None) else CandleStore(os.path.join(store.root, venue), store.max_bars)
+                futs.append(pool.submit(_scan_venue, venue, rate, workers, sched, vstore, index if k == 0 else None))
+            for (venue, _, _), fut in zip(venues, futs):
+                try:
+                    a, p, f, st, n = fut.result()
+                except Exception as e:
+                    print(f"[warn] {venue} taranamadı: {e}")
+                    continue
+                print(f"[venue] {venue}: {n} sembol, PP {len(p)}, FAST {len(f)}")
+                st.report()
+                stages.merge(st.counts)
+                allres += a; pp += p; fast_pp += f
+                sizes[venue] = n
+    finally:
+        sched.close()
+    return allres, pp, fast_pp, sizes
+
+# ====================== DAEMON ======================
+class RollingWindows:
+    """
+    Per-(symbol, tf) rolling bar windows kept current by a KlineFeed.
+    Doubles as a fetcher for scan_pairs: rolling (symbol, tf) jobs are served from
+    memory, anything else (listing-age fallback) goes to the real fetcher and is
+    cached for `ttl` seconds. A bar that skips one or more bars (missed poll, ws
+    reconnect) refills that window from the fetcher instead of leaving a hole.
+    """
+
+    def __init__(self, fetcher, sizes: Dict[str, int], ttl: float = 3600.0):
+        self.fetcher = fetcher
+        self.sizes = dict(sizes)
+        self.ttl = ttl
+        self.win: Dict[Tuple[str, str], deque] = {}
+        self._cache: Dict[tuple, Tuple[float, Any]] = {}
+
+    def seed(self, symbols: List[str], store: CandleStore, now_ms: int) -> None:
+        specs = [(s, tf, n) for tf, n in self.sizes.items() for s in symbols]
+        for (s, tf, n), rows in zip(specs, fetch_windows(self.fetcher, store, specs, now_ms)):
+            if isinstance(rows, Exception):
+                _log_fetch_error(s, rows)
+                rows = []
+            self.win[(s, tf)] = deque((list(r) for r in rows), maxlen=n)
+
+    def apply(self, sym: str, tf: str, bar: list) -> bool:
+        """Bar güncellemesi; True → önceki bar kapandı (sembol yeniden değerlendirilmeli)."""
+        w = self.win.get((sym, tf))
+        if w is None:
+            return False
+        ts = int(bar[0])
+        if w and ts == int(w[-1][0]):
+            w[-1] = list(bar)
+            return False
+        if w and ts < int(w[-1][0]):
+            return False
+        if w and ts - int(w[-1][0]) > timeframe_ms(tf):
+            rows = self.fetcher.fetch_many([(sym, tf, w.maxlen, None)])[0]
+            if not isinstance(rows, Exception) and rows and int(rows[-1][0]) >= ts:
+                w.clear()
+                w.extend(list(r) for r in rows)
+                return True
+            print(f"[warn] {sym} {tf}: boşluk doldurulamadı ({rows if isinstance(rows, Exception) else 'eksik veri'})")
+        w.append(list(bar))
+        return len(w) > 1
+
+    def fetch_many(self, jobs) -> List[Any]:
+        out: List[Any] = [None] * len(jobs)
+        miss = []
+        now = time.monotonic()
+        for k, (s, tf, lim, since) in enumerate(jobs):
+            w = self.win.get((s, tf))
+            hit = self._cache.get((s, tf, lim, since))
+            if w is not None:
+                out[k] = list(w)[-lim:]
+            elif hit is not None and now - hit[0] < self.ttl:
+                out[k] = hit[1]
+            else:
+                miss.append(k)
+        for k, res in zip(miss, self.fetcher.fetch_many([jobs[k] for k in miss])):
+            out[k] = res
+            if not isinstance(res, Exception):
+                self._cache[tuple(jobs[k])] = (now, res)
+        return out
+
+    def close(self) -> None:
+        pass
+
+def daemon_timeframes() -> Dict[str, int]:
+    """Rolling window sizes per subscribed timeframe (the same windows a one-shot scan fetches)."""
+    if SINGLE_FETCH_1M:
+        return {"1m": single_fetch_limit()}
+    sizes = {"5m": 200}
+    if FAST_S_MODE:
+        sizes[FAST_TF] = max(FAST_LIMIT, sizes.get(FAST_TF, 0))
+    return sizes
+
+def run_daemon(ex, markets: Dict[str, Any], pairs: List[Tuple[str, Dict[str, Any]]], fetcher, feed,
+               store: CandleStore = None, index: ListingIndex = None, notify=None,
+               max_events: int = 0, history: ScanHistory = None) -> Dict[str, Tuple[bool, bool]]:
+    """
+    Streaming scan: seed rolling windows once, then re-run scan_pairs only for the
+    symbols whose bars closed since the last pass. Symbols that newly turn
+    pingpong_ok / fast_ok are sent to `notify(pp_rows, fast_rows)` right away.
+    Every pass is appended to `history` when given.
+    Stops when the feed ends (or after max_events events). Returns {symbol: (pp, fast)}.
+    """
+    notify = notify or _send_alerts
+    symbols = [s for s, _ in pairs]
+    tickers = dict(pairs)
+    windows = RollingWindows(fetcher, daemon_timeframes())
+    with _timed("daemon_seed"):
+        windows.seed(symbols, store, ex.milliseconds())
+    feed.subscribe(symbols, list(windows.sizes))
+    flags: Dict[str, Tuple[bool, bool]] = {}
+    dirty = set(symbols)
+    seen, last_tk = 0, time.monotonic()
+    while True:
+        if dirty:
+            batch = [(s, tickers[s]) for s in symbols if s in dirty]
+            dirty.clear()
+            allres, pp, fast_pp = scan_pairs(ex, markets, batch, windows, None, index)
+            if history is not None:
+                _append_history(history, ex.milliseconds(), history_rows(allres, fast_pp))
+            pp_syms = {d["symbol"] for d in pp}
+            fast_syms = {d["symbol"] for d in fast_pp}
+            new_pp = [d for d in pp if not flags.get(d["symbol"], (False, False))[0]]
+            new_fast = [d for d in fast_pp if not flags.get(d["symbol"], (False, False))[1]]
+            for s, _ in batch:
+                flags[s] = (s in pp_syms, s in fast_syms)
+            if new_pp or new_fast:
+                notify(new_pp, rank_fast(new_fast))
+        if max_events and seen >= max_events:
+            break
+        events = feed.poll(DAEMON_POLL_SEC)
+        if events is None:
+            break
+        for sym, tf, bar in events:
+            seen += 1
+            if windows.apply(sym, tf, bar):
+                dirty.add(sym)
+        if DAEMON_TICKER_SEC > 0 and time.monotonic() - last_tk >= DAEMON_TICKER_SEC:
+            try:
+                tickers.update({s: t for s, t in safe_fetch_tickers(ex, symbols).items() if s in tickers})
+            except Exception as e:
+                print(f"[warn] ticker yenilenemedi: {e}")
+            last_tk = time.monotonic()
+    return flags
+
+def history_rows(allres: List[Dict[str, Any]], fast_pp: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Bir koşunun tüm sonuç satırları (base_ok + base dışı FAST), (borsa, sembol) başına bir kez."""
+    seen = {(d.get("venue"), d["symbol"]) for d in allres}
+    return list(allres) + [d for d in fast_pp if (d.get("venue"), d["symbol"]) not in seen]
+
+def _append_history(history: ScanHistory, run_ms: int, rows: List[Dict[str, Any]]) -> None:
+    try:
+        history.append(run_ms, rows)
+    except Exception as e:
+        print(f"[warn] scan history yazılamadı: {e}")
+
+def _send_alerts(pp_rows: List[Dict[str, Any]], fast_rows: List[Dict[str, Any]]) -> None:
+    chunks = format_telegram_scan_message(
+        scan_started_at=time.strftime("%Y-%m-%d %H:%M"),
+        s_behavior=None,
+        top_candidates=[_to_fmt_entry(d) for d in pp_rows[:TOP_SEND]],
+        fast_candidates=[_to_fmt_entry(d) for d in fast_rows],
+    )
+    print(f"[daemon] yeni PP {len(pp_rows)} | yeni FAST {len(fast_rows)}")
+    for ch in chunks:
+        send_telegram(ch, parse_mode="HTML", disable_preview=True)
+
+def _write_grid_plans(ex, entries: List[Dict[str, Any]], first_venue: str = None) -> None:
+    """
+    Gönderilen adayların grid planları (fiyat = taramadaki last). Çoklu borsada adaylar
+    "SYM · venue" etiketine göre gruplanır; her grup kendi borsasının markets/filtreleriyle
+    boyutlanır (ilk borsa `ex`, diğerleri için yeni exchange) ve planlar venue taşır.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for d in entries:
+        venue = str(d.get("symbol") or "").partition(" · ")[2]
+        groups.setdefault(venue, []).append(d)
+    try:
+        plans = []
+        for venue, group in groups.items():
+            vex = ex if venue in ("", first_venue) else MeteredExchange(make_exchange(venue), METRICS,
+                                                                       prefix=f"{venue}.")
+            last = {str(d["symbol"]).split(" · ")[0]: float(d["last"]) for d in group if d.get("last")}
+            for pl in build_grids(rows_from_fmt(group, GRID_PLAN_CAPITAL), vex, last):
+                if venue:
+                    pl["venue"] = venue
+                plans.append(pl)
+        write_plans(plans, GRID_PLAN_PATH)
+        print(f"[info] grid planları: {len(plans)} → {GRID_PLAN_PATH}")
+    except Exception as e:
+        print(f"[warn] grid planları yazılamadı: {e}")
+
+def _publish_scan(chunks: List[str], board, started_at: str, digest: str = None) -> None:
+    """Tek seferlik taramanın çıktısı: tam liste ya da önceki koşuya göre değişiklikler."""
+    tg = get_notifier()
+    if not tg.enabled:
+        print("[info] Telegram env yok; mesaj atılmadı.")
+        return
+    tg.observer = METRICS.request
+
+    def delta_compose(entered, exited, shifted, same):
+        return format_telegram_delta_message(scan_started_at=started_at, entered=entered, exited=exited,
+                                             shifted=shifted, unchanged=same, digest=digest)
+
+    state = default_state() if NOTIFY_MODE == "delta" else None
+    sent = publish(tg, state, board, chunks, delta_compose, full_every_s=NOTIFY_FULL_EVERY_H * 3600.0,
+                   band_tol=NOTIFY_BAND_SHIFT, metric_tol=NOTIFY_METRIC_SHIFT, edit=bool(NOTIFY_EDIT))
+    METRICS.count(f"telegram_{sent}")
+    print(f"[info] Telegram: {sent}")
+
 # ====================== MAIN ======================
-def main():
-    print("== BingX Grid Scan — rich-only ==")
-    ex = ccxt.bingx({"enableRateLimit": True, "options": {"defaultType": "swap"}})
+def safe_fetch_tickers(ex, symbols: List[str]) -> Dict[str, Any]:
+    """fetch_tickers(symbols), desteklenmezse tüm tickers süzülür."""
+    try:
+        return ex.fetch_tickers(symbols)
+    except Exception as e:
+        print("[info] fetch_tickers(symbols) desteklenmedi, tüm tickers çekiliyor…", e)
+        METRICS.count("retries")
+        all_tickers = ex.fetch_tickers()
+        return {s: all_tickers[s] for s in symbols if s in all_tickers}
 
-    markets = ex.load_markets()
+def load_universe(ex, index: ListingIndex = None,
+                  cached: bool = False) -> Tuple[Dict[str, Any], List[Tuple[str, Dict[str, Any]]]]:
+    """
+    load_markets + tickers → (markets, TOP_K pairs ranked by notional).
+    cached=True → markets market_cache snapshot'ından (MARKET_CACHE_DIR), bayatsa arka planda yenilenir.
+    """
+    cache = default_market_cache(ex.id) if cached else None
+    with _timed("load_markets"):
+        markets = cache.load(ex) if cache is not None else ex.load_markets()
+    if cache is not None:
+        METRICS.count(f"markets_{cache.status}")
     symbols = [s for s, m in markets.items() if m.get("contract") and m.get("quote") == "USDT"]
     if not symbols:
         raise RuntimeError("BingX USDT-M contract listesi boş.")
 
-    # Fetch tickers (with fallback)
-    def safe_fetch_tickers(symbols):
-        try:
-            return ex.fetch_tickers(symbols)
-        except Exception as e:
-            print("[info] fetch_tickers(symbols) desteklenmedi, tüm tickers çekiliyor…", e)
-            all_tickers = ex.fetch_tickers()
-            return {s: all_tickers[s] for s in symbols if s in all_tickers}
+    if index is not None:
+        index.sync(markets, symbols, ex.milliseconds())
 
-    tickers = safe_fetch_tickers(symbols)
+    with _timed("fetch_tickers"):
+        tickers = safe_fetch_tickers(ex, symbols)
 
     # Rank by notional and trim to TOP_K
     def notional(t: Dict[str, Any]) -> float:
@@ -353,112 +1019,122 @@ def main():
 
     pairs = [(s, tickers[s]) for s in symbols if s in tickers]
     pairs.sort(key=lambda x: notional(x[1]), reverse=True)
-    pairs = pairs[:TOP_K]
+    return markets, pairs[:TOP_K]
 
-    pp, fast_pp, allres = [], [], []
-    for sym, tk in pairs:
-        try:
-            qvol = ticker_quote_usdt(tk)
-            liq_ok = (qvol >= MIN_QVOL_USDT) if MIN_QVOL_USDT > 0 else True
+def _write_metrics(extra: Dict[str, Any]) -> None:
+    path = metrics_path()
+    if path is None:
+        return
+    try:
+        METRICS.write(path, extra)
+        print(f"[info] run metrics: {path}")
+    except OSError as e:
+        print(f"[warn] run metrics yazılamadı: {e}")
 
-            # ----- 5m window -----
-            ohlcv5 = ex.fetch_ohlcv(sym, timeframe="5m", limit=200)
-            if not ohlcv5 or len(ohlcv5) < 60:
-                print("SKIP (yetersiz 5m OHLCV) ", sym)
-                continue
+def rank_fast(fast_pp: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fast list: FAST_NEAR_MIN_XPH filter, sort by xph/edge/med/range, then cut."""
+    _fst = [x for x in fast_pp if float(x.get('xph_n', 0.0)) >= FAST_NEAR_MIN_XPH]
+    return sorted(_fst, key=lambda x: (-float(x.get('xph_n', 0.0)),
+                                       -float(x.get('edgeph_n', 0.0)),
+                                        float(x.get('med_n', 1e9)),
+                                       -float(x.get('range_pct', 0.0))))[:TOP_FAST]
 
-            closes5 = [float(c) for _, o, h, l, c, v in ohlcv5]
-            ohlc5 = [(float(o), float(h), float(l), float(c)) for _, o, h, l, c, v in ohlcv5]
-            last = closes5[-1]
-
-            atr50 = atr_from_ohlc(ohlc5, period=50)
-            window = closes5[-180:] if len(closes5) >= 180 else closes5
-            total_range = (max(window) - min(window)) if window else 0.0
-            rng = (total_range / last) if last > 0 else 0.0
-
-            lower, upper, levels = suggest_grid(last, atr50)
-
-            adx_val = adx14(ohlc5[-150:])
-            mid5 = sma(closes5, 20)
-            midcross5 = mid_cross_count(closes5[-180:], mid5[-180:])
-            drift = abs(closes5[-1] - closes5[0])
-            drift_ratio = (drift / total_range) if total_range > 0 else 0.0
-
-            atr_pct = (atr50 / last) if last > 0 else 0.0
-            base_ok = (atr_pct >= ATR_PCT_MIN and rng >= RANGE_PCT_MIN and liq_ok)
-            age_ok = True
-            if base_ok and LISTED_MIN_DAYS > 0:
-                days = estimate_listing_age_days(ex, sym, markets.get(sym, {}))
-                age_ok = (days < 0) or (days >= LISTED_MIN_DAYS)
-
-            pingpong_ok = (
-                base_ok and age_ok and (adx_val <= ADX_MAX) and (midcross5 >= MID_CROSS_MIN) and (drift_ratio <= DRIFT_MAX_RATIO)
-            )
-
-            # ----- FAST S (1m or chosen TF) -----
-            fast_checked = False
-            fast_ok = False
-            xph = med = edgeph = "NA"
-            xph_n = med_n = edgeph_n = 0.0
-            allow_fast = FAST_S_MODE and (pingpong_ok or (FAST_REQUIRE_PINGPONG == 0))
-            if allow_fast:
-                fast_checked = True
-                ohlcv1 = ex.fetch_ohlcv(sym, timeframe=FAST_TF, limit=FAST_LIMIT)
-                if ohlcv1 and len(ohlcv1) >= 120:
-                    closes1 = [float(c) for _, o, h, l, c, v in ohlcv1]
-                    xph_val, med_min = crosses_per_hour(closes1)
-                    edgeph_val = touches_per_hour(closes1, 0.2, 0.8)
-                    wide_ok = (rng >= WIDE_MIN_RANGE_PCT)
-                    fast_ok = (
-                        xph_val >= MIN_CROSSES_PER_HOUR
-                        and (CYCLE_MIN_MIN <= med_min <= CYCLE_MAX_MIN)
-                        and edgeph_val >= MIN_EDGE_TOUCHES_PH
-                        and wide_ok
-                    )
-                    xph, med, edgeph = f"{xph_val:.1f}", f"{med_min:.0f}", f"{edgeph_val:.1f}"
-                    xph_n, med_n, edgeph_n = float(xph_val), float(med_min), float(edgeph_val)
-
-            why = []
-            if atr_pct < ATR_PCT_MIN:  why.append("LOWVOL")
-            if rng < RANGE_PCT_MIN:    why.append("LOWRANGE")
-            if not liq_ok:             why.append("LOWLIQ")
-            if LISTED_MIN_DAYS > 0 and base_ok and not age_ok: why.append("NEW")
-            if adx_val > ADX_MAX:      why.append("TREND")
-            if midcross5 < MID_CROSS_MIN: why.append("MID")
-            if drift_ratio > DRIFT_MAX_RATIO: why.append("DRIFT")
-
-            d = {
-                "symbol": sym,
-                "last": last,
-                "atr_abs": atr50,
-                "atr_pct": atr_pct,
-                "range_pct": rng,
-                "grid_lower": lower,
-                "grid_upper": upper,
-                "levels": levels,
-                "adx": adx_val,
-                "midcross": midcross5,
-                "drift_ratio": drift_ratio,
-                "pingpong_ok": pingpong_ok,
-                "why_tags": ([] if pingpong_ok else why),
-                "fast_checked": fast_checked,
-                "fast_ok": fast_ok,
-                "xph": xph, "med": med, "edgeph": edgeph,
-                "xph_n": xph_n, "med_n": med_n, "edgeph_n": edgeph_n,
-            }
-
-            if base_ok:      allres.append(d)
-            if pingpong_ok:  pp.append(d)
-            if fast_ok and (pingpong_ok or FAST_REQUIRE_PINGPONG == 0):
-                fast_pp.append(d)
-
-            time.sleep(0.25)
-        except ccxt.NetworkError as e:
-            print("NETERR", sym, e)
-            time.sleep(0.25)
-        except Exception as e:
-            print("ERR", sym, e)
-            time.sleep(0.2)
+def main(argv: List[str] = None):
+    ap = argparse.ArgumentParser(description="BingX grid scanner (tek seferlik ya da daemon)")
+    ap.add_argument("--daemon", action="store_true", help="kline feed'e abone ol, kapanan barlarda yeniden değerlendir")
+    ap.add_argument("--feed", choices=["poll", "ws"], default=DAEMON_FEED)
+    ap.add_argument("--record", metavar="PATH", help="canlı koşunun yanıtlarını snapshot'a kaydet (.json.gz)")
+    ap.add_argument("--replay", metavar="PATH", help="snapshot'tan ağsız yeniden koş; Telegram'a gönderilmez")
+    ap.add_argument("--shards", type=int, default=SCAN_SHARDS, help="N>1 → pairs N süreçe bölünür (ortak FETCH_RATE)")
+    ap.add_argument("--exchanges", default=SCAN_EXCHANGES, help="ccxt id[:req/s[:workers]] listesi, örn. bingx,bybit:5")
+    args = ap.parse_args(argv)
+    venues = parse_venues(args.exchanges)
+    if len(venues) > 1 and (args.daemon or args.record or args.replay or args.shards > 1):
+        print(f"[info] çoklu borsa sadece tek seferlik canlı taramada; {venues[0][0]} ile devam")
+        venues = venues[:1]
+    multi = len(venues) > 1
+    if args.shards > 1 and (args.daemon or args.record or args.replay):
+        print("[info] --shards sadece tek seferlik canlı taramada; tek süreçle devam")
+        args.shards = 0
+
+    print("== BingX Grid Scan — rich-only ==")
+    METRICS.reset()
+    snap = None
+    if args.replay:
+        snap = Snapshot.load(args.replay)
+        ex = MeteredExchange(ReplayExchange(snap), METRICS)
+        index = snap.listing_index()
+        markets, pairs = load_universe(ex, index)
+        fetcher, store, history = SerialFetcher(ex, pause=0), None, None
+    else:
+        ex = make_exchange(venues[0][0])
+        index = default_index()
+        if args.record:
+            snap = Snapshot()
+            snap.data["listing_index"] = index.state() if index is not None else None
+            ex = RecordingExchange(ex, snap)
+        ex = MeteredExchange(ex, METRICS)
+        if multi:   # her borsa kendi thread'inde yükler (scan_venues)
+            markets, pairs, fetcher = {}, [], SerialFetcher(ex)
+        else:   # --record load_markets yanıtını snapshot'a yazar, cache'ten okumaz
+            markets, pairs = load_universe(ex, index, cached=not args.record)
+            fetcher = make_fetcher(ex, venues[0][2], venues[0][1], observer=METRICS.request)
+        store = default_store()
+        history = default_history()
+    mode = 'async x' + str(FETCH_WORKERS) if isinstance(fetcher, OhlcvPool) else 'serial'
+    if multi:
+        mode = "scheduler " + ", ".join(f"{v}@{r:g}/s x{w}" for v, r, w in venues)
+    print(f"[info] fetch mode: {mode}"
+          + (f" × {args.shards} shard" if args.shards > 1 else "")
+          + f" | candle store: {store.root if store else 'off'}")
+
+    if args.daemon:
+        feed = make_feed(args.feed, ex, fetcher)
+        print(f"[info] daemon: {len(pairs)} sembol, feed={type(feed).__name__}")
+        try:
+            run_daemon(ex, markets, pairs, fetcher, feed, store, index, history=history)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            feed.close()
+            fetcher.close()
+            if history is not None:
+                history.close()
+            if index is not None:
+                try:
+                    index.save()
+                except OSError as e:
+                    print(f"[warn] listing index yazılamadı: {e}")
+            _write_metrics({"mode": "daemon", "symbols": len(pairs)})
+        return
+
+    stages = StageCounter()
+    n_symbols = len(pairs)
+    run_ms = ex.milliseconds()
+    if args.record:
+        direct = (BACKFILL_1H, BACKFILL_1D) if index is not None else ()   # canlı yol gibi store'suz
+        fetcher, store = RecordingFetcher(fetcher, store, snap, run_ms, direct), None
+    try:
+        with _timed("scan_total"):
+            if multi:
+                allres, pp, fast_pp, sizes = scan_venues(venues, store, index, stages)
+                n_symbols = sum(sizes.values())
+            elif args.shards > 1:
+                allres, pp, fast_pp = scan_sharded(ex, markets, pairs, args.shards, index, stages)
+            else:
+                allres, pp, fast_pp = scan_pairs(ex, markets, pairs, fetcher, store, index, stages)
+        stages.report()
+        if history is not None:
+            _append_history(history, run_ms, history_rows(allres, fast_pp))
+    finally:
+        fetcher.close()
+        if history is not None:
+            history.close()
+        if index is not None:
+            try:
+                index.save()
+            except OSError as e:
+                print(f"[warn] listing index yazılamadı: {e}")
 
     # ----- Ranking & selections -----
     allres = [d for d in allres
@@ -472,39 +1148,56 @@ def main():
     # S davranışı (ilk PP varsa)
     s_behavior_fmt = _to_fmt_entry(pp[0]) if pp else None
 
-    # Top list: remove duplicate if equals S-behavior symbol
+    # Top list: remove duplicate if equals S-behavior symbol (ham sembol + borsa; fmt "SYM · venue" olabilir)
     if s_behavior_fmt:
-        s_sym = s_behavior_fmt.get("symbol")
-        _source = [d for d in allres if d.get("symbol") != s_sym]
+        s_key = (pp[0].get("venue"), pp[0].get("symbol"))
+        _source = [d for d in allres if (d.get("venue"), d.get("symbol")) != s_key]
     else:
         _source = allres
     top_fmt  = [_to_fmt_entry(d) for d in _source[:TOP_SEND]]
 
     # Fast list: sort by xph/edge/med/range, then cut
-    if fast_pp:
-        _fst = [x for x in fast_pp if float(x.get('xph_n', 0.0)) >= FAST_NEAR_MIN_XPH]
-        _fst = sorted(_fst, key=lambda x: (-float(x.get('xph_n', 0.0)),
-                                           -float(x.get('edgeph_n', 0.0)),
-                                            float(x.get('med_n', 1e9)),
-                                           -float(x.get('range_pct', 0.0))))[:TOP_FAST]
-        fast_fmt = [_to_fmt_entry(d) for d in _fst]
-    else:
-        fast_fmt = []
+    fast_fmt = [_to_fmt_entry(d) for d in rank_fast(fast_pp)]
 
-    # ----- Compose & send HTML (unconditional) -----
-    chunks = format_telegram_scan_message(
-        scan_started_at=time.strftime("%Y-%m-%d %H:%M"),
-        s_behavior=s_behavior_fmt,
-        top_candidates=top_fmt,
-        fast_candidates=fast_fmt
-    )
+    # ----- Compose & send HTML (full list or delta, see NOTIFY_MODE) -----
+    started_at = snap.data["started_at"] if args.replay else time.strftime("%Y-%m-%d %H:%M")
 
-    # Always send at least one message (header + timestamp), even if lists are empty
-    if not chunks:
-        chunks = ["<b>🟢 Scanner Up — Starting Scan</b>\n" + time.strftime("%Y-%m-%d %H:%M")]
+    def compose(digest: str = None) -> List[str]:
+        chunks = format_telegram_scan_message(
+            scan_started_at=started_at,
+            s_behavior=s_behavior_fmt,
+            top_candidates=top_fmt,
+            fast_candidates=fast_fmt,
+            digest=digest,
+        )
+        # Always send at least one message (header + timestamp), even if lists are empty
+        return chunks or ["<b>🟢 Scanner Up — Starting Scan</b>\n" + started_at]
 
-    for ch in chunks:
-        send_telegram(ch, parse_mode="HTML", disable_preview=True)
+    # replay karşılaştırması süre içermeyen çıktı üzerinden yapılır
+    digest = METRICS.digest() if SCAN_METRICS_DIGEST and not args.replay else None
+    with _timed("compose"):
+        chunks = compose(digest)
+
+    if args.replay:
+        same = chunks == snap.data.get("telegram")
+        print(f"[replay] {len(chunks)} parça; kayıtlı Telegram çıktısıyla {'AYNI' if same else 'FARKLI'}")
+        for ch in chunks:
+            print(ch)
+        return
+    if args.record:
+        snap.data["started_at"], snap.data["telegram"] = started_at, (compose() if digest else chunks)
+        snap.save(args.record)
+        print(f"[info] snapshot kaydedildi: {args.record}")
+
+    if GRID_PLAN_PATH.lower() not in ("", "0", "off", "none", "false"):
+        with _timed("grid_plans"):
+            _write_grid_plans(ex, ([s_behavior_fmt] if s_behavior_fmt else []) + top_fmt + fast_fmt, venues[0][0])
+
+    with _timed("telegram"):
+        _publish_scan(chunks, make_board(s_behavior_fmt, top_fmt, fast_fmt), started_at, digest)
+        get_notifier().flush(TELEGRAM_FLUSH_S)
+    _write_metrics({"mode": "scan", "symbols": n_symbols, "stage_counts": stages.as_dict(),
+                    "results": {"base_ok": len(allres), "pingpong": len(pp), "fast": len(fast_pp)}})
 
 if __name__ == "__main__":
     main()
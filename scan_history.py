@@ -0,0 +1,175 @@
+# scan_history.py
+# Per-run scan result rows in an indexed SQLite table (stdlib, no extra dependency).
+# One row per (run_ms, venue, symbol) with the numeric metrics as real columns and the
+# flags as 0/1 ints, so downstream tools query fields instead of parsing Telegram text.
+# Indexes: (symbol, run_ms) for a symbol's history, (run_ms) for time ranges.
+#
+#   python scan_history.py --symbol BTC/USDT:USDT --since-ms 1700000000000
+#   python scan_history.py --last-run
+
+import argparse, os, sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_PATH = ".cache/scan_history.sqlite"
+DEFAULT_VENUE = "bingx"   # venue etiketi olmayan (tek borsa) satırlar
+
+# (column, sqlite type) — result_row anahtarları + run zamanı
+COLUMNS = (
+    ("run_ms", "INTEGER NOT NULL"),
+    ("venue", f"TEXT NOT NULL DEFAULT '{DEFAULT_VENUE}'"),
+    ("symbol", "TEXT NOT NULL"),
+    ("last", "REAL"), ("atr_abs", "REAL"), ("atr_pct", "REAL"), ("range_pct", "REAL"),
+    ("adx", "REAL"), ("midcross", "INTEGER"), ("drift_ratio", "REAL"),
+    ("grid_lower", "REAL"), ("grid_upper", "REAL"), ("levels", "INTEGER"),
+    ("xph_n", "REAL"), ("med_n", "REAL"), ("edgeph_n", "REAL"),
+    ("pingpong_ok", "INTEGER"), ("fast_checked", "INTEGER"), ("fast_ok", "INTEGER"),
+    ("why_tags", "TEXT"),
+)
+NAMES = tuple(c for c, _ in COLUMNS)
+FLAGS = ("pingpong_ok", "fast_checked", "fast_ok")
+
+
+class ScanHistory:
+    """scan_rows tablosu: append(run_ms, rows) yazar, symbol()/between()/run() okur."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS scan_rows ({', '.join(f'{c} {t}' for c, t in COLUMNS)},"
+                         " PRIMARY KEY (run_ms, venue, symbol))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS scan_rows_symbol ON scan_rows (symbol, run_ms)")
+        self._db.commit()
+
+    # ---------- writing ----------
+
+    def append(self, run_ms: int, rows: Iterable[Dict[str, Any]]) -> int:
+        """Bir koşunun satırları (scan_pairs/result_row çıktısı). Yazılan satır sayısı döner."""
+        vals = [_to_record(int(run_ms), r) for r in rows]
+        with self._db:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO scan_rows ({', '.join(NAMES)}) VALUES ({', '.join('?' * len(NAMES))})",
+                vals)
+        return len(vals)
+
+    # ---------- queries ----------
+
+    def symbol(self, symbol: str, since_ms: int = None, until_ms: int = None,
+               venue: str = None) -> List[Dict[str, Any]]:
+        """Bir sembolün geçmişi, run_ms artan (venue verilmezse tüm borsalar)."""
+        where, args = _range(since_ms, until_ms)
+        if venue is not None:
+            where += " AND venue = ?"; args.append(venue)
+        return self._select("symbol = ?" + where, [symbol] + args)
+
+    def between(self, since_ms: int = None, until_ms: int = None) -> List[Dict[str, Any]]:
+        """[since_ms, until_ms] aralığındaki tüm koşuların satırları."""
+        where, args = _range(since_ms, until_ms)
+        return self._select("1" + where, args)
+
+    def run(self, run_ms: int = None) -> List[Dict[str, Any]]:
+        """Tek koşunun satırları (None → en son koşu)."""
+        if run_ms is None:
+            run_ms = self.last_run_ms()
+            if run_ms is None:
+                return []
+        return self._select("run_ms = ?", [int(run_ms)])
+
+    def last_run_ms(self) -> Optional[int]:
+        row = self._db.execute("SELECT MAX(run_ms) FROM scan_rows").fetchone()
+        return int(row[0]) if row and row[0] is not None else None
+
+    def _select(self, where: str, args: list) -> List[Dict[str, Any]]:
+        cur = self._db.execute(f"SELECT {', '.join(NAMES)} FROM scan_rows WHERE {where} ORDER BY run_ms, venue, symbol",
+                               args)
+        return [_from_record(r) for r in cur]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def _range(since_ms: Optional[int], until_ms: Optional[int]):
+    where, args = "", []
+    if since_ms is not None:
+        where += " AND run_ms >= ?"; args.append(int(since_ms))
+    if until_ms is not None:
+        where += " AND run_ms <= ?"; args.append(int(until_ms))
+    return where, args
+
+
+def _num(x: Any) -> Optional[float]:
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_record(run_ms: int, r: Dict[str, Any]) -> tuple:
+    out = []
+    for c in NAMES:
+        if c == "run_ms":
+            out.append(run_ms)
+        elif c == "symbol":
+            out.append(str(r.get("symbol")))
+        elif c == "venue":
+            out.append(str(r.get("venue") or DEFAULT_VENUE))
+        elif c in FLAGS:
+            out.append(1 if r.get(c) else 0)
+        elif c == "why_tags":
+            out.append(",".join(r.get("why_tags") or []))
+        elif c in ("midcross", "levels"):
+            v = _num(r.get(c))
+            out.append(None if v is None else int(v))
+        else:
+            out.append(_num(r.get(c)))
+    return tuple(out)
+
+
+def _from_record(rec: tuple) -> Dict[str, Any]:
+    d = dict(zip(NAMES, rec))
+    for c in FLAGS:
+        d[c] = bool(d[c])
+    d["why_tags"] = [t for t in (d["why_tags"] or "").split(",") if t]
+    return d
+
+
+def default_history() -> Optional[ScanHistory]:
+    """SCAN_HISTORY_PATH env (varsayılan .cache/scan_history.sqlite); 'off' ile kapatılır."""
+    path = os.environ.get("SCAN_HISTORY_PATH", "") or DEFAULT_PATH
+    if path.strip().lower() in ("0", "off", "none", "false"):
+        return None
+    try:
+        return ScanHistory(path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"[warn] scan history açılamadı ({path}): {e}")
+        return None
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Scan history sorgusu")
+    ap.add_argument("--path", default=os.environ.get("SCAN_HISTORY_PATH") or DEFAULT_PATH)
+    ap.add_argument("--symbol")
+    ap.add_argument("--venue")
+    ap.add_argument("--since-ms", type=int)
+    ap.add_argument("--until-ms", type=int)
+    ap.add_argument("--last-run", action="store_true")
+    args = ap.parse_args()
+
+    h = ScanHistory(args.path)
+    if args.last_run:
+        rows = h.run()
+    elif args.symbol:
+        rows = h.symbol(args.symbol, args.since_ms, args.until_ms, args.venue)
+    else:
+        rows = h.between(args.since_ms, args.until_ms)
+    for r in rows:
+        print(r["run_ms"], r["venue"], r["symbol"], f"atr {r['atr_pct']:.4f} rng {r['range_pct']:.4f} adx {r['adx']:.1f}"
+              f" mid {r['midcross']} d {r['drift_ratio']:.2f} xph {r['xph_n']:.1f} edge {r['edgeph_n']:.1f}"
+              f" pp={int(r['pingpong_ok'])} fast={int(r['fast_ok'])}")
+    h.close()
+
+
+if __name__ == "__main__":
+    main()
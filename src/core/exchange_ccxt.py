@@ -1,4 +1,4 @@
-import os
+import os, time
 from typing import Any, Dict, List, Optional
 
 import ccxt
@@ -1,44 +1,15 @@
 # src/core/guards.py
 from __future__ import annotations
-from typing import List, Tuple
-import math
+from typing import List, Optional, Sequence, Tuple
+
+from src.core.indicators import DX, RollingStd, dx14
 
 def adx14(ohlc: List[Tuple[float, float, float, float]]) -> float:
     """
-    Basit ve stabil bir ADX(~14) tahmini. ohlc: [(o,h,l,c), ...]
-    Bu “yaklaşık” uygulama guard amaçlı yeterli hassasiyette.
+    Guard ADX vekili: son 14 barın tek periyot DX'i (src.core.indicators.DX). ohlc: [(o,h,l,c), ...]
+    Scanner ADX'inden (14 DX ortalaması) farklı ölçek; ADX_LIMIT_HI/LO buna göre. Yetersiz geçmişte 0.0.
     """
-    n = 14
-    if len(ohlc) < n + 1:
-        return 0.0
-
-    trs, plus_dm, minus_dm = [], [], []
-    prev_o, prev_h, prev_l, prev_c = ohlc[0]
-
-    for o, h, l, c in ohlc[1:]:
-        tr = max(h - l, abs(h - prev_c), abs(l - prev_c))
-        up_move = h - prev_h
-        down_move = prev_l - l
-
-        pdm = up_move if (up_move > 0 and up_move > down_move) else 0.0
-        ndm = down_move if (down_move > 0 and down_move > up_move) else 0.0
-
-        trs.append(tr)
-        plus_dm.append(pdm)
-        minus_dm.append(ndm)
-        prev_o, prev_h, prev_l, prev_c = o, h, l, c
-
-    if len(trs) < n:
-        return 0.0
-
-    atr = sum(trs[-n:]) / n
-    if atr <= 0:
-        return 0.0
-    pdi = (sum(plus_dm[-n:]) / n) / atr * 100.0
-    ndi = (sum(minus_dm[-n:]) / n) / atr * 100.0
-    denom = max(pdi + ndi, 1e-9)
-    dx = abs(pdi - ndi) / denom * 100.0
-    return dx  # tek periyotluk DX; guard için yeterli
+    return dx14(ohlc)
 
 def volatility_spike(closes: List[float], win_fast: int = 20, win_slow: int = 120, mult: float = 2.0) -> bool:
     """
@@ -46,11 +17,60 @@ def volatility_spike(closes: List[float], win_fast: int = 20, win_slow: int = 12
     """
     if len(closes) < max(win_fast, win_slow):
         return False
+    fast, slow = RollingStd(win_fast), RollingStd(win_slow)
+    for c in closes[-max(win_fast, win_slow):]:
+        fast.update(c)
+        slow.update(c)
+    return slow.value > 0 and (fast.value / slow.value) >= mult
+
+
+class GuardFeed:
+    """
+    Guard göstergeleri için kalıcı durum: her döngüde sadece yeni kapanan barlar
+    update() edilir, iş geçmiş uzunluğundan bağımsızdır.
+    """
+
+    def __init__(self, win_fast: int = 20, win_slow: int = 120):
+        self.win_fast, self.win_slow = win_fast, win_slow
+        self.reset()
+
+    @property
+    def seed_limit(self) -> int:
+        """Tohum fetch limiti: en uzun pencere (DX için 14 + 1) + devam eden bar."""
+        return max(self.win_fast, self.win_slow, 14 + 1) + 1
+
+    def reset(self) -> None:
+        self._adx = DX(14)
+        self._fast, self._slow = RollingStd(self.win_fast), RollingStd(self.win_slow)
+        self._n = 0
+        self.last_ts: Optional[int] = None
+
+    def feed(self, rows: Sequence[Sequence[float]], step_ms: int) -> int:
+        """
+        ccxt [ts,o,h,l,c,v] satırlarından son (devam eden) bar hariç yenilerini işler.
+        İşlenen bar sayısı döner; -1 → araya boşluk girdi, durum sıfırlandı
+        (çağıran tam pencereyi yeniden beslemeli).
+        """
+        closed = [r for r in rows[:-1] if self.last_ts is None or int(r[0]) > self.last_ts]
+        if closed and self.last_ts is not None and int(closed[0][0]) - self.last_ts > step_ms:
+            self.reset()
+            return -1
+        for r in closed:
+            self.update(float(r[2]), float(r[3]), float(r[4]))
+            self.last_ts = int(r[0])
+        return len(closed)
+
+    def update(self, h: float, l: float, c: float) -> None:
+        self._adx.update(h, l, c)
+        self._fast.update(c)
+        self._slow.update(c)
+        self._n += 1
 
-    def std(vals: List[float]) -> float:
-        m = sum(vals) / len(vals)
-        return math.sqrt(sum((v - m) ** 2 for v in vals) / max(len(vals) - 1, 1))
+    @property
+    def adx(self) -> float:
+        return self._adx.value or 0.0
 
-    fast = std(closes[-win_fast:])
-    slow = std(closes[-win_slow:])
-    return slow > 0 and (fast / slow) >= mult
+    def spike(self, mult: float = 2.0) -> bool:
+        if self._n < max(self.win_fast, self.win_slow):
+            return False
+        return self._slow.value > 0 and (self._fast.value / self._slow.value) >= mult
@@ -1,28 +1,642 @@
-import math
-from typing import List
+import heapq, math, random
+from collections import deque
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Shared indicator library: stateful objects take one bar per update(), and the list
+# helpers at the bottom (scanner sma / atr_from_ohlc / adx14 / mid_cross_count /
+# crosses_per_hour, guards, metrics_feed) are thin wrappers that run a fresh object over
+# the list. batch_indicators.py is the NumPy form of the same definitions.
+#
+# Per-bar cost:
+#   SMA, RollingStd, ATR, ADX, DX  O(1): running sums (add new, subtract evicted); ATR/ADX
+#                                  re-sum the window once per n bars so float drift stays
+#                                  bounded, and resum() gives the exact sum(window)/n.
+#   MidCross                       O(log n): median crossing gap in two heaps, lazy delete.
+#   RollingQuantile                O(log n) expected: order-statistic treap (rank/k-th).
+#   WindowCross                    O(period): the ≤ period-bar head of the window is
+#                                  recomputed each bar (period = 20, window-independent).
+# `value` is None until the indicator has enough bars.
+
+
+class SMA:
+    """Kayan ortalama (running sum)."""
+
+    def __init__(self, n: int):
+        self.n = max(int(n), 1)
+        self._buf: deque = deque()
+        self._s = 0.0
+
+    def update(self, x: float) -> Optional[float]:
+        return self.extend((x,))[-1]
+
+    def extend(self, xs: Sequence[float]) -> List[Optional[float]]:
+        """Her değer için update(); bar başına değerler (dolana kadar None)."""
+        n, buf, s, out = self.n, self._buf, self._s, []
+        for x in xs:
+            s += x
+            buf.append(x)
+            if len(buf) > n:
+                s -= buf.popleft()
+            out.append(s / n if len(buf) == n else None)
+        self._s = s
+        return out
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._s / self.n if len(self._buf) == self.n else None
+
+
+class RollingStd:
+    """Son n değerin örneklem std'si (Welford, pencereden çıkan değer geri alınır)."""
+
+    def __init__(self, n: int):
+        self.n = max(int(n), 1)
+        self._buf: deque = deque()
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x: float) -> float:
+        self._buf.append(x)
+        k = len(self._buf)
+        d = x - self.mean
+        self.mean += d / k
+        self._m2 += d * (x - self.mean)
+        if k > self.n:
+            y = self._buf.popleft()
+            k -= 1
+            d = y - self.mean
+            self.mean -= d / k
+            self._m2 -= d * (y - self.mean)
+        return self.value
+
+    @property
+    def count(self) -> int:
+        return len(self._buf)
+
+    @property
+    def value(self) -> float:
+        k = len(self._buf)
+        return math.sqrt(max(self._m2, 0.0) / (k - 1)) if k > 1 else 0.0
+
+
+class ATR:
+    """
+    Ortalama true range. wilder=False → son n TR'nin düz ortalaması (scanner ATR50),
+    wilder=True → Wilder RMA. seed_range=True → ilk barın TR'si h-l (öncesi yok).
+    """
+
+    def __init__(self, n: int = 14, wilder: bool = False, seed_range: bool = False):
+        self.n = max(int(n), 1)
+        self.wilder = wilder
+        self.seed_range = seed_range
+        self._trs: deque = deque(maxlen=self.n)
+        self._s = 0.0
+        self._prev_close: Optional[float] = None
+        self._rma: Optional[float] = None
+        self._count = 0
+
+    def update(self, h: float, l: float, c: float) -> Optional[float]:
+        pc = self._prev_close
+        self._prev_close = c
+        if pc is None:
+            if not self.seed_range:
+                return self.value
+            tr = h - l
+        else:
+            tr = max(h - l, abs(h - pc), abs(l - pc))
+        if len(self._trs) == self.n:
+            self._s -= self._trs[0]
+        self._trs.append(tr)
+        self._count += 1
+        self._s = sum(self._trs) if self._count % self.n == 0 else self._s + tr
+        if self.wilder:
+            if self._count == self.n:
+                self._rma = self._s / self.n
+            elif self._count > self.n:
+                self._rma = (self._rma * (self.n - 1) + tr) / self.n
+        return self.value
+
+    def resum(self) -> Optional[float]:
+        """Pencere toplamını baştan toplar: düz modda değer sum(son n TR) / n ile bit-bit aynı."""
+        self._s = sum(self._trs)
+        return self.value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def value(self) -> Optional[float]:
+        if self._count < self.n:
+            return None
+        return self._rma if self.wilder else self._s / self.n
+
+
+class ADX:
+    """
+    Scanner ADX: Wilder-smoothed TR/+DM/-DM → DX; value = son n DX'in ortalaması.
+    scan_bingx_grid (adx14), metrics_feed ve batch_indicators.adx14 bu tanımı kullanır.
+    """
+
+    def __init__(self, n: int = 14):
+        self.n = max(int(n), 1)
+        self._prev: Optional[Tuple[float, float, float]] = None
+        self._tr = self._pdm = self._ndm = 0.0   # ilk n barda toplam, sonra Wilder
+        self._k = 0
+        self._dx: deque = deque(maxlen=self.n)
+        self._dx_s = 0.0
+
+    def update(self, h: float, l: float, c: float) -> Optional[float]:
+        return self.extend((h,), (l,), (c,))
+
+    def extend(self, highs: Sequence[float], lows: Sequence[float], closes: Sequence[float]) -> Optional[float]:
+        """Barları sırayla işler (update döngüsü tek çağrıda); son değeri döner."""
+        n, dxs, k = self.n, self._dx, self._k
+        a, p, m, dx_s = self._tr, self._pdm, self._ndm, self._dx_s
+        it = zip(highs, lows, closes)
+        if self._prev is None:
+            self._prev = next(it, None)
+            if self._prev is None:
+                return self.value
+        ph, pl, pc = self._prev
+        for h, l, c in it:
+            tr = max(h - l, abs(h - pc), abs(l - pc))
+            plus_dm = max(h - ph, 0.0)
+            minus_dm = max(pl - l, 0.0)
+            ph, pl, pc = h, l, c
+            if plus_dm < minus_dm:
+                plus_dm = 0.0
+            elif minus_dm < plus_dm:
+                minus_dm = 0.0
+            k += 1
+            if k <= n:
+                a += tr
+                p += plus_dm
+                m += minus_dm
+                if k < n:
+                    continue
+            else:
+                a = a - (a / n) + tr
+                p = p - (p / n) + plus_dm
+                m = m - (m / n) + minus_dm
+            pdi = (p / a * 100.0) if a > 0 else 0.0
+            ndi = (m / a * 100.0) if a > 0 else 0.0
+            s = pdi + ndi
+            dx = (abs(pdi - ndi) / s * 100.0) if s > 0 else 0.0
+            if len(dxs) == n:
+                dx_s -= dxs[0]
+            dxs.append(dx)
+            dx_s = sum(dxs) if (k - n + 1) % n == 0 else dx_s + dx
+        self._prev, self._k = (ph, pl, pc), k
+        self._tr, self._pdm, self._ndm, self._dx_s = a, p, m, dx_s
+        return self.value
+
+    def resum(self) -> Optional[float]:
+        """DX penceresini baştan toplar: değer sum(son n DX) / n ile bit-bit aynı."""
+        self._dx_s = sum(self._dx)
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._dx_s / self.n if len(self._dx) == self.n else None
+
+
+class DX:
+    """
+    Tek periyot DX: son n barın düz TR / +DM / -DM ortalamalarından (paper bot guard'ı;
+    ADX_LIMIT_HI/LO eşikleri bu ölçeğe göre). Eşit hareket iki DM'yi de sıfırlar.
+    """
+
+    def __init__(self, n: int = 14):
+        self.n = max(int(n), 1)
+        self._prev: Optional[Tuple[float, float, float]] = None
+        self._win: deque = deque()   # (tr, +dm, -dm)
+        self._s = [0.0, 0.0, 0.0]
+        self._k = 0
+
+    def update(self, h: float, l: float, c: float) -> Optional[float]:
+        prev = self._prev
+        self._prev = (h, l, c)
+        if prev is None:
+            return None
+        ph, pl, pc = prev
+        up, down = h - ph, pl - l
+        x = (max(h - l, abs(h - pc), abs(l - pc)),
+             up if (up > 0 and up > down) else 0.0,
+             down if (down > 0 and down > up) else 0.0)
+        self._win.append(x)
+        self._k += 1
+        if len(self._win) > self.n:
+            y = self._win.popleft()
+            self._s = [s - v for s, v in zip(self._s, y)]
+        if self._k % self.n == 0:
+            self._s = [sum(col) for col in zip(*self._win)]
+        else:
+            self._s = [s + v for s, v in zip(self._s, x)]
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self._win) < self.n:
+            return None
+        atr = self._s[0] / self.n
+        if atr <= 0:
+            return 0.0
+        pdi = (self._s[1] / self.n) / atr * 100.0
+        ndi = (self._s[2] / self.n) / atr * 100.0
+        return abs(pdi - ndi) / max(pdi + ndi, 1e-9) * 100.0
+
+
+class _Median:
+    """
+    Çoklu kümenin S[len // 2] elemanı: alt yarı max-heap, üst yarı min-heap; silme tembel
+    (değer → bekleyen silme sayısı, heap'in tepesine gelince atılır). Ekleme/silme O(log n).
+    """
+
+    __slots__ = ("lo", "hi", "n_lo", "n_hi", "dead_lo", "dead_hi")
+
+    def __init__(self):
+        self.lo: List[float] = []   # -x
+        self.hi: List[float] = []
+        self.n_lo = self.n_hi = 0
+        self.dead_lo: dict = {}
+        self.dead_hi: dict = {}
+
+    def __len__(self) -> int:
+        return self.n_lo + self.n_hi
+
+    def _prune(self) -> None:
+        lo, hi, dl, dh = self.lo, self.hi, self.dead_lo, self.dead_hi
+        while lo and dl.get(-lo[0]):
+            dl[-lo[0]] -= 1
+            heapq.heappop(lo)
+        while hi and dh.get(hi[0]):
+            dh[hi[0]] -= 1
+            heapq.heappop(hi)
+
+    def _balance(self) -> None:
+        self._prune()
+        while self.n_hi > self.n_lo + 1:
+            heapq.heappush(self.lo, -heapq.heappop(self.hi))
+            self.n_hi -= 1
+            self.n_lo += 1
+            self._prune()
+        while self.n_lo > self.n_hi:
+            heapq.heappush(self.hi, -heapq.heappop(self.lo))
+            self.n_lo -= 1
+            self.n_hi += 1
+            self._prune()
+        # tembel silinenler birikmesin: heap canlı elemanların 2 katını aşınca yeniden kur
+        if len(self.lo) + len(self.hi) > 2 * len(self) + 32:
+            self.lo = self._live(self.lo, self.dead_lo, -1)
+            self.hi = self._live(self.hi, self.dead_hi, 1)
+
+    @staticmethod
+    def _live(heap: List[float], dead: dict, sign: int) -> List[float]:
+        out = []
+        for v in heap:
+            if dead.get(sign * v):
+                dead[sign * v] -= 1
+            else:
+                out.append(v)
+        dead.clear()
+        heapq.heapify(out)
+        return out
+
+    def add(self, x: float) -> None:
+        if self.n_hi and x < self.hi[0]:
+            heapq.heappush(self.lo, -x)
+            self.n_lo += 1
+        else:
+            heapq.heappush(self.hi, x)
+            self.n_hi += 1
+        self._balance()
+
+    def remove(self, x: float) -> None:
+        """x kümede olmalı."""
+        if self.n_hi and x >= self.hi[0]:
+            self.dead_hi[x] = self.dead_hi.get(x, 0) + 1
+            self.n_hi -= 1
+        else:
+            self.dead_lo[x] = self.dead_lo.get(x, 0) + 1
+            self.n_lo -= 1
+        self._balance()
+
+    @property
+    def value(self) -> float:
+        return float(self.hi[0]) if self.n_hi else float("inf")
+
+
+class MidCross:
+    """
+    close - mid işaret değişimi (ya da diff == 0) sayacı; mid verilmezse SMA(period).
+    NaN/eksik mid barı atlanır. window → sadece son `window` barın içindeki geçişler
+    (pencerenin ilk barı, öncesi pencere dışında olduğu için sayılmaz).
+    Geçiş aralıklarının medyanı (crosses_per_hour) iki heap'te: O(log n) / bar.
+    """
+
+    def __init__(self, period: int = 20, window: Optional[int] = None):
+        self.period = period
+        self.window = window
+        self._sma = SMA(period)
+        self._prev_diff: Optional[float] = None
+        self._i = -1
+        self._pos: deque = deque()              # pencere içindeki geçiş bar indeksleri
+        self._gaps = _Median()                  # ardışık geçiş aralıkları
+        self._valid_from: Optional[int] = None  # ilk geçerli mid barı
+
+    def update(self, close: float, mid: Optional[float] = None) -> int:
+        return self.extend((close,), None if mid is None else (mid,))
+
+    def extend(self, closes: Sequence[float], mids: Optional[Sequence[float]] = None) -> int:
+        """Barları sırayla işler (update döngüsü tek çağrıda); mids None → SMA(period)."""
+        if mids is None:
+            mids = self._sma.extend(closes)
+        i, p, pos, gaps, window = self._i, self._prev_diff, self._pos, self._gaps, self.window
+        for close, mid in zip(closes, mids):
+            i += 1
+            if mid is not None and mid == mid:
+                if p is None and self._valid_from is None:
+                    self._valid_from = i
+                diff = close - mid
+                if p is not None and (diff == 0 or (diff > 0 and p < 0) or (diff < 0 and p > 0)):
+                    if pos:
+                        gaps.add(i - pos[-1])
+                    pos.append(i)
+                p = diff
+            if window:
+                first = i - window + 2   # hem kendisi hem önceki bar pencerede
+                while pos and pos[0] < first:
+                    p0 = pos.popleft()
+                    if pos:
+                        gaps.remove(pos[0] - p0)
+        self._i, self._prev_diff = i, p
+        return len(pos)
+
+    @property
+    def bars(self) -> int:
+        n = self._i + 1
+        return min(n, self.window) if self.window else n
+
+    @property
+    def count(self) -> int:
+        return len(self._pos)
+
+    @property
+    def median_gap(self) -> float:
+        return self._gaps.value
+
+    def per_hour(self, bar_minutes: float = 1.0) -> Tuple[float, float]:
+        """crosses_per_hour: (max(count_rate, 60/median), median)."""
+        n = self._i + 1
+        start = n - self.bars
+        warm = max(self.period - 1 - start, 0) if self._valid_from is not None else self.bars
+        hours = max(max(self.bars - warm, 1) * bar_minutes / 60.0, 1e-6)
+        rate = self.count / hours
+        if not len(self._gaps):
+            return rate, float("inf")
+        med = self._gaps.value
+        from_med = (60.0 / (med * bar_minutes)) if (med > 0 and math.isfinite(med)) else 0.0
+        return max(rate, from_med), med
+
+
+class WindowCross:
+    """
+    metrics_feed geçiş tanımı (strategist cross_min eşiği buna göre): son `window` barda
+    mid = son `period` close'un ortalaması, pencerenin ilk period-1 barında pencere içi
+    genişleyen ortalama; geçiş = diff == 0 ya da (diff > 0) değişti.
+    Pencere başından bağımsız geçişler bayrak deque'sinde tutulur; baştaki ≤ period bar
+    her update'te yeniden hesaplanır.
+    """
+
+    def __init__(self, window: int, period: int = 20):
+        self.window = max(int(window), 1)
+        self.period = max(int(period), 1)
+        self._buf: deque = deque(maxlen=self.window)
+        self._last: deque = deque(maxlen=self.period)
+        self._prev_diff: Optional[float] = None
+        self._flags: deque = deque()   # tam-period mid ile geçiş olan bar indeksleri
+        self._i = -1
+
+    def update(self, close: float) -> int:
+        i = self._i = self._i + 1
+        self._buf.append(close)
+        self._last.append(close)
+        if len(self._last) == self.period:
+            diff = close - sum(self._last) / self.period
+            p = self._prev_diff
+            if p is not None and (diff == 0 or (diff > 0) != (p > 0)):
+                self._flags.append(i)
+            self._prev_diff = diff
+        first = i - len(self._buf) + 1 + self.period   # pencere içi indeks ≥ period
+        while self._flags and self._flags[0] < first:
+            self._flags.popleft()
+        return self.count
+
+    @property
+    def bars(self) -> int:
+        return len(self._buf)
+
+    @property
+    def count(self) -> int:
+        head, s, prev = 0, 0.0, None
+        for k in range(min(self.period, len(self._buf))):
+            c = self._buf[k]
+            s += c
+            diff = c - s / (k + 1)
+            if prev is not None and (diff == 0 or (diff > 0) != (prev > 0)):
+                head += 1
+            prev = diff
+        return head + len(self._flags)
+
+
+class _Node:
+    __slots__ = ("key", "pri", "left", "right", "size")
+
+    def __init__(self, key: float, pri: float):
+        self.key, self.pri = key, pri
+        self.left = self.right = None
+        self.size = 1
+
+
+def _size(t: Optional[_Node]) -> int:
+    return t.size if t is not None else 0
+
+
+def _split(t: Optional[_Node], key: float, inclusive: bool):
+    """(< key, ≥ key); inclusive=True → (≤ key, > key)."""
+    if t is None:
+        return None, None
+    if t.key < key or (inclusive and t.key == key):
+        a, b = _split(t.right, key, inclusive)
+        t.right = a
+        t.size = 1 + _size(t.left) + _size(a)
+        return t, b
+    a, b = _split(t.left, key, inclusive)
+    t.left = b
+    t.size = 1 + _size(b) + _size(t.right)
+    return a, t
+
+
+def _merge(a: Optional[_Node], b: Optional[_Node]) -> Optional[_Node]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.pri > b.pri:
+        a.right = _merge(a.right, b)
+        a.size = 1 + _size(a.left) + _size(a.right)
+        return a
+    b.left = _merge(a, b.left)
+    b.size = 1 + _size(b.left) + _size(b.right)
+    return b
+
+
+class RollingQuantile:
+    """
+    Kayan pencere sıra istatistikleri: boyut bilgili treap (rastgele öncelik).
+    Ekleme/çıkarma, k'ıncı eleman ve eşik altı/üstü sayımı beklenen O(log n).
+    """
+
+    def __init__(self, window: Optional[int] = None, seed: int = 0):
+        self.window = window
+        self._buf: deque = deque()
+        self._root: Optional[_Node] = None
+        self._rnd = random.Random(seed)
+
+    def update(self, x: float) -> None:
+        self._buf.append(x)
+        a, b = _split(self._root, x, True)
+        self._root = _merge(_merge(a, _Node(x, self._rnd.random())), b)
+        if self.window and len(self._buf) > self.window:
+            y = self._buf.popleft()
+            a, b = _split(self._root, y, False)
+            m, b = _split(b, y, True)
+            self._root = _merge(a, _merge(_merge(m.left, m.right), b))
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def kth(self, k: int) -> float:
+        t = self._root
+        while True:
+            ls = _size(t.left)
+            if k < ls:
+                t = t.left
+            elif k == ls:
+                return t.key
+            else:
+                k -= ls + 1
+                t = t.right
+
+    def rank(self, x: float, inclusive: bool = False) -> int:
+        """x'ten küçük (inclusive → küçük-eşit) eleman sayısı."""
+        t, r = self._root, 0
+        while t is not None:
+            if t.key < x or (inclusive and t.key == x):
+                r += _size(t.left) + 1
+                t = t.right
+            else:
+                t = t.left
+        return r
+
+    def percentile(self, q: float) -> float:
+        return _interp(self.kth, len(self), q)
+
+    def touches(self, q_lo: float = 0.2, q_hi: float = 0.8) -> int:
+        """Pencerede x <= P(q_lo) ya da x >= P(q_hi) olan değer sayısı."""
+        n = len(self)
+        if not n:
+            return 0
+        lo, hi = self.percentile(q_lo), self.percentile(q_hi)
+        inside = self.rank(hi) - self.rank(lo, inclusive=True)
+        return n - max(inside, 0)
+
+
+# ---------- list helpers (fresh indicator over the whole list) ----------
+
+def _interp(at: Callable[[int], float], n: int, q: float) -> float:
+    """Sıralı n değer (at(i) = i'nci) üzerinde doğrusal aradeğerli yüzdelik."""
+    if not n:
+        return float("nan")
+    q = min(max(q, 0.0), 1.0)
+    idx = q * (n - 1)
+    lo, hi = int(math.floor(idx)), int(math.ceil(idx))
+    if lo == hi:
+        return at(lo)
+    frac = idx - lo
+    return at(lo) * (1 - frac) + at(hi) * frac
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    return _interp(sorted_vals.__getitem__, len(sorted_vals), q)
 
 def sma(vals: List[float], n: int) -> float:
-    if len(vals) < n or n <= 0: 
+    if len(vals) < n or n <= 0:
         return sum(vals)/max(1,len(vals))
     return sum(vals[-n:])/n
 
+def sma_series(vals: List[float], period: int) -> List[float]:
+    """Her bar için SMA(period); ilk period-1 bar NaN."""
+    nan = float("nan")
+    return [nan if m is None else m for m in SMA(period).extend(vals)]
+
 def stddev(vals: List[float], n: int) -> float:
     if len(vals) < n: n = len(vals)
     if n <= 1: return 0.0
-    m = sma(vals, n)
-    var = sum((v-m)**2 for v in vals[-n:])/(n-1)
-    return math.sqrt(var)
+    ind = RollingStd(n)
+    for v in vals[-n:]:
+        ind.update(v)
+    return ind.value
 
 def atr(highs: List[float], lows: List[float], closes: List[float], n: int=14) -> float:
-    trs = []
-    prev_close = None
-    for h,l,c in zip(highs, lows, closes):
-        if prev_close is None:
-            tr = h-l
-        else:
-            tr = max(h-l, abs(h-prev_close), abs(l-prev_close))
-        trs.append(tr)
-        prev_close = c
-    if len(trs) < n: n = len(trs)
+    n = min(n, len(closes))
     if n == 0: return 0.0
-    return sum(trs[-n:])/n
+    ind = ATR(n, seed_range=True)
+    for h, l, c in zip(highs, lows, closes):
+        ind.update(h, l, c)
+    return ind.value or 0.0
+
+def atr_from_ohlc(values: List[Tuple[float, float, float, float]], period: int = 14) -> float:
+    """Son `period` TR'nin ortalaması; period+1 bardan azsa 0.0."""
+    if len(values) < period + 1:
+        return 0.0
+    ind = ATR(period)
+    for (o, h, l, c) in values[-(period + 1):]:
+        ind.update(h, l, c)
+    return ind.resum()
+
+def adx14(ohlc: List[Tuple[float, float, float, float]]) -> float:
+    """ADX(14) tüm liste üzerinde; yetersiz geçmişte 100.0 (scanner: trend sayılır)."""
+    ind = ADX(14)
+    if ohlc:
+        _, highs, lows, closes = zip(*ohlc)
+        ind.extend(highs, lows, closes)
+    v = ind.resum()
+    return 100.0 if v is None else v
+
+def dx14(ohlc: List[Tuple[float, float, float, float]]) -> float:
+    """Tek periyot DX(14); yetersiz geçmişte 0.0 (guard tetiklemez)."""
+    ind = DX(14)
+    for o, h, l, c in ohlc[-15:]:
+        ind.update(h, l, c)
+    return ind.value or 0.0
+
+def mid_cross_count(closes: List[float], mid: List[float]) -> int:
+    return MidCross().extend(closes, mid)
+
+def crosses_per_hour(closes: List[float]) -> Tuple[float, float]:
+    """SMA20 geçiş hızı (1m bar): (max(count_rate, 60/medyan aralık), medyan aralık)."""
+    mc = MidCross(20)
+    mc.extend(closes)
+    return mc.per_hour()
+
+def touches_per_hour(closes: List[float], q_lo: float = 0.2, q_hi: float = 0.8) -> float:
+    """q_lo/q_hi yüzdelik bantlarına dokunan bar sayısı / saat (1m bar; tek sıralama)."""
+    S = sorted(closes)
+    lo = percentile(S, q_lo); hi = percentile(S, q_hi)
+    touches = 0
+    for c in closes:
+        if c <= lo or c >= hi:
+            touches += 1
+    hours = max(len(closes) / 60.0, 1e-6)
+    return touches / hours
@@ -0,0 +1,229 @@
+# src/core/notifier.py
+# Shared Telegram delivery: one keep-alive requests.Session (pooled connections) and a
+# background sender thread, so the scanner and the trading loop only enqueue.
+# - send() splits on line boundaries into the fewest messages under Telegram's limit
+#   and merges consecutive queued texts for the same chat/options while they fit.
+# - 429 → waits `parameters.retry_after` seconds and retries the same message;
+#   network errors are retried with backoff; other API errors are logged and dropped.
+# - flush(timeout) waits for the queue to drain (also registered at exit).
+# - send_now()/edit_now() are synchronous and return message ids / success, for callers
+#   that edit a previous message in place (delta_notify).
+from __future__ import annotations
+
+import atexit, os, queue, threading, time
+from typing import Callable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_LEN = 4096          # Telegram sendMessage text limit (UTF-16 code units)
+MAX_RETRIES = 5
+
+
+def tg_len(text: str) -> int:
+    """Telegram'ın saydığı uzunluk (UTF-16 kod birimi; emoji = 2)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def split_message(text: str, limit: int = MAX_LEN) -> List[str]:
+    """
+    Satır sınırlarında açgözlü paketleme: sıra korunarak en az parça.
+    Tek başına limiti aşan satır sert bölünür.
+    """
+    parts: List[str] = []
+    buf: List[str] = []
+    size = 0
+    for ln in text.splitlines(keepends=True):
+        n = tg_len(ln)
+        if n > limit:
+            if buf:
+                parts.append("".join(buf)); buf, size = [], 0
+            while ln:
+                cut = limit
+                while tg_len(ln[:cut]) > limit:
+                    cut -= 1
+                parts.append(ln[:cut]); ln = ln[cut:]
+            continue
+        if size + n > limit and buf:
+            parts.append("".join(buf)); buf, size = [], 0
+        buf.append(ln); size += n
+    if buf:
+        parts.append("".join(buf))
+    return [p.rstrip("\n") for p in parts if p.strip()] or ([text] if text else [])
+
+
+def _mask_chat(cid: str) -> str:
+    s = str(cid)
+    return s[:2] + "***" + s[-3:] if len(s) > 6 else "***"
+
+
+class TelegramNotifier:
+    def __init__(self, token: str, chat_id: str, *, timeout: float = 20.0, debug: bool = False,
+                 observer: Optional[Callable[[str, float, Optional[Exception]], None]] = None):
+        self.token = token
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.debug = debug
+        self.observer = observer    # observer("telegram", seconds, err_or_None) her HTTP isteğinden sonra
+        self.api = f"https://api.telegram.org/bot{token}/"
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self._q: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.sent = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token and self.chat_id)
+
+    # ---------- producer side (non-blocking) ----------
+
+    def send(self, text: str, *, parse_mode: str = None, disable_preview: bool = True) -> None:
+        if not self.enabled or not text:
+            return
+        for part in split_message(text):
+            self._q.put((part, parse_mode, disable_preview))
+        self._ensure_thread()
+
+    def flush(self, timeout: float = 60.0) -> bool:
+        """Kuyruk boşalana kadar bekler; True → hepsi işlendi."""
+        deadline = time.monotonic() + timeout
+        while self._q.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="telegram-notifier", daemon=True)
+                self._thread.start()
+
+    # ---------- consumer side ----------
+
+    def _next_batch(self) -> tuple:
+        """Kuyruktan bir mesaj; aynı seçeneklerle ardışık olanlar sığdıkça birleştirilir."""
+        text, mode, preview = self._q.get()
+        n = 1
+        while True:
+            try:
+                nxt = self._q.queue[0]   # peek (tek tüketici)
+            except IndexError:
+                break
+            if nxt[1:] != (mode, preview) or tg_len(text) + 1 + tg_len(nxt[0]) > MAX_LEN:
+                break
+            self._q.get()
+            text, n = text + "\n" + nxt[0], n + 1
+        return text, mode, preview, n
+
+    def _worker(self) -> None:
+        while True:
+            text, mode, preview, n = self._next_batch()
+            try:
+                self._deliver(text, mode, preview)
+            finally:
+                for _ in range(n):
+                    self._q.task_done()
+
+    def _deliver(self, text: str, parse_mode: str, disable_preview: bool) -> bool:
+        return self.call("sendMessage", self._payload(text, parse_mode, disable_preview)) is not None
+
+    def _payload(self, text: str, parse_mode: str, disable_preview: bool) -> dict:
+        payload = {"chat_id": self.chat_id, "text": text,
+                   "disable_web_page_preview": "true" if disable_preview else "false"}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+        if self.debug:
+            preview = text.replace("\n", " ")[:120]
+            print(f"[tg-debug] send to {_mask_chat(self.chat_id)} | len={len(text)} | preview='{preview}…'")
+        return payload
+
+    # ---------- synchronous (caller thread; message id gerektiğinde) ----------
+
+    def send_now(self, text: str, *, parse_mode: str = None, disable_preview: bool = True) -> List[int]:
+        """Kuyruğu boşaltıp parçaları hemen gönderir; teslim edilenlerin message_id listesi."""
+        if not self.enabled or not text:
+            return []
+        self.flush()
+        ids = []
+        for part in split_message(text):
+            res = self.call("sendMessage", self._payload(part, parse_mode, disable_preview))
+            if res is not None and res.get("message_id") is not None:
+                ids.append(int(res["message_id"]))
+        return ids
+
+    def edit_now(self, message_id: int, text: str, *, parse_mode: str = None,
+                 disable_preview: bool = True) -> bool:
+        """Önceki mesajı yerinde günceller (bildirim üretmez)."""
+        if not self.enabled:
+            return False
+        payload = self._payload(text[:MAX_LEN], parse_mode, disable_preview)
+        payload["message_id"] = int(message_id)
+        return self.call("editMessageText", payload) is not None
+
+    def call(self, method: str, payload: dict) -> Optional[dict]:
+        """Bot API çağrısı (429/ağ hatası yeniden denenir); başarıda `result` (dict), değilse None."""
+        for attempt in range(MAX_RETRIES):
+            t0 = time.perf_counter()
+            try:
+                r = self.session.post(self.api + method, data=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                self._observe(t0, e)
+                print(f"[warn] Telegram exception (deneme {attempt + 1}/{MAX_RETRIES}): {e}")
+                time.sleep(min(2 ** attempt, 30))
+                continue
+            try:
+                j = r.json()
+            except ValueError:
+                j = {}
+            if r.status_code == 429:
+                wait = float((j.get("parameters") or {}).get("retry_after") or 1)
+                self._observe(t0, RuntimeError("429"))
+                print(f"[info] Telegram 429: {wait:.0f}s bekleniyor")
+                time.sleep(wait)
+                continue
+            desc = str(j.get("description", ""))
+            if r.status_code == 400 and "message is not modified" in desc:
+                self._observe(t0, None)   # aynı metinle edit: zaten güncel
+                return {}
+            if r.status_code != 200 or not j.get("ok", False):
+                self._observe(t0, RuntimeError(f"status={r.status_code}"))
+                print(f"[warn] Telegram API error ({method}): status={r.status_code}, code={j.get('error_code')},"
+                      f" desc={desc}, body={r.text[:300]}")
+                self.failed += 1
+                return None
+            self._observe(t0, None)
+            self.sent += 1
+            if self.debug:
+                print(f"[tg-debug] {method} delivered")
+            res = j.get("result")
+            return res if isinstance(res, dict) else {}
+        self.failed += 1
+        return None
+
+    def _observe(self, t0: float, err: Optional[Exception]) -> None:
+        if self.observer is not None:
+            self.observer("telegram", time.perf_counter() - t0, err)
+
+
+_default: Optional[TelegramNotifier] = None
+_default_lock = threading.Lock()
+
+
+def get_notifier() -> TelegramNotifier:
+    """
+    Süreç başına tek notifier: TELEGRAM_BOT_TOKEN (ya da TELEGRAM_TOKEN) + TELEGRAM_CHAT_ID.
+    Çıkışta kuyruk boşaltılır.
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            token = os.environ.get("TELEGRAM_BOT_TOKEN") or os.environ.get("TELEGRAM_TOKEN") or ""
+            chat_id = os.environ.get("TELEGRAM_CHAT_ID") or ""
+            dbg = str(os.environ.get("TELEGRAM_DEBUG", "0")).strip().lower() not in ("", "0", "false", "no")
+            _default = TelegramNotifier(token, chat_id, debug=dbg)
+            atexit.register(_default.flush, 30.0)
+        return _default
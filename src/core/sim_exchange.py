@@ -0,0 +1,226 @@
+# src/core/sim_exchange.py
+# In-process simulated exchange for paper runs: the ExchangeCCXT surface with orders kept,
+# matched and settled locally. Market data (fetch_ohlcv / fetch_ticker / markets) comes
+# from the wrapped public ccxt instance, so grid_sizer / market_cache work unchanged via .ex.
+#
+# Book: per symbol a bid max-heap and an ask min-heap keyed by (price, seq) — price
+# priority, then time. Cancels are lazy (status flag, skipped when popped), so insert,
+# cancel and each fill are O(log n).
+# Feed: on_bar(symbol, [ts, o, h, l, c, v]) fills bids ≥ low and asks ≤ high at the limit
+# price; on_trade(symbol, price, ts) fills bids ≥ price and asks ≤ price. An order only
+# becomes matchable on events at or after its creation time (no look-ahead into the bar it
+# was placed in). fetch_ohlcv feeds newly closed bars and fetch_ticker feeds the last price
+# automatically; a replay drives on_bar / on_trade directly.
+# Fills update a net position per symbol (average entry, realized PnL net of fees) and are
+# handed to RiskGate.register_fill.
+
+from __future__ import annotations
+
+import heapq, itertools
+from typing import Any, Dict, List, Optional, Sequence
+
+import ccxt
+
+from src.core.exchange_ccxt import ExchangeCCXT
+from src.core.risk import RiskGate
+
+
+class _Book:
+    __slots__ = ("bids", "asks", "pending")
+
+    def __init__(self):
+        self.bids: List[tuple] = []      # (-price, seq, order)
+        self.asks: List[tuple] = []      # (price, seq, order)
+        self.pending: List[tuple] = []   # (timestamp, seq, order): henüz eşleşemez
+
+
+class _Position:
+    __slots__ = ("qty", "entry", "realized", "fees")
+
+    def __init__(self):
+        self.qty = 0.0        # + long / − short
+        self.entry = 0.0
+        self.realized = 0.0   # ücretler düşülmüş
+        self.fees = 0.0
+
+
+class SimExchange(ExchangeCCXT):
+    """ExchangeCCXT yerine: emirler yerelde tutulur ve bar/trade akışına karşı doldurulur."""
+
+    def __init__(self, ex=None, symbol_whitelist: Optional[List[str]] = None, risk: RiskGate = None,
+                 fee_rate: float = 0.0006, clock=None):
+        """clock: emir zamanı (ms); varsayılan ex.milliseconds. Replay'de lambda: 0 → son barın bitişi."""
+        self.ex = ex or ccxt.bingx({"enableRateLimit": True, "options": {"defaultType": "swap"}})
+        self.clock = clock or self.ex.milliseconds
+        self.symbol_whitelist = set(symbol_whitelist or [])
+        self.risk = risk
+        self.fee_rate = fee_rate
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.fills: List[Dict[str, Any]] = []
+        self._books: Dict[str, _Book] = {}
+        self._pos: Dict[str, _Position] = {}
+        self._last: Dict[str, float] = {}
+        self._bar_ts: Dict[str, int] = {}     # son işlenen (kapanmış) bar
+        self._seq = itertools.count(1)
+
+    # ---------- market data (gerçek kaynak + eşleştirme beslemesi) ----------
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 360):
+        rows = super().fetch_ohlcv(symbol, timeframe, limit)
+        if timeframe == '1m' and rows:
+            last_ts = self._bar_ts.get(symbol)
+            for r in rows[:-1]:                # son bar devam ediyor
+                if last_ts is None or int(r[0]) > last_ts:
+                    self.on_bar(symbol, r)
+        return rows
+
+    def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        t = super().fetch_ticker(symbol)
+        if t.get("last"):
+            self.on_trade(symbol, float(t["last"]), int(t.get("timestamp") or self.clock()))
+        return t
+
+    # ---------- orders ----------
+
+    def create_order(self, symbol: str, side: str, type_: str, amount: float, price: Optional[float] = None,
+                     params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        side = side.lower()
+        if side not in ("buy", "sell") or not amount > 0:
+            raise ccxt.InvalidOrder(f"geçersiz emir: {side} {amount}")
+        seq = next(self._seq)
+        ts = self._now(symbol)
+        o = {"id": f"sim-{seq}", "clientOrderId": (params or {}).get("clientOrderId"), "symbol": symbol,
+             "type": type_, "side": side, "price": float(price) if price else None, "amount": float(amount),
+             "filled": 0.0, "remaining": float(amount), "average": None, "status": "open",
+             "timestamp": ts, "fee": {"cost": 0.0, "currency": "USDT"}}
+        self.orders[o["id"]] = o
+        if type_ == "market" or price is None:
+            px = self._last.get(symbol) or float(super().fetch_ticker(symbol)["last"])
+            self._fill(o, px, ts)
+        else:
+            heapq.heappush(self._book(symbol).pending, (ts, seq, o))
+        return dict(o)
+
+    def cancel_order(self, id: str, symbol: Optional[str] = None) -> Dict[str, Any]:
+        o = self.orders.get(id)
+        if o is None:
+            raise ccxt.OrderNotFound(id)
+        if o["status"] == "open":
+            o["status"] = "canceled"           # heap'ten pop edilince atlanır
+        return dict(o)
+
+    def cancel_all_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        out = []
+        for sym in ([symbol] if symbol else list(self._books)):
+            book = self._books.get(sym)
+            if book is None:
+                continue
+            for heap in (book.bids, book.asks, book.pending):
+                for entry in heap:
+                    o = entry[2]
+                    if o["status"] == "open":
+                        o["status"] = "canceled"
+                        out.append(dict(o))
+                heap.clear()
+        return out
+
+    def fetch_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [dict(o) for o in self.orders.values()
+                if o["status"] == "open" and (symbol is None or o["symbol"] == symbol)]
+
+    def fetch_positions(self) -> List[Dict[str, Any]]:
+        out = []
+        for sym, p in self._pos.items():
+            last = self._last.get(sym, p.entry)
+            out.append({
+                "symbol": sym, "side": "long" if p.qty > 0 else ("short" if p.qty < 0 else None),
+                "contracts": abs(p.qty), "entryPrice": p.entry if p.qty else None,
+                "notional": abs(p.qty) * last, "unrealizedPnl": p.qty * (last - p.entry),
+                "realizedPnl": p.realized, "fees": p.fees,
+            })
+        return out
+
+    # ---------- matching ----------
+
+    def on_bar(self, symbol: str, bar: Sequence[float]) -> int:
+        """Kapanmış bar: low/high'a değen emirler limit fiyattan dolar. Dönüş: dolum sayısı."""
+        ts, low, high = int(bar[0]), float(bar[3]), float(bar[2])
+        self._bar_ts[symbol] = max(ts, self._bar_ts.get(symbol, ts))
+        n = self._match(symbol, low, high, ts)
+        self._last[symbol] = float(bar[4])
+        return n
+
+    def on_trade(self, symbol: str, price: float, ts: int) -> int:
+        self._last[symbol] = price
+        return self._match(symbol, price, price, ts)
+
+    def _match(self, symbol: str, low: float, high: float, ts: int) -> int:
+        book = self._books.get(symbol)
+        if book is None:
+            return 0
+        while book.pending and book.pending[0][0] <= ts:
+            _, seq, o = heapq.heappop(book.pending)
+            if o["status"] == "open":
+                heapq.heappush(book.bids if o["side"] == "buy" else book.asks,
+                               (-o["price"] if o["side"] == "buy" else o["price"], seq, o))
+        n = 0
+        while book.bids and -book.bids[0][0] >= low:
+            o = heapq.heappop(book.bids)[2]
+            if o["status"] == "open":
+                self._fill(o, o["price"], ts)
+                n += 1
+        while book.asks and book.asks[0][0] <= high:
+            o = heapq.heappop(book.asks)[2]
+            if o["status"] == "open":
+                self._fill(o, o["price"], ts)
+                n += 1
+        return n
+
+    def _fill(self, o: Dict[str, Any], price: float, ts: int) -> None:
+        qty = o["remaining"]
+        notional = price * qty
+        fee = notional * self.fee_rate
+        o.update(filled=o["amount"], remaining=0.0, average=price, status="closed", lastTradeTimestamp=ts)
+        o["fee"]["cost"] += fee
+
+        p = self._pos.setdefault(o["symbol"], _Position())
+        signed = qty if o["side"] == "buy" else -qty
+        realized = -fee
+        if p.qty and (p.qty > 0) != (signed > 0):      # pozisyonu azaltan kısım
+            closed = min(abs(signed), abs(p.qty))
+            realized += closed * (price - p.entry) * (1 if p.qty > 0 else -1)
+        new_qty = p.qty + signed
+        if not p.qty or (p.qty > 0) == (signed > 0):
+            p.entry = (p.entry * abs(p.qty) + price * qty) / abs(new_qty)
+        elif new_qty and (new_qty > 0) != (p.qty > 0):  # ters yöne geçti
+            p.entry = price
+        p.qty = new_qty if abs(new_qty) > 1e-12 else 0.0
+        p.realized += realized
+        p.fees += fee
+
+        self.fills.append({"id": o["id"], "symbol": o["symbol"], "side": o["side"], "price": price,
+                           "qty": qty, "fee": fee, "realized": realized, "timestamp": ts})
+        if self.risk is not None:
+            self.risk.register_fill(o["symbol"], notional, realized)
+
+    # ---------- helpers ----------
+
+    def _book(self, symbol: str) -> _Book:
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _Book()
+        return book
+
+    def _now(self, symbol: str) -> int:
+        """Emir zamanı: canlıda borsa saati; replay'de (saat bar'ın gerisindeyse) son barın bitişi."""
+        now = int(self.clock())
+        bar = self._bar_ts.get(symbol)
+        return max(now, bar + 60_000) if bar is not None else now
+
+    def summary(self) -> str:
+        parts = []
+        for pos in self.fetch_positions():
+            parts.append(f"{pos['symbol']}: pos={pos['contracts'] if pos['side'] != 'short' else -pos['contracts']:g}"
+                         f" realized={pos['realizedPnl']:.2f} unrealized={pos['unrealizedPnl']:.2f}"
+                         f" fees={pos['fees']:.2f}")
+        return f"[SIM] fills={len(self.fills)} open={len(self.fetch_open_orders())} | " + (" | ".join(parts) or "pozisyon yok")
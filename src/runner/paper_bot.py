@@ -1,12 +1,15 @@
-import os, time, json, urllib.request
+import os, time
 from src.core.exchange_ccxt import ExchangeCCXT
+from src.core.sim_exchange import SimExchange
 from src.core.risk import RiskGate, RiskLimits
 from src.core.state_store import JsonState
 from src.strategy.dynamic_grid import DynamicGrid, GridParams
 from src.strategy.strategist import pick_mode
 from src.strategy.tri_arb import TriArb
 from src.strategy.metrics_feed import build_metrics
-from src.core.guards import adx14, volatility_spike
+from src.core.guards import GuardFeed
+from src.core.notifier import get_notifier
+from market_cache import load_markets_cached
 
 # --- Telegram & bildirim bucket yardımcıları ---
 last_notify_bucket = {"k": None}
@@ -14,17 +17,8 @@ def _adx_bucket(x: float) -> str:
     return "hi_60p" if x >= 60 else ("hi_45_60" if x >= 45 else ("hi_35_45" if x >= 35 else ("lo_28_35" if x >= 28 else "lo_<28")))
 
 def _tg_send(msg: str) -> None:
-    token = os.environ.get("TELEGRAM_BOT_TOKEN") or os.environ.get("TELEGRAM_TOKEN")
-    chat_id = os.environ.get("TELEGRAM_CHAT_ID")
-    if not token or not chat_id:
-        return
-    try:
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
-        data = {"chat_id": chat_id, "text": msg, "disable_web_page_preview": True}
-        req = urllib.request.Request(url, data=json.dumps(data).encode("utf-8"), headers={"Content-Type": "application/json"})
-        urllib.request.urlopen(req, timeout=10).read()
-    except Exception:
-        pass
+    # bloklamaz: ortak notifier kuyruğa alır, trade döngüsü HTTP beklemez
+    get_notifier().send(msg)
 
 
 def main():
@@ -34,8 +28,12 @@ def main():
         print("WARN: BINGX_API_KEY/BINGX_API_SECRET boş. Paper akışında read-only çağrılar denenir.")
 
     symbol = os.environ.get("SYMBOL", "BTC/USDT:USDT")
-    ex = ExchangeCCXT(api_key, api_secret, [symbol])
-    ex.load_markets()
+    if os.environ.get("DRY_RUN", "0") == "1":
+        # emirler yerelde tutulur ve gerçek 1m barlara/ticker'a karşı doldurulur
+        ex = SimExchange(symbol_whitelist=[symbol], fee_rate=float(os.environ.get("SIM_FEE") or os.environ.get("FEE") or "0.0006"))
+    else:
+        ex = ExchangeCCXT(api_key, api_secret, [symbol])
+    load_markets_cached(ex.ex)   # snapshot'tan; bayatsa arka planda yenilenir
     # ccxt timeout (aşırı beklemeyi önlemek için)
     try:
         ex.ex.timeout = int(os.environ.get("CCXT_TIMEOUT_MS", "15000"))  # 15s
@@ -49,6 +47,8 @@ def main():
         stop_pct=float(os.environ.get("STOP_PCT", "0.03")),
     )
     risk = RiskGate(limits)
+    if isinstance(ex, SimExchange):
+        ex.risk = risk   # dolumlar RiskGate.register_fill'e
     state = JsonState("state.paper.json")
 
     dg = DynamicGrid(
@@ -60,6 +60,9 @@ def main():
             capital=float(os.environ.get("GRID_CAPITAL") or "200"),
             atr_k=float(os.environ.get("ATR_K") or "1.2"),
             retune_sec=int(os.environ.get("RETUNE_SEC") or "120"),
+            optimize=(os.environ.get("GRID_OPTIMIZE") or "0").strip().lower() not in ("0", "off", "false", "no"),
+            opt_budget_s=float(os.environ.get("GRID_OPT_BUDGET_MS") or "50") / 1000.0,
+            fee=float(os.environ.get("FEE") or "0.0006"),
         ),
     )
 
@@ -91,6 +94,10 @@ def main():
     cycles      = 0
 
     # --- Guard durum değişkenleri ---
+    guard = GuardFeed(
+        win_fast=int(os.environ.get("VOL_SPIKE_FAST", "20")),
+        win_slow=int(os.environ.get("VOL_SPIKE_SLOW", "120")),
+    )
     trend_blocked = False
     last_guard_ts = 0.0
     guard_hits    = 0
@@ -112,17 +119,12 @@ def main():
             _tg_send("🟡 Hybrid Paper bot süre doldu, kapanıyor.")
             break
 
-        # 2) ADX & spike
-        ohlc = ex.fetch_ohlcv(symbol, timeframe="1m", limit=120)  # [ts,o,h,l,c,v]
-        ohlc4 = [(row[1], row[2], row[3], row[4]) for row in ohlc]
-        adx_val = adx14(ohlc4)
-        closes_full = [row[4] for row in ohlc]
-        spike = volatility_spike(
-            closes_full,
-            win_fast=int(os.environ.get("VOL_SPIKE_FAST", "20")),
-            win_slow=int(os.environ.get("VOL_SPIKE_SLOW", "120")),
-            mult=float(os.environ.get("VOL_SPIKE_MULT", "2.0")),
-        )
+        # 2) ADX & spike (kalıcı durum: sadece yeni kapanan barlar işlenir)
+        ohlc = ex.fetch_ohlcv(symbol, timeframe="1m", limit=guard.seed_limit if guard.last_ts is None else 5)  # [ts,o,h,l,c,v]
+        if guard.feed(ohlc, 60_000) < 0:
+            guard.feed(ex.fetch_ohlcv(symbol, timeframe="1m", limit=guard.seed_limit), 60_000)
+        adx_val = guard.adx
+        spike = guard.spike(float(os.environ.get("VOL_SPIKE_MULT", "2.0")))
 
         # 3) Guard/histerezis + cooldown/debounce
         now_ts = time.time()
@@ -187,7 +189,7 @@ def main():
         mode = pick_mode(metrics, tri_edge)
 
         if mode == "DYNAMIC_GRID" and closes:
-            dg.retune_and_place(symbol, closes)
+            dg.retune_and_place(symbol, closes, metrics.get("last"))
         elif mode == "TRI_ARB":
             pass  # tri.try_execute(...) bağlanacak
 
@@ -202,6 +204,9 @@ def main():
         else:
             time.sleep(10)
 
+    if isinstance(ex, SimExchange):
+        _tg_send(ex.summary())
+
 
 if __name__ == "__main__":
     main()
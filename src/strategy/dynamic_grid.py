@@ -7,6 +7,8 @@ from src.core.risk import RiskGate
 from src.core.state_store import JsonState
 from src.core.indicators import stddev
 from grid_sizer import compute_grid_inline
+from grid_opt import optimize_grid
+from market_cache import market_filters
 
 
 @dataclass
@@ -17,6 +19,9 @@ class GridParams:
     retune_sec: int
     adx_trend_limit: float = 25.0
     stop_pct: float = 0.03
+    optimize: bool = False       # bant/seviye: grid_opt (son 1m yol üzerinde arama)
+    opt_budget_s: float = 0.05
+    fee: float = 0.0006
 
 
 class DynamicGrid:
@@ -50,15 +55,35 @@ class DynamicGrid:
             lower, upper = last * 0.99, last * 1.01
         return lower, upper
 
-    def retune_and_place(self, symbol: str, closes: List[float]):
-        """Parametrelerdeki retune periyoduna göre grid'i yeniden kurar (DRY_RUN ise sadece log)."""
+    def _optimize_band(self, symbol: str, closes: List[float], last: Optional[float]) -> Optional[Tuple[float, float, int]]:
+        """grid_opt ile (lower, upper, levels); uygun aday yoksa ya da hata olursa None (→ _compute_band)."""
+        try:
+            best = optimize_grid(symbol, closes, market_filters(self.ex.ex, symbol), self.params.capital, last,
+                                 fee=self.params.fee, budget_s=self.params.opt_budget_s)
+        except Exception as e:
+            print("[warn] grid_opt başarısız, mid ± 2σ bandına dönülüyor:", e)
+            return None
+        if best is None:
+            return None
+        return best["lower"], best["upper"], best["levels"]
+
+    def retune_and_place(self, symbol: str, closes: List[float], last: Optional[float] = None):
+        """
+        Parametrelerdeki retune periyoduna göre grid'i yeniden kurar (DRY_RUN: SimExchange üzerinde simüle edilir).
+        last: runner'ın elindeki son fiyat (build_metrics); yoksa son close.
+        """
         now = time.time()
         if now - self._last_tune < self.params.retune_sec:
             return
         self._last_tune = now
 
-        # 1) bant hesapla
-        lower, upper = self._compute_band(closes)
+        # 1) bant hesapla (optimize açıksa grid_opt, yoksa/bulamazsa mid ± 2σ)
+        levels = self.params.levels
+        best = self._optimize_band(symbol, closes, last) if self.params.optimize else None
+        if best:
+            lower, upper, levels = best
+        else:
+            lower, upper = self._compute_band(closes)
 
         # 2) küçük kaymalarda re-place yapma (churn azaltma)
         if self._last_band:
@@ -75,11 +100,12 @@ class DynamicGrid:
             symbol=symbol,
             lower=lower,
             upper=upper,
-            levels=self.params.levels,
+            levels=levels,
             capital=self.params.capital,
             reserve=0.05,
             lev=1,
             exchange=self.ex.ex,   # mevcut ccxt instance'ı
+            last=last if last else closes[-1],
         )
 
         if not plan:
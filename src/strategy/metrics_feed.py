@@ -1,65 +1,105 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
-import math, time
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+from collections import deque
 from src.core.exchange_ccxt import ExchangeCCXT
+from src.core import indicators
+from src.core.indicators import ADX, RollingQuantile, WindowCross
+from candle_store import CandleStore, default_store
 
-def _sma(vals: List[float], n: int) -> float:
-    if len(vals) < n or n <= 0:
-        return sum(vals) / max(1, len(vals))
-    return sum(vals[-n:]) / n
-
-def _percentile(sorted_vals: List[float], q: float) -> float:
-    if not sorted_vals:
-        return float("nan")
-    q = min(max(q, 0.0), 1.0)
-    idx = q * (len(sorted_vals) - 1)
-    lo, hi = int(math.floor(idx)), int(math.ceil(idx))
-    if lo == hi:
-        return sorted_vals[lo]
-    frac = idx - lo
-    return sorted_vals[lo] * (1 - frac) + sorted_vals[hi] * frac
+_store: Optional[CandleStore] = None
+_store_ready = False
+_store_lock = threading.Lock()
+
+WINDOW = 360  # 1m bar: crosses/touches penceresi
 
 def touches_per_hour(closes: List[float], q_lo: float = 0.2, q_hi: float = 0.8) -> float:
     if len(closes) < 60:  # en az 1 saatlik 1m bar
         return 0.0
-    S = sorted(closes)
-    lo = _percentile(S, q_lo); hi = _percentile(S, q_hi)
-    touches = sum(1 for c in closes if (c <= lo or c >= hi))
-    hours = max(len(closes) / 60.0, 1e-6)
-    return touches / hours
+    return indicators.touches_per_hour(closes, q_lo, q_hi)
 
 def crosses_per_hour(closes: List[float]) -> float:
+    """Pencere başında genişleyen, sonra 20 barlık mid'e göre geçiş / saat (WindowCross)."""
     if len(closes) < 60:
         return 0.0
-    mid = _sma(closes, 20)
-    # mid sabit sayı yerine seri olmalı -> kayan ortalama:
-    mids = []
-    for i in range(len(closes)):
-        window = closes[max(0, i-19):i+1]
-        mids.append(sum(window) / len(window))
-    cross = 0
-    prev_diff = None
-    for c, m in zip(closes, mids):
-        diff = c - m
-        if prev_diff is not None and (diff == 0 or (diff > 0) != (prev_diff > 0)):
-            cross += 1
-        prev_diff = diff
-    hours = max(len(closes) / 60.0, 1e-6)
-    return cross / hours
-
-def fetch_closes(ex: ExchangeCCXT, symbol: str, tf: str = "1m", limit: int = 360) -> List[float]:
+    wc = WindowCross(len(closes))
+    for c in closes:
+        wc.update(c)
+    return wc.count / max(len(closes) / 60.0, 1e-6)
+
+
+class SymbolMetrics:
+    """
+    Tek sembol için kalıcı gösterge durumu: her build_metrics çağrısında sadece yeni
+    kapanan 1m barlar update() edilir (pencere uzunluğundan bağımsız iş).
+    """
+
+    def __init__(self, window: int = WINDOW):
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        self.cross = WindowCross(self.window)
+        self.quant = RollingQuantile(self.window)
+        self.adx = ADX(14)
+        self.closes: deque = deque(maxlen=self.window)
+        self.last_ts: Optional[int] = None
+
+    def feed(self, rows: Sequence[Sequence[float]], step_ms: int = 60_000) -> None:
+        """Son (devam eden) bar hariç yeni satırlar; boşluk varsa satırlardan yeniden kurulur."""
+        closed = [r for r in rows[:-1] if self.last_ts is None or int(r[0]) > self.last_ts]
+        if closed and self.last_ts is not None and int(closed[0][0]) - self.last_ts > step_ms:
+            self.reset()
+            closed = list(rows[:-1])
+        for r in closed:
+            h, l, c = float(r[2]), float(r[3]), float(r[4])
+            self.cross.update(c)
+            self.quant.update(c)
+            self.adx.update(h, l, c)
+            self.closes.append(c)
+            self.last_ts = int(r[0])
+
+    def crosses_per_hour(self) -> float:
+        n = len(self.closes)
+        return self.cross.count / max(n / 60.0, 1e-6) if n >= 60 else 0.0
+
+    def touches_per_hour(self) -> float:
+        n = len(self.closes)
+        return self.quant.touches() / max(n / 60.0, 1e-6) if n >= 60 else 0.0
+
+
+_states: Dict[str, SymbolMetrics] = {}
+
+def get_store() -> Optional[CandleStore]:
+    """Candle store ilk fetch'te açılır (import .cache/candles oluşturmaz); 'off' → None."""
+    global _store, _store_ready
+    with _store_lock:
+        if not _store_ready:
+            _store = default_store()
+            _store_ready = True
+        return _store
+
+def fetch_ohlcv(ex: ExchangeCCXT, symbol: str, tf: str = "1m", limit: int = WINDOW) -> List[list]:
     # ccxt fetch_ohlcv default: [timestamp, open, high, low, close, volume]
-    ohlc = ex.ex.fetch_ohlcv(symbol, timeframe=tf, limit=limit)
-    return [c[4] for c in ohlc]
+    # candle store varsa sadece son kayıttan sonraki barlar çekilir
+    store = get_store()
+    if store is not None:
+        return store.fetch(ex.ex, symbol, tf, limit)
+    return ex.ex.fetch_ohlcv(symbol, timeframe=tf, limit=limit)
+
+def fetch_closes(ex: ExchangeCCXT, symbol: str, tf: str = "1m", limit: int = WINDOW) -> List[float]:
+    return [c[4] for c in fetch_ohlcv(ex, symbol, tf, limit)]
 
-def build_metrics(ex: ExchangeCCXT, symbol: str) -> Dict[str, float]:
-    closes = fetch_closes(ex, symbol, "1m", 360)
+def build_metrics(ex: ExchangeCCXT, symbol: str) -> Dict[str, Any]:
+    rows = fetch_ohlcv(ex, symbol, "1m", WINDOW)
+    st = _states.setdefault(symbol, SymbolMetrics())
+    st.feed(rows)
+    adx = st.adx.value
     return {
-        "crosses_per_hour": crosses_per_hour(closes),
-        "touches_per_hour": touches_per_hour(closes),
-        # Basit ADX vekili: buraya gerçek ADX eklenecekse scan_bingx_grid.py fonksiyonlarını port edelim
-        "adx": 18.0,
+        "crosses_per_hour": st.crosses_per_hour(),
+        "touches_per_hour": st.touches_per_hour(),
+        "adx": adx if adx is not None else 0.0,
         "liquidity_ok": True,
-        "last": closes[-1] if closes else None,
-        "closes": closes[-200:]
+        "last": rows[-1][4] if rows else None,
+        "closes": [r[4] for r in rows[-200:]]
     }
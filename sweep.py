@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# sweep.py
+# Threshold sweep over a recorded scan (scan_bingx_grid.py --record snapshot), no network.
+# Every symbol's raw metrics (ATR%, range, 24h quote volume, ADX, mid-cross, drift,
+# listing age, FAST xph/med/edge) are computed once with the scanner's own functions;
+# then every threshold combination is evaluated as (combos × symbols) NumPy masks,
+# with the same pingpong / FAST / Top-list rules and ranking as scan_bingx_grid.main().
+#
+#   python sweep.py snap.json.gz --set ADX_MAX=8:20:1 MID_CROSS_MIN=10,14,18,22 \
+#          DRIFT_MAX_RATIO=0.1:0.4:0.05 MIN_CROSSES_PER_HOUR=6:14:2 --out sweep.csv
+#
+# Unswept knobs keep their env/scanner defaults. The snapshot only holds windows the
+# recorded run fetched: ticker-stage rejects have none, and with staged fetching FAST
+# windows exist only for symbols that reached the FAST stage; record with
+# SINGLE_FETCH_1M=1 (FAST resampled from the 1m base) to sweep FAST knobs over everyone.
+
+import argparse, csv, itertools, sys, time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+import scan_bingx_grid as S
+from listing_index import BACKFILL_1D, BACKFILL_1H
+from replay_exchange import ReplayExchange, Snapshot
+from resample import resample_ohlcv
+
+# sweepable knobs (scan_bingx_grid env names)
+PARAMS = (
+    "ATR_PCT_MIN", "RANGE_PCT_MIN", "MIN_QVOL_USDT", "LISTED_MIN_DAYS",
+    "ADX_MAX", "MID_CROSS_MIN", "DRIFT_MAX_RATIO",
+    "MIN_CROSSES_PER_HOUR", "CYCLE_MIN_MIN", "CYCLE_MAX_MIN", "MIN_EDGE_TOUCHES_PH", "WIDE_MIN_RANGE_PCT",
+    "TOP_ADX_HARD_MAX", "TOP_DRIFT_HARD_MAX", "FAST_NEAR_MIN_XPH", "FAST_REQUIRE_PINGPONG",
+)
+CHUNK = 1024   # kombinasyon bloğu (bellek: CHUNK × sembol boolean)
+
+
+# ---------- raw metrics (once) ----------
+
+def _windows(snap: Snapshot) -> Dict[Tuple[str, str], List[list]]:
+    """(symbol, tf) → kayıtlı en uzun since=None penceresi."""
+    out: Dict[Tuple[str, str], List[list]] = {}
+    for key, rows in snap.data["ohlcv"].items():
+        sym, tf, _, since = key.split("|")
+        if since == "" and rows and len(rows) > len(out.get((sym, tf), ())):
+            out[(sym, tf)] = rows
+    return out
+
+
+def _window(win: Dict[Tuple[str, str], List[list]], sym: str, tf: str, limit: int) -> List[list]:
+    if (sym, tf) in win:
+        return win[(sym, tf)][-limit:]
+    if (sym, "1m") in win:   # SINGLE_FETCH_1M kaydı
+        return resample_ohlcv(win[(sym, "1m")], tf)[-limit:]
+    return []
+
+
+def _age_days(sym: str, markets: Dict[str, Any], index, win, now_ms: int) -> float:
+    """scan_pairs'teki listing yaşı sırası; kayıtlı backfill pencereleri index'e işlenir. Bilinmiyor → -1."""
+    days = S.listing_age_from_info(now_ms, markets.get(sym, {}))
+    if days is None and index is not None:
+        days = index.age_days(sym, now_ms)
+    bars1h = win.get((sym, BACKFILL_1H[0]))
+    if days is not None or not bars1h:
+        return -1.0 if days is None else days
+    if index is None:
+        return len(bars1h) / 24.0
+    if index.record_backfill(sym, bars1h, *BACKFILL_1H) and (sym, BACKFILL_1D[0]) in win:
+        index.record_backfill(sym, win[(sym, BACKFILL_1D[0])], *BACKFILL_1D)
+    known = index.age_days(sym, now_ms)
+    return known if known is not None else len(bars1h) / 24.0
+
+
+def load_metrics(snap: Snapshot) -> Dict[str, Any]:
+    """Snapshot → sembol başına ham metrik dizileri (pairs sırası, scanner ile aynı evren)."""
+    ex = ReplayExchange(snap)
+    index = snap.listing_index()
+    markets, pairs = S.load_universe(ex, index)
+    now_ms = ex.milliseconds()
+    win = _windows(snap)
+
+    items = []
+    for sym, tk in pairs:
+        rows5 = _window(win, sym, "5m", 200)
+        if len(rows5) >= 60:
+            items.append((sym, tk, rows5))
+    states = S.eval_5m_many(items, with_adx=True)
+    fast = S.eval_fast_many([(st, _window(win, st["symbol"], S.FAST_TF, S.FAST_LIMIT)) for st in states])
+    tickers = dict(pairs)
+
+    n = len(states)
+    m = {k: np.zeros(n) for k in ("atr_pct", "range_pct", "qvol", "adx", "midcross", "drift",
+                                  "age_days", "xph", "med", "edge")}
+    m["has_fast"] = np.zeros(n, dtype=bool)
+    for r, (st, f) in enumerate(zip(states, fast)):
+        sym = st["symbol"]
+        m["atr_pct"][r], m["range_pct"][r] = st["atr_pct"], st["range_pct"]
+        m["qvol"][r] = S.ticker_quote_usdt(tickers[sym])
+        m["adx"][r], m["midcross"][r], m["drift"][r] = st["adx"], st["midcross"], st["drift_ratio"]
+        m["age_days"][r] = _age_days(sym, markets, index, win, now_ms)
+        if isinstance(f, dict) and f["xph"] != "NA":
+            m["has_fast"][r] = True
+            m["xph"][r], m["med"][r], m["edge"][r] = f["xph_n"], f["med_n"], f["edgeph_n"]
+    m["symbols"] = [st["symbol"] for st in states]
+    m["universe"] = len(pairs)
+    return m
+
+
+# ---------- combinations ----------
+
+def parse_values(spec: str) -> List[float]:
+    """'8:20:2' (uçlar dahil) | '10,14,18' | '13'"""
+    if ":" in spec:
+        a, b, step = (float(x) for x in spec.split(":"))
+        k = int(np.floor((b - a) / step + 1e-9)) + 1
+        return [round(a + i * step, 10) for i in range(max(k, 0))]
+    return [float(x) for x in spec.split(",") if x.strip()]
+
+
+def build_grid(sets: Sequence[str]) -> Tuple[List[str], np.ndarray, List[str]]:
+    """--set NAME=values listesi → (param adları, combos[m, p], taranan adlar); verilmeyenler scanner varsayılanı."""
+    grid = {name: [float(getattr(S, name))] for name in PARAMS}
+    swept = []
+    for item in sets:
+        name, _, spec = item.partition("=")
+        name = name.strip().upper()
+        if name not in grid:
+            raise SystemExit(f"bilinmeyen parametre: {name} (seçenekler: {', '.join(PARAMS)})")
+        grid[name] = parse_values(spec)
+        swept.append(name)
+    names = list(PARAMS)
+    combos = np.array(list(itertools.product(*(grid[n] for n in names))), dtype=np.float64)
+    return names, combos.reshape(-1, len(names)), swept
+
+
+# ---------- vectorised evaluation ----------
+
+def masks(m: Dict[str, Any], names: List[str], P: np.ndarray) -> Dict[str, np.ndarray]:
+    """Kombinasyon × sembol boolean maskeleri: base, pp, fast (FAST listesi, kesilmeden önce), top (hard cap)."""
+    v = {name: P[:, k][:, None] for k, name in enumerate(names)}
+    liq = (v["MIN_QVOL_USDT"] <= 0) | (m["qvol"] >= v["MIN_QVOL_USDT"])
+    base = (m["atr_pct"] >= v["ATR_PCT_MIN"]) & (m["range_pct"] >= v["RANGE_PCT_MIN"]) & liq
+    age_ok = (v["LISTED_MIN_DAYS"] <= 0) | (m["age_days"] < 0) | (m["age_days"] >= v["LISTED_MIN_DAYS"])
+    pp = (base & age_ok & (m["adx"] <= v["ADX_MAX"]) & (m["midcross"] >= v["MID_CROSS_MIN"])
+          & (m["drift"] <= v["DRIFT_MAX_RATIO"]))
+    fast_ok = (m["has_fast"] & (m["xph"] >= v["MIN_CROSSES_PER_HOUR"])
+               & (m["med"] >= v["CYCLE_MIN_MIN"]) & (m["med"] <= v["CYCLE_MAX_MIN"])
+               & (m["edge"] >= v["MIN_EDGE_TOUCHES_PH"]) & (m["range_pct"] >= v["WIDE_MIN_RANGE_PCT"]))
+    fast = fast_ok & (pp | (v["FAST_REQUIRE_PINGPONG"] == 0)) & bool(S.FAST_S_MODE)
+    top = base & (m["adx"] <= v["TOP_ADX_HARD_MAX"]) & (m["drift"] <= v["TOP_DRIFT_HARD_MAX"])
+    return {"base": base, "pp": pp, "fast": fast, "top": top}
+
+
+def evaluate(m: Dict[str, Any], names: List[str], combos: np.ndarray,
+             top_send: int = None, top_fast: int = None) -> Dict[str, np.ndarray]:
+    """
+    Her kombinasyon için sayılar + sıralamalar (sembol indeksleri, boş yer -1):
+      n_base, n_pp, n_fast (FAST listesi, kesilmeden önce), n_top (hard cap sonrası)
+      s_idx (S davranışı = ilk PP), top_idx[:, top_send], fast_idx[:, top_fast]
+    """
+    top_send = S.TOP_SEND if top_send is None else top_send
+    top_fast = S.TOP_FAST if top_fast is None else top_fast
+    n = len(m["symbols"])
+    near = names.index("FAST_NEAR_MIN_XPH")
+    # combination-independent orders: Top → -(atr*range), pairs sırası eşitlikte; FAST → rank_fast anahtarı
+    score_pos = np.empty(n, dtype=np.int64)
+    score_pos[np.lexsort((np.arange(n), -(m["atr_pct"] * m["range_pct"])))] = np.arange(n)
+    fast_pos = np.empty(n, dtype=np.int64)
+    fast_pos[np.lexsort((np.arange(n), -m["range_pct"], m["med"], -m["edge"], -m["xph"]))] = np.arange(n)
+    big = np.iinfo(np.int64).max
+
+    out = {k: np.zeros(len(combos), dtype=np.int64) for k in ("n_base", "n_pp", "n_fast", "n_top")}
+    out["s_idx"] = np.full(len(combos), -1, dtype=np.int64)
+    out["top_idx"] = np.full((len(combos), top_send), -1, dtype=np.int64)
+    out["fast_idx"] = np.full((len(combos), top_fast), -1, dtype=np.int64)
+    for c0 in range(0, len(combos), CHUNK):
+        P = combos[c0:c0 + CHUNK]
+        mk = masks(m, names, P)
+        base, pp, fast, top = (mk[k] for k in ("base", "pp", "fast", "top"))
+        has_pp = pp.any(axis=1)
+        s_idx = np.where(has_pp, pp.argmax(axis=1), -1)
+        rows = np.arange(len(P))
+        listed = top.copy()
+        listed[rows[has_pp], s_idx[has_pp]] = False   # S davranışı Top listesinde tekrarlanmaz
+        cls = 2 * (~pp).astype(np.int64) + (~fast).astype(np.int64)
+        key = np.where(listed, cls * n + score_pos, big)
+        fkey = np.where(fast & (m["xph"] >= P[:, near][:, None]), fast_pos, big)
+
+        sl = slice(c0, c0 + len(P))
+        out["n_base"][sl], out["n_pp"][sl] = base.sum(axis=1), pp.sum(axis=1)
+        out["n_fast"][sl], out["n_top"][sl] = fast.sum(axis=1), top.sum(axis=1)
+        out["s_idx"][sl] = s_idx
+        out["top_idx"][sl] = _first(key, top_send, big)
+        out["fast_idx"][sl] = _first(fkey, top_fast, big)
+    return out
+
+
+def _first(key: np.ndarray, k: int, big: int) -> np.ndarray:
+    """Satır başına en küçük k anahtarın sütunları (artan), big olanlar -1."""
+    k_eff = min(k, key.shape[1])
+    res = np.full((key.shape[0], k), -1, dtype=np.int64)
+    if k_eff == 0:
+        return res
+    part = np.argpartition(key, k_eff - 1, axis=1)[:, :k_eff] if k_eff < key.shape[1] else \
+        np.tile(np.arange(key.shape[1]), (key.shape[0], 1))
+    pk = np.take_along_axis(key, part, axis=1)
+    order = np.argsort(pk, axis=1, kind="stable")
+    idx = np.take_along_axis(part, order, axis=1)
+    res[:, :k_eff] = np.where(np.take_along_axis(pk, order, axis=1) == big, -1, idx)
+    return res
+
+
+# ---------- output ----------
+
+def _syms(symbols: List[str], idx: np.ndarray) -> List[str]:
+    return [symbols[i] for i in idx.tolist() if i >= 0]
+
+
+def write_csv(path: str, m: Dict[str, Any], names: List[str], combos: np.ndarray, res: Dict[str, np.ndarray]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(names + ["n_base", "n_pp", "n_fast", "n_top", "s_behavior", "top", "fast"])
+        for c in range(len(combos)):
+            s = res["s_idx"][c]
+            w.writerow([f"{x:g}" for x in combos[c]]
+                       + [int(res[k][c]) for k in ("n_base", "n_pp", "n_fast", "n_top")]
+                       + [m["symbols"][s] if s >= 0 else "",
+                          ";".join(_syms(m["symbols"], res["top_idx"][c])),
+                          ";".join(_syms(m["symbols"], res["fast_idx"][c]))])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Kayıtlı taramada eşik taraması (ağsız)")
+    ap.add_argument("snapshot", help="scan_bingx_grid.py --record çıktısı (.json.gz)")
+    ap.add_argument("--set", nargs="*", default=[], metavar="NAME=SPEC",
+                    help="örn. ADX_MAX=8:20:1 MID_CROSS_MIN=10,14,18 (a:b:adım uçlar dahil)")
+    ap.add_argument("--sort", choices=["n_pp", "n_fast", "n_top", "n_base"], default="n_pp")
+    ap.add_argument("--show", type=int, default=10, help="ekrana basılan en iyi kombinasyon sayısı")
+    ap.add_argument("--out", help="tüm kombinasyonlar CSV")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    m = load_metrics(Snapshot.load(args.snapshot))
+    t1 = time.perf_counter()
+    names, combos, swept = build_grid(args.set)
+    res = evaluate(m, names, combos)
+    t2 = time.perf_counter()
+    print(f"[info] {len(m['symbols'])}/{m['universe']} sembol (FAST verisi: {int(m['has_fast'].sum())}) "
+          f"| metrikler {t1 - t0:.2f}s | {len(combos)} kombinasyon {t2 - t1:.2f}s")
+    if len(m["symbols"]) < m["universe"]:
+        print(f"[info] {m['universe'] - len(m['symbols'])} sembolün kayıtlı 5m penceresi yok (ticker aşamasında elenmiş)")
+
+    best = np.argsort(-res[args.sort], kind="stable")[:args.show]
+    for c in best.tolist():
+        knobs = " ".join(f"{name}={combos[c, names.index(name)]:g}" for name in swept) or "(varsayılanlar)"
+        print(f"{knobs} | base {res['n_base'][c]} pp {res['n_pp'][c]} fast {res['n_fast'][c]} top {res['n_top'][c]}")
+        print("   top :", ", ".join(_syms(m["symbols"], res["top_idx"][c])) or "-")
+        print("   fast:", ", ".join(_syms(m["symbols"], res["fast_idx"][c])) or "-")
+    if args.out:
+        write_csv(args.out, m, names, combos, res)
+        print(f"[info] yazıldı: {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import os, sys, json, urllib.request
+import os, sys
+
+from src.core.notifier import TelegramNotifier
 
 def send_message(token, chat_id, text):
-    data = json.dumps({"chat_id": chat_id, "text": text}).encode("utf-8")
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    req = urllib.request.Request(url, data=data, headers={"Content-Type":"application/json"})
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        resp.read()
+    tg = TelegramNotifier(token, chat_id)
+    tg.send(text)
+    tg.flush(60.0)
+    return tg.failed == 0
 
 def first_lines(path, n=8):
     try:
@@ -34,5 +35,5 @@ if __name__ == "__main__":
     if not parts:
         sys.exit(0)
     text = "🧰 Grid Candidates — BingX\n" + "\n\n".join(parts)
-    send_message(token, chat_id, text)
-    print("Telegram sent.")
+    if send_message(token, chat_id, text):
+        print("Telegram sent.")
@@ -0,0 +1,106 @@
+# Testler repo kökündeki modülleri (scan_bingx_grid, grid_sizer, ...) doğrudan import eder.
+import os, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+# ---------- sentetik piyasa (scan_pairs / scan_sharded / sweep testleri, ağsız) ----------
+import math, random
+
+import pytest
+
+NOW_MS = 1_700_000_000_000 - 1_700_000_000_000 % 86_400_000
+TF_MS = {"1m": 60_000, "5m": 300_000, "1h": 3_600_000, "1d": 86_400_000}
+BARS = {"1m": 360, "5m": 200, "1h": 500, "1d": 1000}
+DAY_MS = 86_400_000
+
+
+def _bars(seed: int, n: int, tf: str, trend: float = 0.0, period: float = 6.0, tilt: float = 0.0) -> list:
+    """trend > 0 → tek yönlü yürüyüş; aksi halde uçları aynı fazda sinüs (+ tilt ile drift) + gürültü."""
+    r = random.Random(seed)
+    p = base = 10.0 + r.random() * 40
+    cycles = max(round((n - 1) / period), 1)
+    rows = []
+    for i in range(n):
+        o = p
+        if trend:
+            base *= 1.0 + trend
+            p = base * (1 + r.gauss(0, 0.003))
+        else:
+            p = base * (1 + 0.025 * math.sin(2 * math.pi * i * cycles / (n - 1)) + tilt * i / n + r.gauss(0, 0.0015))
+        h = max(o, p) * (1 + abs(r.gauss(0, 0.001)))
+        l = min(o, p) * (1 - abs(r.gauss(0, 0.001)))
+        rows.append([NOW_MS - (n - 1 - i) * TF_MS[tf], o, h, l, p, 100.0])
+    return rows
+
+
+class SynthExchange:
+    """
+    ccxt yerine n sembollük deterministik piyasa. k % 3 == 1 trend (TREND/MID/DRIFT),
+    diğerleri yatay (drift k % 5 ile artar); k % 4 == 3 yeni listelenmiş (market info'da
+    listingTime yok, 1h geçmişi ~4 gün); k % 7 == 6 düşük hacim (ticker aşamasında elenir).
+    """
+
+    id = "synth"
+
+    def __init__(self, n: int = 24):
+        self.symbols = [f"S{k:02d}/USDT:USDT" for k in range(n)]
+        self.young = {s for k, s in enumerate(self.symbols) if k % 4 == 3}
+        self.markets, self.tickers, self.bars = {}, {}, {}
+        for k, s in enumerate(self.symbols):
+            info = {} if s in self.young else {"listingTime": NOW_MS - 365 * DAY_MS}
+            self.markets[s] = {"symbol": s, "contract": True, "quote": "USDT", "info": info}
+            trend = 0.003 if k % 3 == 1 else 0.0
+            for j, tf in enumerate(BARS):
+                n_tf = BARS[tf] if s not in self.young or tf in ("1m", "5m") else BARS[tf] // 5 if tf == "1h" else 4
+                self.bars[(s, tf)] = _bars(1000 * k + j, n_tf, tf, trend if tf == "5m" else 0.0,
+                                           6.0 if tf == "5m" else 10.0, 0.01 * (k % 5) if tf == "5m" else 0.0)
+            rows = self.bars[(s, "5m")]
+            self.tickers[s] = {"symbol": s, "last": rows[-1][4], "high": max(x[2] for x in rows),
+                               "low": min(x[3] for x in rows),
+                               "quoteVolume": 5e5 if k % 7 == 6 else 2e6 + k}
+        self.currencies = None
+
+    @property
+    def pairs(self) -> list:
+        return [(s, self.tickers[s]) for s in self.symbols]
+
+    def load_markets(self, reload: bool = False):
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets, self.currencies = markets, currencies
+
+    def fetch_tickers(self, symbols=None):
+        return {s: t for s, t in self.tickers.items() if symbols is None or s in symbols}
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        return self.bars[(symbol, timeframe)][-(limit or 500):]
+
+    def milliseconds(self) -> int:
+        return NOW_MS
+
+    def fetcher(self) -> "SynthFetcher":
+        return SynthFetcher(self)
+
+
+class SynthFetcher:
+    """fetch_many (fetch_pool.SerialFetcher arayüzü); işler kaydedilir."""
+
+    def __init__(self, ex: SynthExchange):
+        self.ex = ex
+        self.jobs = []
+
+    def fetch_many(self, jobs):
+        self.jobs += [tuple(j) for j in jobs]
+        return [self.ex.fetch_ohlcv(s, tf, since, lim) for s, tf, lim, since in jobs]
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def synth_market():
+    return SynthExchange()
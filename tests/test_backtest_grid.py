@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import backtest_grid as BT
+import grid_sizer as G
+from src.strategy.dynamic_grid import DynamicGrid, GridParams
+
+MARKET = {"precision": {"price": 4, "amount": 0}, "limits": {"cost": {"min": 5}, "amount": {"min": 1}}}
+
+
+class FakeEx:
+    id = "fake"
+    markets = {"S": MARKET}
+
+    def load_markets(self):
+        return self.markets
+
+
+def _bars(n, seed=5):
+    rng = np.random.default_rng(seed)
+    x = np.zeros(n)
+    for t in range(1, n):
+        x[t] = 0.999 * x[t - 1] + rng.normal(0, 0.0008)
+    step = 0.0001
+    c = np.array([float(f"{v:.4f}") for v in np.round(1.2345 * np.exp(x) / step) * step])
+    o = np.concatenate(([c[0]], c[:-1]))
+    h = np.maximum(o, c) + np.round(np.abs(rng.normal(0, 0.0006, n)) * 1.2345 / step) * step
+    l = np.minimum(o, c) - np.round(np.abs(rng.normal(0, 0.0006, n)) * 1.2345 / step) * step
+    return np.column_stack([np.arange(n) * 60000.0, o, h, l, c, np.ones(n)])
+
+
+def test_matches_scalar_replay(monkeypatch):
+    monkeypatch.setenv("MARKET_CACHE_DIR", "off")
+    bars = _bars(1500)
+    _, o, h, l, c, _ = bars.T
+    p = GridParams(levels=16, capital=200, atr_k=1.2, retune_sec=120)
+
+    # skaler referans: DynamicGrid bandı + compute_grid_inline + bar başına dolum
+    dg = DynamicGrid.__new__(DynamicGrid)
+    closes = c.tolist()
+    book, last_band = [], None
+    pos = cash = 0.0
+    fills = 0
+    for t in range(20, len(c)):
+        if (t - 20) % 2 == 0:
+            lo, hi = dg._compute_band(closes[:t])
+            if not last_band or (abs(lo - last_band[0]) + abs(hi - last_band[1])) / max(1e-9, last_band[1] - last_band[0]) >= 0.001:
+                last_band = (lo, hi)
+                plan = G.compute_grid_inline("S", lo, hi, 16, 200, 0.05, 1, exchange=FakeEx(), last=closes[t - 1])
+                if plan and sum(q["notional"] for q in plan) <= 500:
+                    book = [dict(q) for q in plan]
+        keep = []
+        for q in book:
+            if (q["side"] == "buy" and l[t] <= q["price"]) or (q["side"] == "sell" and h[t] >= q["price"]):
+                sg = 1 if q["side"] == "buy" else -1
+                pos += sg * q["qty"]
+                cash -= sg * q["price"] * q["qty"] + q["price"] * q["qty"] * 0.0006
+                fills += 1
+            else:
+                keep.append(q)
+        book = keep
+
+    res = BT.backtest(bars, G.extract_filters(MARKET), p)
+    assert res["fills"] == fills > 0
+    assert res["pnl"] == pytest.approx(cash + pos * c[-1], rel=1e-9, abs=1e-9)
+
+
+def test_optimize_is_rejected():
+    with pytest.raises(ValueError):
+        BT.backtest(_bars(100), G.extract_filters(MARKET), GridParams(levels=8, capital=100, atr_k=0.0, retune_sec=60, optimize=True))
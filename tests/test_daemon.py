@@ -0,0 +1,140 @@
+import pytest
+
+import scan_bingx_grid as scan
+from kline_feed import FakeFeed, KlineFeed
+
+T0 = 1_700_000_100_000 - 1_700_000_100_000 % 300_000    # 5m sınırı
+STEP = {"1m": 60_000, "5m": 300_000}
+A, B = "A/USDT:USDT", "B/USDT:USDT"
+
+
+def _bar(ts, c=1.0):
+    return [ts, c, c, c, c, 1.0]
+
+
+class FakeFetcher:
+    """fetch_many: her (sym, tf) için end[tf]'de biten `limit` bar; işler kaydedilir."""
+
+    def __init__(self, end_1m=T0):
+        self.end = {"1m": end_1m, "5m": T0}
+        self.jobs = []
+
+    def fetch_many(self, jobs):
+        self.jobs += list(jobs)
+        return [[_bar(self.end[tf] - (lim - 1 - k) * STEP[tf]) for k in range(lim)]
+                for s, tf, lim, since in jobs]
+
+
+class FakeEx:
+    def milliseconds(self):
+        return T0
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    """
+    run_daemon + sahte scan_pairs: plan[i] = {sym: (pp, fast)} i. geçişin sonucu
+    (plan bitince son durum). Döner: run(feed, plan, fetcher) → (flags, passes, alerts).
+    """
+    monkeypatch.setattr(scan, "DAEMON_TICKER_SEC", 0)
+    monkeypatch.setattr(scan, "SINGLE_FETCH_1M", 0)
+    monkeypatch.setattr(scan, "FAST_S_MODE", 1)
+    monkeypatch.setattr(scan, "FAST_TF", "1m")
+    monkeypatch.setattr(scan, "FAST_LIMIT", 10)
+
+    def run(feed, plan=(), fetcher=None):
+        passes, alerts = [], []
+
+        def fake_scan_pairs(ex, markets, batch, windows, store, index):
+            st = plan[min(len(passes), len(plan) - 1)] if plan else {}
+            passes.append([s for s, _ in batch])
+            allres = [{"symbol": s} for s, _ in batch]
+            pp = [d for d in allres if st.get(d["symbol"], (False, False))[0]]
+            fast = [dict(d, xph_n=99.0) for d in allres if st.get(d["symbol"], (False, False))[1]]
+            return allres, pp, fast
+
+        monkeypatch.setattr(scan, "scan_pairs", fake_scan_pairs)
+        flags = scan.run_daemon(FakeEx(), {}, [(A, {}), (B, {})], fetcher or FakeFetcher(), feed,
+                                notify=lambda pp, fast: alerts.append(([d["symbol"] for d in pp],
+                                                                       [d["symbol"] for d in fast])))
+        return flags, passes, alerts
+
+    return run
+
+
+def test_kline_feed_is_abstract():
+    with pytest.raises(TypeError):
+        KlineFeed()
+
+
+def test_rescan_only_on_bar_rollover(daemon):
+    feed = FakeFeed([
+        [(A, "1m", _bar(T0, 1.1))],               # devam eden bar güncellemesi
+        [(A, "1m", _bar(T0 + 60_000))],           # yeni bar → A'nın önceki barı kapandı
+        [(B, "1m", _bar(T0 - 60_000))],           # eski bar → yok sayılır
+    ])
+    flags, passes, alerts = daemon(feed)
+    assert (A, "1m") in feed.subscribed and (B, "5m") in feed.subscribed
+    assert passes == [[A, B], [A]]
+    assert flags == {A: (False, False), B: (False, False)}
+    assert alerts == []
+
+
+def test_alerts_are_deduplicated(daemon):
+    feed = FakeFeed([[(A, "1m", _bar(T0 + k * 60_000))] for k in range(1, 5)])
+    plan = [{A: (True, False)},     # seed: A yeni PP → uyarı
+            {A: (True, False)},     # değişmedi → uyarı yok
+            {A: (True, True)},      # FAST yeni → sadece FAST uyarısı
+            {A: (False, True)},     # PP düştü → uyarı yok
+            {A: (True, True)}]      # PP geri geldi → yeniden uyarı
+    flags, passes, alerts = daemon(feed, plan)
+    assert len(passes) == 5
+    assert alerts == [([A], []), ([], [A]), ([A], [])]
+    assert flags[A] == (True, True) and flags[B] == (False, False)
+
+
+def test_gap_refills_window(daemon):
+    gap_ts = T0 + 5 * 60_000
+    fetcher = FakeFetcher()
+
+    class GapFeed(FakeFeed):
+        def poll(self, timeout):
+            fetcher.end["1m"] = gap_ts      # seed'den sonra borsa gap_ts'e ilerledi
+            return super().poll(timeout)
+
+    flags, passes, alerts = daemon(GapFeed([[(A, "1m", _bar(gap_ts))]]), fetcher=fetcher)
+    assert passes == [[A, B], [A]]
+    assert fetcher.jobs[-1] == (A, "1m", 10, None)      # boşluk → pencere yeniden çekildi
+
+
+def test_rolling_windows_gap_has_no_holes():
+    fetcher = FakeFetcher()
+    w = scan.RollingWindows(fetcher, {"1m": 10})
+    w.seed([A], None, T0)
+    fetcher.end["1m"] = T0 + 4 * 60_000
+    assert w.apply(A, "1m", _bar(T0 + 4 * 60_000)) is True
+    ts = [int(r[0]) for r in w.win[(A, "1m")]]
+    assert len(ts) == 10 and ts[-1] == T0 + 4 * 60_000
+    assert all(b - a == 60_000 for a, b in zip(ts, ts[1:]))
+    # ardışık bar: fetch yok, sadece ekleme
+    n = len(fetcher.jobs)
+    assert w.apply(A, "1m", _bar(T0 + 5 * 60_000)) is True
+    assert len(fetcher.jobs) == n
+
+
+def test_rolling_windows_gap_fetch_error_appends_bar(capsys):
+    class Failing(FakeFetcher):
+        fail = False
+
+        def fetch_many(self, jobs):
+            if self.fail:
+                return [RuntimeError("down")] * len(jobs)
+            return super().fetch_many(jobs)
+
+    fetcher = Failing()
+    w = scan.RollingWindows(fetcher, {"1m": 10})
+    w.seed([A], None, T0)
+    fetcher.fail = True
+    assert w.apply(A, "1m", _bar(T0 + 3 * 60_000)) is True
+    assert int(w.win[(A, "1m")][-1][0]) == T0 + 3 * 60_000
+    assert "boşluk doldurulamadı" in capsys.readouterr().out
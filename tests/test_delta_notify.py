@@ -0,0 +1,79 @@
+from delta_notify import NotifyState, diff, make_board, publish, shift_fields
+
+KW = dict(full_every_s=3600, band_tol=0.002, metric_tol=0.2)
+
+
+def _e(sym, low=1.0, high=1.1, lines=10, atr=0.01):
+    return {"symbol": sym, "last": 1.05, "grid_low": low, "grid_high": high, "grid_lines": lines,
+            "atr_pct": atr, "range_pct": 0.05, "adx": 20.0}
+
+
+class FakeTG:
+    def __init__(self):
+        self.sent, self.edits, self._id = [], [], 0
+
+    def send_now(self, text, **kw):
+        self._id += 1
+        self.sent.append(text)
+        return [self._id]
+
+    def edit_now(self, mid, text, **kw):
+        self.edits.append((mid, text))
+        return True
+
+
+def test_shift_fields_thresholds():
+    base = _e("A")
+    assert shift_fields(base, dict(base), 0.002, 0.2) == []
+    assert shift_fields(base, _e("A", low=1.0 + 0.001), 0.002, 0.2) == []      # 0.001 < 0.002 * 1.05
+    assert shift_fields(base, _e("A", low=1.01), 0.002, 0.2) == ["grid"]
+    assert shift_fields(base, _e("A", lines=12), 0.002, 0.2) == ["grid"]
+    assert shift_fields(base, _e("A", atr=0.013), 0.002, 0.2) == ["atr_pct"]
+    assert shift_fields(base, dict(base, adx=None), 0.002, 0.2) == []          # eksik metrik yok sayılır
+
+
+def test_diff_entered_exited_shifted_same():
+    prev = make_board(_e("S"), [_e("A"), _e("B")], [_e("F")])
+    cur = make_board(_e("S"), [_e("A", low=1.02), _e("C")], [_e("F")])
+    entered, exited, shifted, same = diff(prev, cur, 0.002, 0.2)
+    assert [(l, d["symbol"]) for l, d in entered] == [("top", "C")]
+    assert [(l, d["symbol"]) for l, d in exited] == [("top", "B")]
+    assert [(l, n["symbol"], f) for l, _, n, f in shifted] == [("top", "A", ["grid"])]
+    assert same == 2
+
+
+def test_publish_full_none_delta(tmp_path):
+    path = str(tmp_path / "state.json")
+    tg = FakeTG()
+    compose = lambda *a: [f"delta {len(a[0])}/{len(a[1])}/{len(a[2])}"]
+    b1 = make_board(None, [_e("A"), _e("B")], [])
+    assert publish(tg, NotifyState(path), b1, ["full"], compose, now=1000, **KW) == "full"
+    assert publish(tg, NotifyState(path), b1, ["full"], compose, now=1100, **KW) == "none"
+    b2 = make_board(None, [_e("A"), _e("C")], [])
+    assert publish(tg, NotifyState(path), b2, ["full"], compose, now=1200, **KW) == "delta"
+    assert tg.sent == ["full", "delta 1/1/0"]
+    assert publish(tg, NotifyState(path), b2, ["full"], compose, now=1000 + 3600, **KW) == "full"
+
+
+def test_slow_drift_accumulates_until_threshold(tmp_path):
+    path = str(tmp_path / "state.json")
+    tg = FakeTG()
+    compose = lambda *a: ["delta"]
+    publish(tg, NotifyState(path), make_board(None, [_e("A"), _e("B")], []), ["full"], compose, now=0, **KW)
+    # A eşik altında kayar; B değişince delta gider ama A eski değeriyle saklanır
+    b = make_board(None, [_e("A", low=1.0015)], [])
+    assert publish(tg, NotifyState(path), b, ["full"], compose, now=10, **KW) == "delta"
+    assert NotifyState(path).board["top"]["A"]["grid_low"] == 1.0
+    b = make_board(None, [_e("A", low=1.003)], [])
+    assert publish(tg, NotifyState(path), b, ["full"], compose, now=20, **KW) == "delta"
+    assert NotifyState(path).board["top"]["A"]["grid_low"] == 1.003
+
+
+def test_publish_edit_in_place(tmp_path):
+    path = str(tmp_path / "state.json")
+    tg = FakeTG()
+    publish(tg, NotifyState(path), make_board(None, [_e("A")], []), ["p1", "p2"], None, now=0, **KW)
+    out = publish(tg, NotifyState(path), make_board(None, [_e("B")], []), ["q1"], None, edit=True, now=5, **KW)
+    assert out == "edit"
+    assert tg.edits == [(1, "q1"), (2, "—")]
+    assert NotifyState(path).message_ids == [1]
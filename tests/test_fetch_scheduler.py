@@ -0,0 +1,48 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ccxt
+
+from fetch_scheduler import FakeAsyncExchange, FetchScheduler
+
+
+def _jobs(n):
+    return [(f"S{k}", "1m", 3, 1_700_000_000_000 + k) for k in range(n)]
+
+
+def test_slow_venue_does_not_throttle_fast_venue():
+    sched = FetchScheduler()
+    slow, fast = FakeAsyncExchange("slow", latency=0.3), FakeAsyncExchange("fast", latency=0.005)
+    sched.add_venue("slow", slow, rate=2, workers=2)
+    sched.add_venue("fast", fast, rate=200, workers=4)
+
+    def run(name, n):
+        t0 = time.monotonic()
+        res = sched.fetcher(name).fetch_many(_jobs(n))
+        return time.monotonic() - t0, res
+
+    try:
+        with ThreadPoolExecutor(2) as pool:
+            f_slow = pool.submit(run, "slow", 6)
+            time.sleep(0.05)                      # yavaş borsa önce kuyruğa girsin
+            f_fast = pool.submit(run, "fast", 40)
+            took_fast, res_fast = f_fast.result()
+            took_slow, _ = f_slow.result()
+    finally:
+        sched.close()
+    assert len(res_fast) == 40 and len(fast.calls) == 40
+    assert took_fast < 1.0 < took_slow
+    assert max(fast.calls) < max(slow.calls)      # hızlı borsa yavaşı beklemeden bitti
+
+
+def test_results_keep_job_order_and_return_errors():
+    sched = FetchScheduler()
+    ex = FakeAsyncExchange("x", latency=0.0, fail_every=3)
+    sched.add_venue("x", ex, rate=1000, workers=1)
+    try:
+        res = sched.fetcher("x").fetch_many(_jobs(6))
+    finally:
+        sched.close()
+    assert [isinstance(r, ccxt.NetworkError) for r in res] == [False, False, True, False, False, True]
+    assert res[1][0][0] == 1_700_000_000_001
+    assert sched.fetcher("x").fetch_many([]) == []
@@ -0,0 +1,45 @@
+from formatting import (MAX_LEN, UNIT_SEP, format_telegram_delta_message, format_telegram_scan_message,
+                        pack_units)
+from src.core.notifier import tg_len
+
+
+def _entry(k):
+    return {"symbol": f"SYM{k}/USDT:USDT", "last": 1.2345, "atr_abs": 0.01, "atr_pct": 0.008, "range_pct": 0.04,
+            "adx": 18.5, "mid_cross": 9, "drift_pct": 0.2, "tags": ["PING-PONG OK"], "grid_low": 1.2,
+            "grid_high": 1.27, "grid_lines": 12, "speed": {}}
+
+
+def test_pack_units_minimal_and_ordered():
+    units = [f"u{k} " + "y" * (k % 7 * 10) for k in range(40)]
+    out = pack_units(units, limit=150)
+    assert all(tg_len(m) <= 150 for m in out)
+    assert UNIT_SEP.join(out).split(UNIT_SEP) == units
+    for a, b in zip(out, out[1:]):                   # sonraki mesajın ilk birimi sığmazdı
+        assert tg_len(a) + tg_len(UNIT_SEP) + tg_len(b.split(UNIT_SEP)[0]) > 150
+
+
+def test_pack_units_oversized_unit_and_empties():
+    big = "\n".join("z" * 40 for _ in range(10))
+    out = pack_units(["a", "", big, "b"], limit=100)
+    assert out[0] == "a" and out[-1] == "b"
+    assert all(tg_len(m) <= 100 for m in out)
+    assert pack_units([]) == []
+
+
+def test_scan_message_chunks_fit_telegram_limit():
+    chunks = format_telegram_scan_message(scan_started_at="2026-01-01 00:00", s_behavior=_entry(0),
+                                          top_candidates=[_entry(k) for k in range(1, 80)],
+                                          fast_candidates=[_entry(k) for k in range(80, 120)])
+    assert len(chunks) > 1
+    assert all(tg_len(c) <= MAX_LEN for c in chunks)
+    text = "".join(chunks)
+    assert all(f"SYM{k}/USDT:USDT" in text for k in range(120))
+
+
+def test_delta_message_lists_changes():
+    old, new = _entry(1), dict(_entry(1), grid_low=1.1)
+    chunks = format_telegram_delta_message(scan_started_at="t", entered=[("top", _entry(2))],
+                                           exited=[("fast", _entry(3))], shifted=[("top", old, new, ["grid"])],
+                                           unchanged=5)
+    text = "".join(chunks)
+    assert "SYM2/USDT:USDT" in text and "SYM3/USDT:USDT" in text and "SYM1/USDT:USDT" in text
@@ -0,0 +1,50 @@
+import json
+import random
+
+import grid_batch as B
+import grid_sizer as G
+
+
+def _random_rows(n, seed=7):
+    r = random.Random(seed)
+    rows, filt, last = [], [], []
+    for k in range(n):
+        px = 10 ** r.uniform(-5, 5)
+        rows.append(B._row({"symbol": f"S{k}", "lower": px * r.uniform(.9, .99), "upper": px * r.uniform(1.01, 1.1),
+                            "levels": r.randint(2, 60), "capital": r.uniform(5, 5000)}, 100))
+        ps = r.choice([10 ** -r.randint(0, 8), 0.5, 0.25, 0.0025, 0.005, 5e-05])
+        qs = r.choice([10 ** -r.randint(0, 4), 0.5, 5.0, 1.0])
+        filt.append((ps, qs, r.choice([2.0, 5.0, 0.0]), r.choice([0.0, qs, 3 * qs]), r.choice([0.0, ps])))
+        last.append(px * r.uniform(0.9, 1.1))
+    return rows, filt, last
+
+
+def test_size_grids_matches_plan_grid_row_for_row():
+    rows, filt, last = _random_rows(400)
+    plans = B.size_grids(rows, filt, last)
+    ref = [G.plan_grid(x["symbol"], x["lower"], x["upper"], x["levels"], x["capital"], f, l, reserve=x["reserve"])
+           for x, f, l in zip(rows, filt, last)]
+    assert len(plans) == len(ref)
+    for a, b in zip(plans, ref):
+        assert a == b
+
+
+def test_size_grids_empty():
+    assert B.size_grids([], [], []) == []
+
+
+def test_rows_from_fmt_strips_venue_and_dedupes():
+    entries = [{"symbol": "A/USDT:USDT · bybit", "grid_low": 1, "grid_high": 2, "grid_lines": 6},
+               {"symbol": "A/USDT:USDT", "grid_low": 1, "grid_high": 2},
+               {"symbol": "B/USDT:USDT", "grid_low": None, "grid_high": 2}]
+    rows = B.rows_from_fmt(entries, 50.0)
+    assert [(r["symbol"], r["levels"], r["capital"]) for r in rows] == [("A/USDT:USDT", 6, 50.0)]
+
+
+def test_write_plans_json_and_csv(tmp_path):
+    plans = [{"symbol": "A", "orders": [{"lvl": 0, "side": "buy", "price": 1.0, "qty": 2.0, "notional": 2.0, "tp": 1.1}]}]
+    B.write_plans(plans, str(tmp_path / "p.json"))
+    assert json.loads((tmp_path / "p.json").read_text()) == plans
+    B.write_plans(plans, str(tmp_path / "p.csv"))
+    lines = (tmp_path / "p.csv").read_text().splitlines()
+    assert lines[0] == ",".join(B.ORDER_FIELDS) and lines[1].startswith("A,0,buy,1.0,2.0")
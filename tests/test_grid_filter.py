@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from grid_filter import load_items
+from scan_history import ScanHistory
+
+
+def _row(sym, lo, hi, venue=None):
+    r = {"symbol": sym, "last": (lo + hi) / 2, "atr_abs": 0.1, "atr_pct": 0.01, "range_pct": 0.03,
+         "adx": 20.0, "midcross": 5, "drift_ratio": 0.1, "grid_lower": lo, "grid_upper": hi,
+         "levels": 12, "pingpong_ok": True, "fast_ok": False}
+    if venue:
+        r["venue"] = venue
+    return r
+
+
+def _args(path, since=None, until=None):
+    return SimpleNamespace(history=path, since_ms=since, until_ms=until)
+
+
+def test_until_ms_alone_bounds_the_range(tmp_path):
+    path = str(tmp_path / "h.sqlite")
+    h = ScanHistory(path)
+    h.append(1_000, [_row("A/USDT:USDT", 1.0, 2.0)])
+    h.append(2_000, [_row("A/USDT:USDT", 3.0, 4.0), _row("B/USDT:USDT", 5.0, 6.0)])
+    h.close()
+
+    # only --until-ms: the run at 2000 is out of range
+    items = load_items(_args(path, until=1_500))
+    assert [(it["sym"], it["low"]) for it in items] == [("A/USDT:USDT", 1.0)]
+    # no bounds: the latest run only
+    assert sorted(it["sym"] for it in load_items(_args(path))) == ["A/USDT:USDT", "B/USDT:USDT"]
+    assert [it["low"] for it in load_items(_args(path, since=1_500)) if it["sym"] == "A/USDT:USDT"] == [3.0]
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from grid_opt import candidate_space, optimize_grid, score_candidates
+
+FILTERS = (0.01, 0.001, 5.0, 0.001, 0.0)
+BAND = np.array([[0.04, 0.0, 3.0]])         # last=100 → 98 / 100 / 102
+
+
+def test_jitter_around_one_line_is_one_fill():
+    path = np.array([99.9, 100.1] * 50)
+    res = score_candidates(path, 100.0, BAND, 300.0, FILTERS, fee=0.0006)
+    assert res["lower"][0] == pytest.approx(98.0) and res["upper"][0] == pytest.approx(102.0)
+    assert res["round_trips"][0] == 0.5
+    assert res["score"][0] < 1.0
+
+
+def test_full_swings_fill_every_line_once_per_swing():
+    path = np.array([97.0, 103.0] * 5)
+    res = score_candidates(path, 100.0, BAND, 300.0, FILTERS, fee=0.0)
+    # ilk çıkış: 98/100/102 satışları; sonra her salınımda 2 emir (boş çizgi atlanır)
+    assert res["round_trips"][0] == (3 + 2 * 8) / 2.0
+
+
+def test_filters_drop_unplaceable_candidates():
+    path = np.array([99.0, 101.0] * 10)
+    res = score_candidates(path, 100.0, BAND, 10.0, FILTERS)   # 9.5 / 3 < min_notional
+    assert res["score"][0] == -np.inf
+
+
+def test_optimize_grid_on_trend_returns_none_and_on_range_returns_plan():
+    filt = (0.0001, 0.1, 5.0, 0.1, 0.0)
+    assert optimize_grid("X/USDT:USDT", np.linspace(1.0, 1.3, 360), filt, 200.0, budget_s=1.0) is None
+    t = np.arange(360)
+    closes = 1.2 * (1.0 + 0.01 * np.sin(t / 6.0))
+    best = optimize_grid("X/USDT:USDT", closes, filt, 200.0, budget_s=1.0)
+    assert best is not None and best["evaluated"] == len(candidate_space())
+    assert best["lower"] < best["upper"] and best["plan"]["orders"]
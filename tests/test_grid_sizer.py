@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+import numpy as np
+
+import grid_sizer as G
+
+
+def _on_tick(x, step):
+    q = Decimal(repr(x)) / Decimal(repr(step))
+    return q == q.to_integral_value()
+
+
+def test_lattice_ticks_are_exact():
+    lat = G.Lattice(0.1)
+    assert lat.ticks(0.3) == 3                 # 0.3 / 0.1 = 2.9999999999999996 in float
+    assert lat.ticks(0.29999, "up") == 3
+    assert lat.ticks(0.35, "nearest") == 4
+    assert lat.to_float(3) == 0.3
+    assert G.Lattice(0.05).ticks(0.95) == 19
+    assert G.round_step(0.95, 0.05) == 0.95 and G.round_step(0.3, 0.1) == 0.3
+
+
+def test_snap_band_widens_to_ticks():
+    assert G.snap_band(0.9512, 1.0488, 0.001) == (0.951, 1.049)
+    assert G.snap_band(1.0, 2.0, 0.0) == (1.0, 2.0)
+
+
+def test_tick_grid_level_of():
+    g = G.TickGrid(G.Lattice(0.0001), 1.1234, 1.3456, 16)
+    for i in range(g.n):
+        assert g.level_of(g.price(i)) == i
+        assert _on_tick(g.price(i), 0.0001)
+    assert g.level_of(g.price(3) + 0.00005) is None          # tick dışı
+    assert g.level_of(g.price(0) - 0.0001) is None           # bant dışı, ama tick üzerinde
+    # aynı tick'e düşen seviyeler: ilk seviye döner
+    tight = G.TickGrid(G.Lattice(0.01), 1.00, 1.02, 5)
+    assert [tight.level_of(tight.price(i)) for i in range(5)] == [0, 0, 2, 2, 4]
+
+
+def test_qty_ticks_vec_matches_scalar():
+    plat, qlat = G.Lattice(0.0005), G.Lattice(0.1)
+    kp = np.array([1, 7, 2000, 123457, 10 ** 9], dtype=np.int64)
+    quote = np.array([5.0, 0.35, 100.0, 61.7285, 1e6])
+    r = np.zeros(len(kp), dtype=np.int64)
+    steps = np.array([0.0005 * 0.1])
+    for mode in ("down", "up"):
+        got = G.qty_ticks_vec(quote, kp, r, steps, [plat], [qlat], mode)
+        assert got.tolist() == [G.qty_ticks(float(q), int(k), plat, qlat, mode) for q, k in zip(quote, kp)]
+    assert G.ticks_to_float(np.array([3]), np.array([plat.unit]), np.array([float(plat.scale)]))[0] == 0.0015
+
+
+def test_ticks_vec_matches_lattice_ticks():
+    rnd = np.random.default_rng(4)
+    lats = [G.Lattice(s) for s in (0.1, 0.0005, 0.01, 1e-8, 5.0)]
+    on_tick = [l.to_float(int(k)) for l in lats for k in (0, 1, 3, 7, 123457)]
+    x = np.array(on_tick + [0.95, 0.3, 2.675, 1.0000000000000002, 114000.123] + rnd.uniform(0, 200, 40).tolist())
+    per_row = [lats[k % len(lats)] for k in range(len(x))]
+    for mode in ("down", "up"):
+        assert G.ticks_vec(x, per_row, mode).tolist() == [l.ticks(float(v), mode) for l, v in zip(per_row, x)]
+        for lat in lats:
+            assert G.ticks_vec(x, lat, mode).tolist() == [lat.ticks(float(v), mode) for v in x]
+    assert G.ticks_vec(np.array([]), lats[0]).tolist() == []
+
+
+def test_plan_grid_orders_are_on_tick():
+    f = (0.0025, 0.5, 5.0, 0.5, 0.0)
+    plan = G.plan_grid("S", 12.3, 15.7, 12, 500.0, f, 14.0)
+    assert plan["orders"]
+    for o in plan["orders"]:
+        assert _on_tick(o["price"], 0.0025) and _on_tick(o["qty"], 0.5)
+        assert o["notional"] >= 5.0
@@ -0,0 +1,32 @@
+from src.core.guards import GuardFeed
+
+
+def _rows(n, start_ts=0, step=60_000):
+    out = []
+    for i in range(n):
+        c = 100.0 + (i % 7) * 0.1
+        out.append([start_ts + i * step, c, c + 0.2, c - 0.2, c, 1.0])
+    return out
+
+
+def test_seed_limit_warms_up_slow_window():
+    g = GuardFeed(win_fast=20, win_slow=120)
+    assert g.seed_limit == 121
+    assert g.feed(_rows(g.seed_limit), 60_000) == 120     # son bar devam ediyor
+    assert g._n >= max(g.win_fast, g.win_slow)
+    assert g._adx.value is not None
+
+
+def test_seed_limit_covers_adx_when_windows_are_short():
+    g = GuardFeed(win_fast=5, win_slow=10)
+    g.feed(_rows(g.seed_limit), 60_000)
+    assert g._adx.value is not None
+
+
+def test_gap_resets_state():
+    g = GuardFeed(win_fast=5, win_slow=10)
+    rows = _rows(30)
+    g.feed(rows, 60_000)
+    last = g.last_ts
+    assert g.feed(_rows(3, start_ts=last + 5 * 60_000), 60_000) == -1
+    assert g.last_ts is None and g._n == 0
@@ -0,0 +1,272 @@
+import math, random
+
+import pytest
+
+from src.core import indicators as I
+from src.core.guards import GuardFeed
+from src.core.indicators import ADX, ATR, DX, MidCross, RollingQuantile, WindowCross, _Median
+from src.strategy import metrics_feed
+
+
+def _ohlc(n, seed=1, start=100.0, tick=0.0):
+    rnd = random.Random(seed)
+    out, c = [], start
+    for _ in range(n):
+        o = c
+        c = max(o * (1.0 + rnd.gauss(0, 0.004)), 1e-6)
+        h = max(o, c) * (1.0 + abs(rnd.gauss(0, 0.002)))
+        l = min(o, c) * (1.0 - abs(rnd.gauss(0, 0.002)))
+        if tick:   # fiyat adımına yuvarla: eşit close / diff == 0 durumları da çıksın
+            o, h, l, c = (round(x / tick) * tick for x in (o, h, l, c))
+        out.append((o, h, l, c))
+    return out
+
+
+# ---------- eski liste fonksiyonları (referans; kütüphane bunlarla bit-bit aynı olmalı) ----------
+
+def ref_adx14(ohlc):
+    n = 14
+    if len(ohlc) < n + 1:
+        return 100.0
+    trs, pdms, ndms = [], [], []
+    prev = ohlc[0]
+    for cur in ohlc[1:]:
+        (po, ph, pl, pc), (o, h, l, c) = prev, cur
+        tr = max(h - l, abs(h - pc), abs(l - pc))
+        plus_dm, minus_dm = max(h - ph, 0.0), max(pl - l, 0.0)
+        if plus_dm < minus_dm:
+            plus_dm = 0.0
+        elif minus_dm < plus_dm:
+            minus_dm = 0.0
+        trs.append(tr); pdms.append(plus_dm); ndms.append(minus_dm)
+        prev = cur
+
+    def wilder(arr, p):
+        out = []
+        sm = sum(arr[:p]); out.append(sm)
+        for i in range(p, len(arr)):
+            sm = sm - (sm / p) + arr[i]
+            out.append(sm)
+        return out
+
+    a, p, m = wilder(trs, n), wilder(pdms, n), wilder(ndms, n)
+    dx = []
+    for i in range(len(a)):
+        pdi = (p[i] / a[i] * 100.0) if a[i] > 0 else 0.0
+        ndi = (m[i] / a[i] * 100.0) if a[i] > 0 else 0.0
+        s = pdi + ndi
+        dx.append((abs(pdi - ndi) / s * 100.0) if s > 0 else 0.0)
+    return 100.0 if len(dx) < n else sum(dx[-n:]) / n
+
+
+def ref_atr(values, period):
+    if len(values) < period + 1:
+        return 0.0
+    trs, pc = [], values[0][3]
+    for (o, h, l, c) in values[1:]:
+        trs.append(max(h - l, abs(h - pc), abs(l - pc)))
+        pc = c
+    return sum(trs[-period:]) / period
+
+
+def ref_sma(vals, period):
+    out, s = [], 0.0
+    for i, v in enumerate(vals):
+        s += v
+        if i >= period:
+            s -= vals[i - period]
+        out.append(s / period if i >= period - 1 else float("nan"))
+    return out
+
+
+def ref_crosses_per_hour(closes):
+    mid = ref_sma(closes, 20)
+    idx, prev = [], None
+    for i, (c, m) in enumerate(zip(closes, mid)):
+        if m != m:
+            continue
+        diff = c - m
+        if prev is not None and (diff == 0 or (diff > 0 and prev < 0) or (diff < 0 and prev > 0)):
+            idx.append(i)
+        prev = diff
+    rate = len(idx) / max(max(len(closes) - 19, 1) / 60.0, 1e-6)
+    gaps = sorted(b - a for a, b in zip(idx, idx[1:]))
+    if not gaps:
+        return rate, float("inf")
+    med = float(gaps[len(gaps) // 2])
+    return max(rate, 60.0 / med), med
+
+
+def ref_feed_crosses(closes):
+    """metrics_feed.crosses_per_hour (baseline): genişleyen mid, (diff > 0) değişimi."""
+    mids = [sum(closes[max(0, i - 19):i + 1]) / len(closes[max(0, i - 19):i + 1]) for i in range(len(closes))]
+    cross, prev = 0, None
+    for c, m in zip(closes, mids):
+        diff = c - m
+        if prev is not None and (diff == 0 or (diff > 0) != (prev > 0)):
+            cross += 1
+        prev = diff
+    return cross / max(len(closes) / 60.0, 1e-6)
+
+
+def ref_dx(ohlc):
+    n = 14
+    if len(ohlc) < n + 1:
+        return 0.0
+    trs, pl, ml = [], [], []
+    po, ph, pll, pc = ohlc[0]
+    for o, h, l, c in ohlc[1:]:
+        up, down = h - ph, pll - l
+        trs.append(max(h - l, abs(h - pc), abs(l - pc)))
+        pl.append(up if (up > 0 and up > down) else 0.0)
+        ml.append(down if (down > 0 and down > up) else 0.0)
+        po, ph, pll, pc = o, h, l, c
+    atr = sum(trs[-n:]) / n
+    if atr <= 0:
+        return 0.0
+    pdi = (sum(pl[-n:]) / n) / atr * 100.0
+    ndi = (sum(ml[-n:]) / n) / atr * 100.0
+    return abs(pdi - ndi) / max(pdi + ndi, 1e-9) * 100.0
+
+
+# ---------- list helpers ----------
+
+@pytest.mark.parametrize("seed", range(6))
+def test_list_helpers_bit_identical_to_old_scanner_functions(seed):
+    bars = _ohlc(400, seed=seed, tick=0.01 if seed % 2 else 0.0)
+    closes = [c for *_, c in bars]
+    assert I.atr_from_ohlc(bars, 50) == ref_atr(bars, 50)
+    assert I.adx14(bars[-150:]) == ref_adx14(bars[-150:])
+    assert I.adx14(bars) == ref_adx14(bars)
+    assert I.crosses_per_hour(closes) == ref_crosses_per_hour(closes)
+    assert I.sma_series(closes, 20)[19:] == ref_sma(closes, 20)[19:]
+
+
+def test_list_helper_short_history_fallbacks():
+    bars = _ohlc(27)
+    assert I.adx14(bars) == ref_adx14(bars) == 100.0
+    assert I.adx14(bars[:3]) == 100.0
+    assert I.atr_from_ohlc(bars[:10], 14) == 0.0
+    assert I.crosses_per_hour([1.0] * 5) == (0.0, float("inf"))
+
+
+def test_streaming_objects_track_list_helpers():
+    bars = _ohlc(3000, seed=2)
+    atr, adx = ATR(50), ADX(14)
+    for i, (o, h, l, c) in enumerate(bars):
+        atr.update(h, l, c)
+        adx.update(h, l, c)
+        if i % 97 == 0 and i > 60:
+            assert atr.value == pytest.approx(ref_atr(bars[:i + 1], 50), rel=1e-12)
+            assert adx.value == pytest.approx(ref_adx14(bars[:i + 1]), rel=1e-12)
+    assert adx.resum() == ref_adx14(bars)
+    assert ADX(14).value is None
+
+
+def test_midcross_window_matches_list_count():
+    closes = [c for *_, c in _ohlc(600, seed=3, tick=0.01)]
+    mid = I.sma_series(closes, 20)
+    mc = MidCross(20, window=180)
+    for k, c in enumerate(closes):
+        mc.update(c)
+        if k >= 200 and k % 37 == 0:
+            assert mc.count == I.mid_cross_count(closes[k - 179:k + 1], mid[k - 179:k + 1])
+
+
+def test_midcross_window_median_matches_sorted_gaps():
+    closes = [c for *_, c in _ohlc(2000, seed=7)]
+    mc = MidCross(20, window=240)
+    for c in closes:
+        mc.update(c)
+        gaps = sorted(b - a for a, b in zip(mc._pos, list(mc._pos)[1:]))
+        assert mc.median_gap == (float(gaps[len(gaps) // 2]) if gaps else float("inf"))
+
+
+def test_median_heaps_with_duplicates_and_removal():
+    rnd = random.Random(3)
+    med, live = _Median(), []
+    for _ in range(3000):
+        if live and rnd.random() < 0.45:
+            x = live.pop(rnd.randrange(len(live)))
+            med.remove(x)
+        else:
+            x = rnd.randint(1, 12)
+            live.append(x)
+            med.add(x)
+        s = sorted(live)
+        assert len(med) == len(s)
+        assert med.value == (float(s[len(s) // 2]) if s else float("inf"))
+    assert len(med.lo) + len(med.hi) <= 2 * len(med) + 33   # tembel silinenler sınırlı
+
+
+def test_rolling_quantile_window_matches_sorted_window():
+    closes = [c for *_, c in _ohlc(700, seed=5, tick=0.05)]   # bol eşit değer
+    rq = RollingQuantile(window=120)
+    for k, c in enumerate(closes):
+        rq.update(c)
+        if k >= 130 and k % 13 == 0:
+            tail = closes[k - 119:k + 1]
+            S = sorted(tail)
+            assert len(rq) == 120
+            assert [rq.kth(j) for j in range(120)] == S
+            assert rq.percentile(0.2) == I.percentile(S, 0.2)
+            assert rq.touches() / 2.0 == I.touches_per_hour(tail)
+    assert math.isnan(RollingQuantile().percentile(0.5))
+
+
+# ---------- guards / metrics_feed: eski tanımlar korunur ----------
+
+def test_guard_dx_keeps_single_period_definition():
+    bars = _ohlc(300, seed=8, tick=0.01)
+    ind = DX(14)
+    for k, (o, h, l, c) in enumerate(bars):
+        ind.update(h, l, c)
+        if k >= 14:
+            assert (ind.value or 0.0) == pytest.approx(ref_dx(bars[:k + 1]), rel=1e-9, abs=1e-12)
+    assert I.dx14(bars) == ref_dx(bars)
+
+    g = GuardFeed(win_fast=20, win_slow=120)
+    rows = [[k * 60_000, o, h, l, c, 1.0] for k, (o, h, l, c) in enumerate(bars)]
+    g.feed(rows, 60_000)
+    assert g.adx == pytest.approx(ref_dx(bars[:-1]), rel=1e-9)
+
+
+@pytest.mark.parametrize("tick", [0.0, 0.01])
+def test_metrics_feed_crosses_keep_baseline_definition(tick):
+    closes = [c for *_, c in _ohlc(900, seed=9, tick=tick)]
+    assert metrics_feed.crosses_per_hour(closes[:360]) == ref_feed_crosses(closes[:360])
+    st = metrics_feed.SymbolMetrics(window=360)
+    rows = [[k * 60_000, c, c, c, c, 1.0] for k, c in enumerate(closes)]
+    for end in range(362, len(rows), 41):
+        st.feed(rows[:end])
+        win = closes[end - 1 - 360:end - 1]
+        assert st.crosses_per_hour() == ref_feed_crosses(win)
+        assert st.touches_per_hour() == metrics_feed.touches_per_hour(win)
+
+
+def test_window_cross_short_window():
+    wc = WindowCross(30)
+    closes = [1.0, 2.0, 1.0, 2.0, 1.0] * 10
+    for k, c in enumerate(closes):
+        wc.update(c)
+        win = closes[max(0, k - 29):k + 1]
+        assert wc.count / max(len(win) / 60.0, 1e-6) == ref_feed_crosses(win)
+
+
+def test_batch_engine_matches_list_helpers():
+    B = pytest.importorskip("batch_indicators")
+    series = []
+    for k, n in enumerate([40, 150, 200, 360]):
+        series.append([[i * 60_000, o, h, l, c, 1.0] for i, (o, h, l, c) in enumerate(_ohlc(n, seed=20 + k, tick=0.01))])
+    m5 = B.scan_metrics_5m(series)
+    fast = B.fast_metrics(series)
+    for r, rows in enumerate(series):
+        ohlc = [tuple(x[1:5]) for x in rows]
+        closes = [x[4] for x in rows]
+        mid = I.sma_series(closes, 20)
+        assert m5["atr_abs"][r] == I.atr_from_ohlc(ohlc, 50)
+        assert m5["adx"][r] == pytest.approx(I.adx14(ohlc[-150:]), rel=B.TOLERANCE_REL)
+        assert m5["midcross"][r] == I.mid_cross_count(closes[-180:], mid[-180:])
+        xph, med = I.crosses_per_hour(closes)
+        assert fast["xph"][r] == pytest.approx(xph, rel=B.TOLERANCE_REL) and fast["med"][r] == med
+        assert fast["edgeph"][r] == pytest.approx(I.touches_per_hour(closes), rel=B.TOLERANCE_REL)
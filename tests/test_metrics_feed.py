@@ -0,0 +1,35 @@
+import importlib
+import os
+from types import SimpleNamespace
+
+T0 = 1_700_000_040_000
+
+
+class FakeCcxt:
+    def milliseconds(self):
+        return T0 + 10 * 60_000
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        start = since if since is not None else T0
+        return [[start + k * 60_000, 1.0, 1.0, 1.0, 1.0, 0.0] for k in range(limit or 1)]
+
+
+def test_store_is_created_on_first_fetch_not_on_import(tmp_path, monkeypatch):
+    root = tmp_path / "candles"
+    monkeypatch.setenv("CANDLE_STORE_DIR", str(root))
+    import src.strategy.metrics_feed as mf
+    mf = importlib.reload(mf)
+    assert not root.exists()
+
+    rows = mf.fetch_ohlcv(SimpleNamespace(ex=FakeCcxt()), "A/USDT:USDT", "1m", 5)
+    assert len(rows) == 5
+    assert root.is_dir() and os.listdir(root)
+    assert mf.get_store() is mf.get_store()
+
+
+def test_store_off(monkeypatch):
+    monkeypatch.setenv("CANDLE_STORE_DIR", "off")
+    import src.strategy.metrics_feed as mf
+    mf = importlib.reload(mf)
+    assert mf.get_store() is None
+    assert len(mf.fetch_ohlcv(SimpleNamespace(ex=FakeCcxt()), "A/USDT:USDT", "1m", 3)) == 3
@@ -0,0 +1,30 @@
+from src.core.notifier import split_message, tg_len
+
+
+def test_tg_len_counts_utf16_units():
+    assert tg_len("abc") == 3
+    assert tg_len("🟢") == 2
+    assert tg_len("ğ") == 1
+
+
+def test_split_keeps_lines_and_order():
+    lines = [f"line {k:03d} " + "x" * 20 for k in range(50)]
+    text = "\n".join(lines)
+    parts = split_message(text, limit=200)
+    assert all(tg_len(p) <= 200 for p in parts)
+    assert "\n".join(parts).splitlines() == lines
+    # açgözlü paketleme: her parça bir sonraki satırı da alsaydı limiti aşardı
+    for a, b in zip(parts, parts[1:]):
+        assert tg_len(a + "\n" + b.splitlines()[0] + "\n") > 200
+
+
+def test_long_line_is_hard_split_by_utf16_length():
+    text = "🟢" * 150                                   # 300 UTF-16 birimi, tek satır
+    parts = split_message(text, limit=101)
+    assert "".join(parts) == text
+    assert all(tg_len(p) <= 101 for p in parts) and len(parts) == 3
+
+
+def test_short_and_empty():
+    assert split_message("hi") == ["hi"]
+    assert split_message("") == []
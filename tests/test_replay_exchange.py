@@ -0,0 +1,48 @@
+from candle_store import CandleStore
+from listing_index import BACKFILL_1D, BACKFILL_1H
+from replay_exchange import RecordingFetcher, ReplayExchange, Snapshot
+
+NOW = 1_700_000_000_000 - 1_700_000_000_000 % 86_400_000
+STEP = {"5m": 300_000, "1h": 3_600_000, "1d": 86_400_000}
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.jobs = []
+
+    def fetch_many(self, jobs):
+        self.jobs += [tuple(j) for j in jobs]
+        out = []
+        for s, tf, lim, since in jobs:
+            n = min(lim, 30)          # kısa geçmiş (yeni listelenmiş sembol)
+            out.append([[NOW - (n - 1 - k) * STEP[tf], 1.0, 1.0, 1.0, 1.0, 0.0] for k in range(n)])
+        return out
+
+    def close(self):
+        pass
+
+
+def test_backfill_jobs_bypass_store_and_are_recorded(tmp_path):
+    store = CandleStore(str(tmp_path / "candles"))
+    snap = Snapshot()
+    fetcher = FakeFetcher()
+    rec = RecordingFetcher(fetcher, store, snap, NOW, direct=(BACKFILL_1H, BACKFILL_1D))
+    jobs = [("A/USDT:USDT", "5m", 20, None), ("A/USDT:USDT", BACKFILL_1H[0], BACKFILL_1H[1], None),
+            ("A/USDT:USDT", BACKFILL_1D[0], BACKFILL_1D[1], None)]
+    res = rec.fetch_many(jobs)
+
+    assert [len(r) for r in res] == [20, 30, 30]
+    assert store.open("A/USDT:USDT", "5m") is not None
+    assert store.open("A/USDT:USDT", "1h") is None and store.open("A/USDT:USDT", "1d") is None
+    assert ("A/USDT:USDT", "1h", 500, None) in fetcher.jobs          # ham istek, store planı yok
+
+    replay = ReplayExchange(snap)
+    for (s, tf, lim, since), rows in zip(jobs, res):
+        assert replay.fetch_ohlcv(s, timeframe=tf, since=since, limit=lim) == rows
+
+
+def test_without_direct_everything_goes_through_store(tmp_path):
+    store = CandleStore(str(tmp_path / "candles"))
+    rec = RecordingFetcher(FakeFetcher(), store, Snapshot(), NOW)
+    rec.fetch_many([("A/USDT:USDT", "1h", 500, None)])
+    assert store.open("A/USDT:USDT", "1h") is not None
@@ -0,0 +1,45 @@
+import pytest
+
+from resample import base_limit_1m, mismatches, resample_many, resample_ohlcv
+
+T0 = 1_700_000_100_000 - 1_700_000_100_000 % 900_000     # 15m sınırı
+
+
+def _rows_1m(n, start):
+    return [[start + k * 60_000, 10.0 + k, 10.5 + k, 9.5 + k, 10.25 + k, 1.0 + k] for k in range(n)]
+
+
+def test_buckets_and_trailing_partial_bar():
+    rows = _rows_1m(12, T0)
+    out = resample_ohlcv(rows, "5m")
+    assert [r[0] for r in out] == [T0, T0 + 300_000, T0 + 600_000]
+    first = out[0]
+    assert first == [T0, 10.0, 14.5, 9.5, 14.25, 15.0]                 # o ilk, h max, l min, c son, v toplam
+    assert out[-1][0] == T0 + 600_000 and out[-1][5] == 11.0 + 12.0    # devam eden bar: 2 dakika
+    assert isinstance(first[0], int)
+
+
+def test_leading_partial_bucket_is_dropped():
+    rows = _rows_1m(12, T0 + 2 * 60_000)
+    out = resample_ohlcv(rows, "5m")
+    assert out[0][0] == T0 + 300_000
+    assert out[0][1] == rows[3][1]
+
+
+def test_identity_empty_and_non_multiple():
+    rows = _rows_1m(3, T0)
+    assert resample_ohlcv(rows, "1m") == rows and resample_ohlcv(rows, "1m") is not rows
+    assert resample_ohlcv([], "5m") == []
+    with pytest.raises(ValueError):
+        resample_ohlcv(_rows_1m(10, T0), "5m", base_tf="3m")
+
+
+def test_many_limit_and_mismatches():
+    rows = _rows_1m(base_limit_1m("15m", 2), T0 - 14 * 60_000)
+    many = resample_many(rows, ("3m", "15m"))
+    assert len(many["15m"]) == 2 and many["15m"][0][0] == T0
+    native = [list(r) for r in many["15m"]]
+    assert mismatches(many["15m"], native) == []
+    native[0][2] += 1.0
+    assert mismatches(many["15m"], native) == [(T0, "high", many["15m"][0][2], native[0][2])]
+    assert base_limit_1m("5m", 200) == 1004
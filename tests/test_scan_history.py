@@ -0,0 +1,40 @@
+from scan_history import DEFAULT_VENUE, ScanHistory
+
+
+def _row(sym, **kw):
+    d = {"symbol": sym, "last": 1.5, "atr_pct": 0.01, "range_pct": 0.03, "adx": 18.0, "midcross": 7.0,
+         "grid_lower": 1.4, "grid_upper": 1.6, "levels": 12, "pingpong_ok": True, "fast_ok": False,
+         "why_tags": ["ADX", "DRIFT"]}
+    d.update(kw)
+    return d
+
+
+def test_append_and_queries(tmp_path):
+    h = ScanHistory(str(tmp_path / "h" / "history.sqlite"))
+    assert h.last_run_ms() is None and h.run() == []
+    assert h.append(1_000, [_row("A"), _row("B", fast_ok=True)]) == 2
+    h.append(2_000, [_row("A", last=1.7), _row("A", venue="bybit", last=1.8)])
+    h.append(3_000, [_row("B", adx="n/a")])
+
+    assert h.last_run_ms() == 3_000
+    a = h.symbol("A")
+    assert [(r["run_ms"], r["venue"], r["last"]) for r in a] == [
+        (1_000, DEFAULT_VENUE, 1.5), (2_000, DEFAULT_VENUE, 1.7), (2_000, "bybit", 1.8)]
+    assert [r["venue"] for r in h.symbol("A", venue="bybit")] == ["bybit"]
+    assert [r["run_ms"] for r in h.symbol("A", since_ms=1_500)] == [2_000, 2_000]
+    assert [r["symbol"] for r in h.between(until_ms=1_000)] == ["A", "B"]
+    assert [r["symbol"] for r in h.between(1_500, 2_500)] == ["A", "A"]
+
+    r = h.run(1_000)[0]
+    assert r["pingpong_ok"] is True and r["fast_ok"] is False and r["why_tags"] == ["ADX", "DRIFT"]
+    assert r["midcross"] == 7 and r["levels"] == 12
+    assert h.run()[0]["adx"] is None                     # sayı olmayan değer → NULL
+    h.close()
+
+
+def test_rewriting_a_run_replaces_rows(tmp_path):
+    h = ScanHistory(str(tmp_path / "h.sqlite"))
+    h.append(1_000, [_row("A", last=1.0)])
+    h.append(1_000, [_row("A", last=2.0)])
+    assert [r["last"] for r in h.symbol("A")] == [2.0]
+    h.close()
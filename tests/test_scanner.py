@@ -0,0 +1,165 @@
+import pytest
+
+import scan_bingx_grid as scan
+
+
+def test_history_rows_keeps_same_symbol_on_other_venue():
+    allres = [{"symbol": "BTC/USDT:USDT", "venue": "bingx"}]
+    fast_pp = [{"symbol": "BTC/USDT:USDT", "venue": "bingx"},
+               {"symbol": "BTC/USDT:USDT", "venue": "bybit"},
+               {"symbol": "ETH/USDT:USDT", "venue": "bingx"}]
+    rows = scan.history_rows(allres, fast_pp)
+    assert [(d["venue"], d["symbol"]) for d in rows] == [
+        ("bingx", "BTC/USDT:USDT"), ("bybit", "BTC/USDT:USDT"), ("bingx", "ETH/USDT:USDT")]
+
+
+def test_history_rows_single_venue():
+    rows = scan.history_rows([{"symbol": "A"}], [{"symbol": "A"}, {"symbol": "B"}])
+    assert [d["symbol"] for d in rows] == ["A", "B"]
+
+
+def test_single_fetch_tf_error():
+    assert scan.single_fetch_tf_error("1m", 360) is None
+    assert scan.single_fetch_tf_error("3m", 360) is None
+    assert "1m" in scan.single_fetch_tf_error("30s", 10)            # 1m'nin katı değil
+    assert scan.single_fetch_tf_error("1h", 360) is not None         # 21600 > 1440 1m bar
+
+
+def test_single_fetch_off_for_invalid_fast_tf(monkeypatch, capsys):
+    import importlib
+    monkeypatch.setenv("SINGLE_FETCH_1M", "1")
+    monkeypatch.setenv("FAST_TF", "1h")
+    try:
+        mod = importlib.reload(scan)
+        assert mod.SINGLE_FETCH_1M == 0
+        assert "SINGLE_FETCH_1M kapatıldı" in capsys.readouterr().out
+    finally:
+        monkeypatch.delenv("SINGLE_FETCH_1M")
+        monkeypatch.delenv("FAST_TF")
+        importlib.reload(scan)
+
+
+def test_ticker_range_pct():
+    assert scan.ticker_range_pct({"high": 110, "low": 90, "last": 100}) == 0.2
+    assert scan.ticker_range_pct({"high": 110, "low": 90, "close": 100}) == 0.2
+    assert scan.ticker_range_pct({"last": 100}) is None
+    assert scan.ticker_range_pct({"high": 110, "low": 90, "last": 0}) is None
+
+
+def test_write_grid_plans_sizes_each_venue_with_its_exchange(tmp_path, monkeypatch):
+    import csv
+    out = tmp_path / "plans.csv"
+    monkeypatch.setattr(scan, "GRID_PLAN_PATH", str(out))
+    made, calls = [], []
+
+    class FakeEx:
+        def __init__(self, venue):
+            self.id = venue
+
+    def make_exchange(venue):
+        made.append(venue)
+        return FakeEx(venue)
+
+    def build_grids(rows, ex, last):
+        calls.append((ex.id, [r["symbol"] for r in rows], dict(last)))
+        return [{"symbol": r["symbol"], "orders": [{"lvl": 0, "side": "buy", "price": last[r["symbol"]],
+                                                     "qty": 1.0, "notional": 1.0, "tp": None}]} for r in rows]
+
+    monkeypatch.setattr(scan, "make_exchange", make_exchange)
+    monkeypatch.setattr(scan, "build_grids", build_grids)
+    entries = [
+        {"symbol": "BTC/USDT:USDT · bingx", "last": 100.0, "grid_low": 90, "grid_high": 110, "grid_lines": 4},
+        {"symbol": "BTC/USDT:USDT · bybit", "last": 101.0, "grid_low": 90, "grid_high": 110, "grid_lines": 4},
+        {"symbol": "ETH/USDT:USDT · bybit", "last": 5.0, "grid_low": 4, "grid_high": 6, "grid_lines": 4},
+    ]
+    scan._write_grid_plans(FakeEx("bingx"), entries, "bingx")
+    assert made == ["bybit"]
+    assert calls == [("bingx", ["BTC/USDT:USDT"], {"BTC/USDT:USDT": 100.0}),
+                     ("bybit", ["BTC/USDT:USDT", "ETH/USDT:USDT"], {"BTC/USDT:USDT": 101.0, "ETH/USDT:USDT": 5.0})]
+    with open(out, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["venue"], r["symbol"], r["price"]) for r in rows] == [
+        ("bingx", "BTC/USDT:USDT", "100.0"), ("bybit", "BTC/USDT:USDT", "101.0"), ("bybit", "ETH/USDT:USDT", "5.0")]
+
+
+def test_young_base_ok_rows_get_new_tag_without_index(synth_market, monkeypatch):
+    monkeypatch.setattr(scan, "LISTED_MIN_DAYS", 30)
+    fetcher = synth_market.fetcher()
+    allres, pp, fast_pp = scan.scan_pairs(synth_market, synth_market.markets, synth_market.pairs, fetcher)
+    young = [d for d in allres if d["symbol"] in synth_market.young]
+    assert any("TREND" in d["why_tags"] or "DRIFT" in d["why_tags"] for d in young)   # aday olmayanlar da
+    assert young and all("NEW" in d["why_tags"] for d in young)
+    assert all("NEW" not in d["why_tags"] for d in allres if d["symbol"] not in synth_market.young)
+    assert not any(d["symbol"] in synth_market.young for d in pp)
+    age_jobs = {s for s, tf, lim, _ in fetcher.jobs if tf == "1h"}
+    assert age_jobs == {d["symbol"] for d in young}
+
+
+def test_young_base_ok_rows_get_new_tag_with_index(synth_market, monkeypatch, tmp_path):
+    from listing_index import ListingIndex
+    monkeypatch.setattr(scan, "LISTED_MIN_DAYS", 30)
+    index = ListingIndex(str(tmp_path / "listing.json"))
+    allres, _, _ = scan.scan_pairs(synth_market, synth_market.markets, synth_market.pairs,
+                                   synth_market.fetcher(), None, index)
+    young = [d for d in allres if d["symbol"] in synth_market.young]
+    assert len(young) >= 2 and all("NEW" in d["why_tags"] for d in young)
+
+
+def test_log_fetch_error_tags_network_errors(capsys):
+    import ccxt
+    scan._log_fetch_error("A", ccxt.RequestTimeout("slow"))
+    scan._log_fetch_error("B", ValueError("bad"))
+    assert capsys.readouterr().out.splitlines() == ["NETERR A slow", "ERR B bad"]
+
+
+class _InlinePool:
+    """multiprocessing.Pool yerine: aynı süreçte sırayla; işler ve sonuçlar pickle'dan geçer (süreç sınırı gibi)."""
+
+    def __init__(self, processes, initializer=None, initargs=()):
+        self.processes = processes
+        if initializer is not None:
+            initializer(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, jobs):
+        import pickle
+        return [pickle.loads(pickle.dumps(fn(pickle.loads(pickle.dumps(job))))) for job in jobs]
+
+
+@pytest.mark.parametrize("with_index", [False, True])
+def test_sharded_scan_matches_single_scan(synth_market, monkeypatch, tmp_path, with_index):
+    import ccxt
+    from listing_index import ListingIndex
+    monkeypatch.setattr(ccxt, "synth", lambda config: type(synth_market)(), raising=False)
+    monkeypatch.setattr(scan.multiprocessing, "Pool", _InlinePool)
+    monkeypatch.setattr(scan, "default_store", lambda: None)
+    monkeypatch.setattr(scan, "FETCH_WORKERS", 0)
+    monkeypatch.setattr(scan, "FETCH_RATE", 1e9)
+    mk_index = (lambda name: ListingIndex(str(tmp_path / name))) if with_index else (lambda name: None)
+
+    one, index_one = scan.StageCounter(), mk_index("one.json")
+    single = scan.scan_pairs(synth_market, synth_market.markets, synth_market.pairs,
+                             synth_market.fetcher(), None, index_one, one)
+    merged, index_sh = scan.StageCounter(), mk_index("sharded.json")
+    sharded = scan.scan_sharded(synth_market, synth_market.markets, synth_market.pairs, 3, index_sh, merged)
+
+    assert [len(x) for x in single] == [len(x) for x in sharded] and single[1] and single[2]
+    for a, b in zip(single, sharded):
+        assert [d["symbol"] for d in a] == [d["symbol"] for d in b]
+        assert a == b
+    assert merged.counts == one.counts
+    if with_index:
+        assert index_sh.symbols == index_one.symbols and index_one.symbols
+
+
+def test_stage_counter_merge_sums_shards():
+    a, b, total = scan.StageCounter(), scan.StageCounter(), scan.StageCounter()
+    a.record("ticker", 10, 7); a.record("adx", 5, 2)
+    b.record("ticker", 4, 4)
+    total.merge(a.counts); total.merge(b.counts)
+    assert total.counts == {"ticker": (14, 3), "adx": (5, 3)}
@@ -0,0 +1,71 @@
+import ccxt
+import pytest
+
+from src.core.risk import RiskGate, RiskLimits
+from src.core.sim_exchange import SimExchange
+
+
+class Mkt:
+    id = "fake"
+
+    def milliseconds(self):
+        return 0
+
+
+@pytest.fixture
+def sx():
+    risk = RiskGate(RiskLimits())
+    ex = SimExchange(Mkt(), risk=risk, fee_rate=0.001, clock=lambda: 0)
+    ex.on_bar("S", [0, 100, 100.5, 99.5, 100, 1])
+    return ex
+
+
+def test_fills_at_limit_price_on_touch(sx):
+    for i in range(1, 6):
+        sx.create_order("S", "buy", "limit", 1, 100 - i)
+        sx.create_order("S", "sell", "limit", 1, 100 + i)
+    assert len(sx.fetch_open_orders("S")) == 10
+    assert sx.on_bar("S", [60_000, 100, 102.5, 97.5, 101, 1]) == 4
+    assert [(f["side"], f["price"]) for f in sx.fills] == [("buy", 99.0), ("buy", 98.0), ("sell", 101.0), ("sell", 102.0)]
+    pos = sx.fetch_positions()[0]
+    assert pos["contracts"] == 0.0
+    assert pos["realizedPnl"] == pytest.approx(6.0 - 0.4)       # (101−99)+(102−98) − ücretler
+    assert sx.risk.daily_realized_pnl == pytest.approx(pos["realizedPnl"])
+
+
+def test_no_look_ahead_into_the_placing_bar(sx):
+    sx.on_bar("S", [60_000, 100, 100, 100, 100, 1])
+    o = sx.create_order("S", "buy", "limit", 1, 99)          # bar 60_000'ün kapanışından sonra
+    assert o["timestamp"] == 120_000
+    assert sx.on_bar("S", [60_000, 100, 100, 95, 100, 1]) == 0   # aynı/eski bar: dolmaz
+    assert sx.on_bar("S", [120_000, 100, 100, 98.9, 100, 1]) == 1
+
+
+def test_price_then_time_priority(sx):
+    a = sx.create_order("S", "buy", "limit", 1, 98)
+    b = sx.create_order("S", "buy", "limit", 1, 99)
+    c = sx.create_order("S", "buy", "limit", 1, 99)
+    sx.on_trade("S", 99.0, 60_000)
+    assert [f["id"] for f in sx.fills] == [b["id"], c["id"]]
+    assert sx.orders[a["id"]]["status"] == "open"
+
+
+def test_cancel_and_cancel_all(sx):
+    a = sx.create_order("S", "buy", "limit", 1, 99)
+    sx.create_order("S", "sell", "limit", 1, 101)
+    assert sx.cancel_order(a["id"])["status"] == "canceled"
+    assert sx.on_trade("S", 98.0, 60_000) == 0
+    assert len(sx.cancel_all_orders("S")) == 1 and sx.fetch_open_orders() == []
+    with pytest.raises(ccxt.OrderNotFound):
+        sx.cancel_order("nope")
+    with pytest.raises(ccxt.InvalidOrder):
+        sx.create_order("S", "hold", "limit", 1, 100)
+
+
+def test_market_order_and_position_flip(sx):
+    sx.create_order("S", "buy", "market", 2)                 # son fiyat 100
+    sx.on_trade("S", 110.0, 60_000)
+    sx.create_order("S", "sell", "market", 3)                # 2 kapanır, 1 short açılır
+    pos = sx.fetch_positions()[0]
+    assert pos["side"] == "short" and pos["contracts"] == 1 and pos["entryPrice"] == 110.0
+    assert pos["realizedPnl"] == pytest.approx(2 * 10.0 - 0.001 * (200 + 330))
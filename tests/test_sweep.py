@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import scan_bingx_grid as S
+import sweep
+from replay_exchange import RecordingExchange, RecordingFetcher, Snapshot
+
+
+@pytest.fixture
+def recorded(synth_market, tmp_path):
+    """Sentetik piyasada --record gibi bir koşu: (snapshot, scan_pairs çıktısı)."""
+    snap = Snapshot()
+    ex = RecordingExchange(synth_market, snap)
+    markets, pairs = S.load_universe(ex)
+    fetcher = RecordingFetcher(synth_market.fetcher(), None, snap, ex.milliseconds())
+    out = S.scan_pairs(ex, markets, pairs, fetcher)
+    snap.save(str(tmp_path / "snap.json.gz"))
+    return Snapshot.load(str(tmp_path / "snap.json.gz")), out
+
+
+def _default(names):
+    return np.array([[float(getattr(S, name)) for name in names]])
+
+
+def _pp_set(m, names, P):
+    return {m["symbols"][i] for i in np.flatnonzero(sweep.masks(m, names, P)["pp"][0])}
+
+
+def test_default_thresholds_match_scan_pairs(recorded):
+    snap, (allres, pp, fast_pp) = recorded
+    assert pp and fast_pp and len(pp) < len(allres)
+    m = sweep.load_metrics(snap)
+    names, combos, swept = sweep.build_grid([])
+    assert swept == [] and len(combos) == 1
+    mk = sweep.masks(m, names, combos)
+    syms = m["symbols"]
+    assert {syms[i] for i in np.flatnonzero(mk["pp"][0])} == {d["symbol"] for d in pp}
+    assert {syms[i] for i in np.flatnonzero(mk["fast"][0])} == {d["symbol"] for d in fast_pp}
+
+    res = sweep.evaluate(m, names, combos)
+    assert res["n_pp"][0] == len(pp) and res["n_fast"][0] == len(fast_pp)
+    assert syms[res["s_idx"][0]] == pp[0]["symbol"]
+    assert sweep._syms(syms, res["fast_idx"][0]) == [d["symbol"] for d in S.rank_fast(fast_pp)]
+    # main(): hard cap → (PP, FAST, -atr*range) sırası → S davranışı çıkar → TOP_SEND
+    top = [d for d in allres if d["adx"] <= S.TOP_ADX_HARD_MAX and d["drift_ratio"] <= S.TOP_DRIFT_HARD_MAX]
+    top.sort(key=lambda d: (not d["pingpong_ok"], not d["fast_ok"], -(d["atr_pct"] * d["range_pct"])))
+    top = [d["symbol"] for d in top if d["symbol"] != pp[0]["symbol"]][:S.TOP_SEND]
+    assert sweep._syms(syms, res["top_idx"][0]) == top
+
+
+@pytest.mark.parametrize("name, field, tag, values", [
+    ("DRIFT_MAX_RATIO", "drift_ratio", "DRIFT", [0.02, 0.3, 0.6]),
+    ("ADX_MAX", "adx", "TREND", [7.2, 20.0]),
+    ("MID_CROSS_MIN", "midcross", "MID", [0, 61]),
+])
+def test_single_threshold_sweep_moves_only_expected_symbols(recorded, name, field, tag, values):
+    snap, (allres, pp, _) = recorded
+    m = sweep.load_metrics(snap)
+    names, combos, swept = sweep.build_grid([f"{name}={','.join(str(v) for v in values)}"])
+    assert swept == [name] and len(combos) == len(values)
+    base_pp = {d["symbol"] for d in pp}
+    assert _pp_set(m, names, _default(names)) == base_pp
+    k, moved = names.index(name), set()
+    for v, row in zip(values, combos):
+        ok = (lambda x: x >= v) if name == "MID_CROSS_MIN" else (lambda x: x <= v)
+        added = {d["symbol"] for d in allres if d["why_tags"] == [tag] and ok(d[field])}
+        removed = {d["symbol"] for d in pp if not ok(d[field])}
+        assert row[k] == v
+        assert _pp_set(m, names, row[None, :]) == (base_pp | added) - removed
+        moved |= added | removed
+    assert moved      # sentetik piyasada her eşik en az bir sembolü taşır